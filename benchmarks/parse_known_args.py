@@ -0,0 +1,71 @@
+'''Benchmarks for finding where the snakeparse options end on the command line
+(:meth:`~snakeparse.api.SnakeParse._parse_known_args`), comparing the
+single-pass implementation with parsing successively longer prefixes of the
+arguments (:meth:`~snakeparse.api.SnakeParse._parse_known_args_by_prefix`).
+
+The benchmarks may be run with asv, or standalone to print a comparison:
+
+.. code-block:: shell-session
+
+    $ python benchmarks/parse_known_args.py
+'''
+
+import timeit
+from typing import Callable, Dict, List
+
+from snakeparse.api import SnakeParse, SnakeParseConfig
+
+
+'''The number of arguments on the command line.'''
+ARGV_LENGTHS = [10, 100, 1000, 10000]
+
+'''The implementations to compare.'''
+METHODS: Dict[str, Callable] = {
+    'single_pass': SnakeParse._parse_known_args,
+    'by_prefix': SnakeParse._parse_known_args_by_prefix,
+}
+
+
+def argv(length: int) -> List[str]:
+    '''Builds a command line with the given number of arguments, half of which
+    are snakeparse options (many snakefile globs), followed by the workflow name
+    and many Snakemake and workflow arguments.'''
+    globs = [f'workflows/group{i}/*.smk' for i in range(max(0, length // 2 - 3))]
+    args = ['--snakefile-globs'] + globs + ['--prog', 'toolchain', 'Workflow']
+    args += [f'target{i}.txt' for i in range(length - len(args))]
+    return args[:length]
+
+
+class ParseKnownArgs(object):
+    '''Time to split the snakeparse options from the rest of the command line.'''
+
+    params = (ARGV_LENGTHS, list(METHODS.keys()))
+    param_names = ['argv_length', 'method']
+    timeout = 600
+
+    def setup(self, argv_length: int, method: str) -> None:
+        self.parser = SnakeParseConfig.config_parser()
+        self.args = argv(argv_length)
+        self.method = METHODS[method]
+
+    def time_parse_known_args(self, argv_length: int, method: str) -> None:
+        self.method(parser=self.parser, args=self.args)
+
+
+def main() -> None:
+    '''Prints the time taken by each implementation for each command line length,
+    and checks that both give the same result.'''
+    parser = SnakeParseConfig.config_parser()
+    print(f'{"argv length":>12} {"single pass (s)":>16} {"by prefix (s)":>16} {"speedup":>8}')
+    for length in ARGV_LENGTHS:
+        args = argv(length)
+        results = [method(parser=parser, args=args) for method in METHODS.values()]
+        assert results[0] == results[1], f'Results differ for argv length {length}'
+        times = [min(timeit.repeat(lambda: method(parser=parser, args=args), number=1,
+                                   repeat=3 if length < 10000 else 1))
+                 for method in METHODS.values()]
+        print(f'{length:>12} {times[0]:>16.6f} {times[1]:>16.6f} {times[1] / times[0]:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
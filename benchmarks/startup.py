@@ -0,0 +1,347 @@
+'''Benchmarks for the startup and hot paths of snakeparse, on synthetic
+tool-chains of 10, 100, and 1000 snakefiles (see
+:mod:`~benchmarks.toolchain`):
+
+    - creating the :class:`~snakeparse.api.SnakeParseConfig` from snakefile
+      globs, from explicit workflows, and from JSON, YAML, and HOCON
+      configuration files;
+    - expanding the snakefile globs, with and without a cache of directory
+      listings;
+    - building the parser for a workflow
+      (:meth:`~snakeparse.api.SnakeParseConfig.parser_from`);
+    - dispatching to a workflow with :class:`~snakeparse.api.SnakeParse`, with
+      the workflow name given directly or after ``--``;
+    - rendering the usage that lists all the workflows;
+    - sorting the workflows of a configuration, for up to 50000 workflows;
+    - the end-to-end command line (:func:`~snakeparse.__main__.main`), up to
+      the point of calling Snakemake;
+    - completing a workflow's options in a new process
+      (``snakeparse __complete``), from an up-to-date completion index.
+
+The benchmarks may be run with asv, which stores the results of each run (see
+``asv.conf.json``) so that runs may be compared with ``asv compare``:
+
+.. code-block:: shell-session
+
+    $ asv run
+    $ asv compare <baseline commit> <commit>
+
+or standalone, which prints the times and can store them in, and compare them
+with, a JSON file:
+
+.. code-block:: shell-session
+
+    $ python benchmarks/startup.py --output before.json
+    $ python benchmarks/startup.py --compare before.json
+'''
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import timeit
+from collections import OrderedDict
+from io import StringIO
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from unittest import mock
+
+if __name__ == '__main__':
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.toolchain import NUM_GROUPS, SIZES, make_toolchain, snakefile_glob, snakefiles, \
+    workflow_name, workflows
+from snakeparse.__main__ import main as snakeparse_main
+from snakeparse.api import SnakeParse, SnakeParseConfig, SnakeParseWorkflow
+from snakeparse.cache import DirectoryCache
+from snakeparse.completion import CompletionIndex
+from snakeparse.discovery import expand_globs
+
+
+'''The ways in which the configuration is given.'''
+SOURCES = ['globs', 'workflows', 'json', 'yaml', 'hocon']
+
+'''The configuration file for each configuration file source.'''
+_CONFIG_FILES = {'json': 'snakeparse.json', 'yaml': 'snakeparse.yml', 'hocon': 'snakeparse.conf'}
+
+'''The tool-chains created by this process, by size, removed on exit.'''
+_TOOLCHAINS: Dict[int, Any] = {}
+
+
+def toolchain(size: int) -> Path:
+    '''Returns the tool-chain with the given number of snakefiles, creating it
+    (once per process) in a temporary directory.'''
+    if size not in _TOOLCHAINS:
+        _TOOLCHAINS[size] = tempfile.TemporaryDirectory()
+        make_toolchain(root=Path(_TOOLCHAINS[size].name), size=size)
+    return Path(_TOOLCHAINS[size].name) / f'toolchain{size}'
+
+
+def cache_dir(size: int) -> Path:
+    '''The snakefile and configuration cache directory for the tool-chain with
+    the given number of snakefiles.'''
+    return toolchain(size=size) / 'cache'
+
+
+def config(size: int, source: str = 'globs', cached: bool = True,
+           lazy: bool = False) -> SnakeParseConfig:
+    '''Creates the configuration for the tool-chain with the given number of
+    snakefiles.'''
+    directory = toolchain(size=size)
+    kwargs: Dict[str, Any] = dict(
+        workflows=OrderedDict(), groups=OrderedDict(), snakefile_globs=[], lazy=lazy,
+        cache_dir=cache_dir(size=size) if cached else None
+    )
+    if source in ['globs', 'workflows']:
+        kwargs['name_transform'] = 'snake_to_camel'
+    if source == 'globs':
+        kwargs['snakefile_globs'] = [snakefile_glob(directory=directory)]
+    elif source == 'workflows':
+        kwargs['workflows'] = OrderedDict(workflows(directory=directory))
+    else:
+        kwargs['config_path'] = directory / _CONFIG_FILES[source]
+    return SnakeParseConfig(**kwargs)
+
+
+def dispatch_args(size: int, separator: bool) -> List[str]:
+    '''The Snakemake and workflow arguments for running the last workflow in
+    the tool-chain, with the workflow name given after ``--`` if requested.'''
+    name = [workflow_name(size - 1)]
+    if separator:
+        name = ['--'] + name
+    return ['--cores', '1', '--dryrun'] + name + ['--message', 'hello', '--count', '2']
+
+
+class ConfigConstruction(object):
+    '''Time to create the configuration, with a warm cache.'''
+
+    params = (SIZES, SOURCES)
+    param_names = ['snakefiles', 'source']
+    timeout = 600
+
+    def setup(self, snakefiles: int, source: str) -> None:
+        config(size=snakefiles, source=source)
+
+    def time_config(self, snakefiles: int, source: str) -> None:
+        config(size=snakefiles, source=source)
+
+
+class ColdConfigConstruction(object):
+    '''Time to create the configuration from snakefile globs without a cache,
+    loading the workflows' metadata eagerly or lazily.'''
+
+    params = (SIZES, [False, True])
+    param_names = ['snakefiles', 'lazy']
+    timeout = 600
+
+    def setup(self, snakefiles: int, lazy: bool) -> None:
+        toolchain(size=snakefiles)
+
+    def time_config(self, snakefiles: int, lazy: bool) -> None:
+        config(size=snakefiles, cached=False, lazy=lazy)
+
+
+class GlobExpansion(object):
+    '''Time to expand the snakefile glob, with and without a warm cache of the
+    directory listings.'''
+
+    params = (SIZES, [False, True])
+    param_names = ['snakefiles', 'cached']
+    timeout = 600
+
+    def setup(self, snakefiles: int, cached: bool) -> None:
+        directory = toolchain(size=snakefiles)
+        # directories modified too recently are not cached
+        for path, _, _ in os.walk(str(directory)):
+            os.utime(path, ns=(0, 1_000_000_000))
+        self.globs = [snakefile_glob(directory=directory)]
+        self.cache_dir = cache_dir(size=snakefiles) if cached else None
+        self.time_expand_globs(snakefiles=snakefiles, cached=cached)
+
+    def time_expand_globs(self, snakefiles: int, cached: bool) -> None:
+        cache = None if self.cache_dir is None else DirectoryCache(cache_dir=self.cache_dir)
+        expand_globs(globs=self.globs, cache=cache)
+
+
+class SortWorkflows(object):
+    '''Time to sort the workflows of a configuration by group and name.'''
+
+    params = ([1000, 10000, 50000],)
+    param_names = ['workflows']
+    timeout = 600
+
+    def setup(self, workflows: int) -> None:
+        self.config = SnakeParseConfig(workflows=OrderedDict(), groups=OrderedDict(),
+                                       snakefile_globs=[])
+        for index in reversed(range(workflows)):
+            group = index % NUM_GROUPS
+            self.config.add_workflow(SnakeParseWorkflow(
+                name=workflow_name(index),
+                snakefile=Path(f'/toolchain/group{group}/workflow{index}.smk'),
+                group=f'group{group}',
+                description=f'Workflow {index} of group {group}.',
+                check_exists=False
+            ))
+
+    def time_sort_workflows(self, workflows: int) -> None:
+        self.config.sort_workflows()
+
+
+class ParserFrom(object):
+    '''Time to build the parser for a single workflow, with and without a warm
+    cache of the translated snakefile.'''
+
+    params = [False, True]
+    param_names = ['cached']
+
+    def setup(self, cached: bool) -> None:
+        directory = toolchain(size=SIZES[0])
+        self.workflow = SnakeParseWorkflow(name=workflow_name(0),
+                                           snakefile=snakefiles(directory=directory)[0])
+        self.cache = config(size=SIZES[0]).cache if cached else None
+
+    def time_parser_from(self, cached: bool) -> None:
+        SnakeParseConfig.parser_from(workflow=self.workflow, cache=self.cache)
+
+
+class Dispatch(object):
+    '''Time to find the workflow to run and parse its arguments, given an
+    existing configuration.'''
+
+    params = (SIZES, [False, True])
+    param_names = ['snakefiles', 'separator']
+    timeout = 600
+
+    def setup(self, snakefiles: int, separator: bool) -> None:
+        self.config = config(size=snakefiles)
+        self.args = dispatch_args(size=snakefiles, separator=separator)
+
+    def time_dispatch(self, snakefiles: int, separator: bool) -> None:
+        SnakeParse(args=self.args, config=self.config, file=StringIO()).cleanup()
+
+
+class Usage(object):
+    '''Time to render the usage listing all the workflows.'''
+
+    params = SIZES
+    param_names = ['snakefiles']
+    timeout = 600
+
+    def setup(self, snakefiles: int) -> None:
+        self.snakeparse = SnakeParse(args=dispatch_args(size=snakefiles, separator=False),
+                                     config=config(size=snakefiles), file=StringIO())
+        self.snakeparse.cleanup()
+
+    def time_usage(self, snakefiles: int) -> None:
+        self.snakeparse.file = StringIO()
+        self.snakeparse._usage(exit=False)
+
+
+class Main(object):
+    '''Time to run the command line end-to-end, from parsing the snakeparse
+    options to the point of calling Snakemake, with a warm cache.'''
+
+    params = SIZES
+    param_names = ['snakefiles']
+    timeout = 600
+
+    def setup(self, snakefiles: int) -> None:
+        directory = toolchain(size=snakefiles)
+        self.args = ['--cache-dir', str(cache_dir(size=snakefiles)),
+                     '--snakefile-globs', snakefile_glob(directory=directory),
+                     '--prog', 'toolchain'] + dispatch_args(size=snakefiles, separator=False)
+        self.time_main(snakefiles=snakefiles)
+
+    def time_main(self, snakefiles: int) -> None:
+        with mock.patch.dict(os.environ), mock.patch('subprocess.call', return_value=0):
+            os.environ.pop('SNAKEPARSE_SOCKET', None)
+            try:
+                snakeparse_main(args=self.args)
+            except SystemExit:
+                pass
+
+
+class Complete(object):
+    '''Time to complete the options of a workflow in a new process, as a shell
+    does on TAB, with an up-to-date completion index.'''
+
+    params = SIZES
+    param_names = ['snakefiles']
+    timeout = 600
+
+    def setup(self, snakefiles: int) -> None:
+        directory = toolchain(size=snakefiles)
+        words = ['--cache-dir', str(cache_dir(size=snakefiles)),
+                 '--snakefile-globs', snakefile_glob(directory=directory),
+                 '--', workflow_name(snakefiles - 1)]
+        _, path = CompletionIndex.key_for(words=words)
+        CompletionIndex.build(words=words).save(path=path)
+        self.command = [sys.executable, '-m', 'snakeparse', '__complete', '--'] + words + ['--m']
+
+    def time_complete(self, snakefiles: int) -> None:
+        subprocess.run(self.command, stdout=subprocess.DEVNULL, check=True)
+
+
+def _benchmarks() -> Dict[str, Callable[[], Any]]:
+    '''The benchmarks to run standalone, by name.'''
+    benchmarks: Dict[str, Callable[[], Any]] = OrderedDict()
+
+    def add(name: str, cls: type, *params: Any) -> None:
+        instance = cls()
+        instance.setup(*params)
+        method = next(getattr(instance, attr) for attr in dir(instance)
+                      if attr.startswith('time_'))
+        benchmarks[name] = lambda: method(*params)
+
+    for size in SIZES:
+        for source in SOURCES:
+            add(f'config[{size},{source}]', ConfigConstruction, size, source)
+        for lazy in [False, True]:
+            add(f'cold_config[{size},lazy={lazy}]', ColdConfigConstruction, size, lazy)
+        for separator in [False, True]:
+            add(f'dispatch[{size},separator={separator}]', Dispatch, size, separator)
+        for cached in [False, True]:
+            add(f'expand_globs[{size},cached={cached}]', GlobExpansion, size, cached)
+        add(f'usage[{size}]', Usage, size)
+        add(f'main[{size}]', Main, size)
+        add(f'complete[{size}]', Complete, size)
+    for cached in [False, True]:
+        add(f'parser_from[cached={cached}]', ParserFrom, cached)
+    for size in SortWorkflows.params[0]:
+        add(f'sort_workflows[{size}]', SortWorkflows, size)
+    return benchmarks
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    '''Runs the benchmarks standalone, printing the best time of each, and
+    optionally storing the times or comparing them with stored times.'''
+    parser = argparse.ArgumentParser(description='Runs the startup benchmarks.')
+    parser.add_argument('--output', type=Path, help='Write the times to this JSON file.')
+    parser.add_argument('--compare', type=Path,
+                        help='Compare the times with those in this JSON file.')
+    parser.add_argument('--repeat', type=int, default=3, help='The number of repeats.')
+    parsed = parser.parse_args(args)
+
+    baseline: Dict[str, float] = {}
+    if parsed.compare is not None:
+        with parsed.compare.open('r') as fh:
+            baseline = json.load(fh)
+
+    times: Dict[str, float] = OrderedDict()
+    print(f'{"benchmark":<36} {"time (s)":>12} {"baseline (s)":>12} {"ratio":>8}')
+    for name, benchmark in _benchmarks().items():
+        times[name] = min(timeit.repeat(benchmark, number=1, repeat=parsed.repeat))
+        line = f'{name:<36} {times[name]:>12.6f}'
+        if name in baseline:
+            line += f' {baseline[name]:>12.6f} {times[name] / baseline[name]:>7.2f}x'
+        print(line)
+
+    if parsed.output is not None:
+        with parsed.output.open('w') as fh:
+            json.dump(times, fh, indent=2)
+
+
+if __name__ == '__main__':
+    main()
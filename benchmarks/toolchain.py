@@ -0,0 +1,95 @@
+'''Generates synthetic tool-chains of snakefiles for the benchmarks.
+
+Each tool-chain has the given number of snakefiles, spread across ten group
+directories, each with a parser with a literal group and description and a few
+arguments, and a single rule.  Configuration files in JSON, YAML, and HOCON
+format that find the snakefiles with a glob, and name the workflows in camel
+case, are written alongside.
+'''
+
+import json
+from pathlib import Path
+from typing import Dict, List
+
+from snakeparse.api import SnakeParseWorkflow
+
+
+'''The number of snakefiles in each tool-chain.'''
+SIZES = [10, 100, 1000]
+
+'''The number of groups the snakefiles are spread across.'''
+NUM_GROUPS = 10
+
+_SNAKEFILE = '''
+from snakeparse.parser import argparser
+
+def snakeparser(**kwargs):
+    p = argparser(**kwargs)
+    p.group = 'group{group}'
+    p.description = 'Workflow {index} of group {group}.'
+    p.parser.add_argument('--message', help='The message.', required=True)
+    p.parser.add_argument('--count', type=int, default=1, help='The count.')
+    p.parser.add_argument('--flag', action='store_true', help='A flag.')
+    return p
+
+args = snakeparser().parse_config(config=config)
+
+rule all:
+    output: 'workflow{index}.txt'
+    shell: 'echo {{args.message}} > {{output}}'
+'''
+
+
+def workflow_name(index: int) -> str:
+    '''The name of the workflow with the given index, after transforming the
+    name of its snakefile from snake case to camel case.'''
+    return f'Workflow{index}'
+
+
+def make_toolchain(root: Path, size: int) -> Path:
+    '''Writes a tool-chain with the given number of snakefiles to a new
+    directory in the given root directory, and returns the directory.'''
+    directory = root / f'toolchain{size}'
+    for index in range(size):
+        group = index % NUM_GROUPS
+        group_dir = directory / f'group{group}'
+        group_dir.mkdir(parents=True, exist_ok=True)
+        with (group_dir / f'workflow{index}.smk').open('w') as fh:
+            fh.write(_SNAKEFILE.format(group=group, index=index))
+
+    glob = snakefile_glob(directory=directory)
+    with (directory / 'snakeparse.json').open('w') as fh:
+        json.dump({'prog': 'toolchain', 'name_transform': 'snake_to_camel',
+                   'snakefile_globs': [glob]}, fh)
+    with (directory / 'snakeparse.yml').open('w') as fh:
+        fh.write('prog: toolchain\nname_transform: snake_to_camel\n'
+                 f'snakefile_globs:\n  - {json.dumps(glob)}\n')
+    with (directory / 'snakeparse.conf').open('w') as fh:
+        fh.write('prog = toolchain\nname_transform = snake_to_camel\n'
+                 f'snakefile_globs = [{json.dumps(glob)}]\n')
+    return directory
+
+
+def snakefile_glob(directory: Path) -> str:
+    '''The glob that finds all the snakefiles in the tool-chain.'''
+    return str(directory.resolve() / 'group*' / 'workflow*.smk')
+
+
+def snakefiles(directory: Path) -> List[Path]:
+    '''The snakefiles in the tool-chain.'''
+    return sorted(directory.glob('group*/workflow*.smk'))
+
+
+def workflows(directory: Path) -> Dict[str, SnakeParseWorkflow]:
+    '''Explicit workflows for each snakefile in the tool-chain, with the group
+    and description given so that the snakefiles need not be loaded.'''
+    result: Dict[str, SnakeParseWorkflow] = {}
+    for snakefile in snakefiles(directory=directory):
+        index = int(snakefile.stem[len('workflow'):])
+        result[workflow_name(index)] = SnakeParseWorkflow(
+            name=workflow_name(index),
+            snakefile=snakefile,
+            group=snakefile.parent.name,
+            description=f'Workflow {index}.'
+        )
+    return result
@@ -1,15 +1,80 @@
 #!/usr/bin/env python
 
+import os
 import sys
-from .api import SnakeParse
+from pathlib import Path
 from typing import List, Optional
 
 
 def main(args: Optional[List[str]]=None) -> None:
-    '''The main routine.'''
+    '''The main routine.
+
+    Run ``snakeparse build-catalog [snakeparse options] --output <catalog>`` to
+    build a catalog of the workflows (see :mod:`~snakeparse.catalog`).
+
+    Run ``snakeparse batch [snakeparse options] jobs.tsv`` to validate and run
+    many workflow invocations (see :mod:`~snakeparse.batch`).  Run
+    ``snakeparse concurrent [snakeparse options] <workflow> ... ++ <workflow>
+    ...`` to run the invocations separated by ``++`` concurrently (also see
+    :mod:`~snakeparse.batch`).  Otherwise, ``++`` is passed to the workflow like
+    any other argument.
+
+    Run ``snakeparse completion bash|zsh|fish`` to print the script that
+    registers shell completion (see :mod:`~snakeparse.completion`), which runs
+    ``snakeparse __complete`` to complete a command line.
+
+    Run ``snakeparse --serve [socket]`` to start the snakeparse server (see
+    :mod:`~snakeparse.server`).  When the ``SNAKEPARSE_SOCKET`` environment
+    variable is set to the path of the server's socket, the arguments are
+    forwarded to the server (which listens on the same socket by default),
+    otherwise (or if the server is not running) they are handled in this
+    process.
+    '''
     if args is None:
         args = sys.argv[1:]
 
+    # complete before importing anything else, as it runs on every TAB
+    if args[:1] == ['__complete']:
+        from .completion import complete_main
+        sys.exit(complete_main(args=args[1:]))
+
+    # import the client only, so forwarding to the server is fast
+    from .client import SOCKET_ENV, connect, default_socket_path, request
+
+    socket_path = os.environ.get(SOCKET_ENV)
+
+    if args[:1] == ['--serve']:
+        from .server import serve
+        if len(args) > 1:
+            socket_path = args[1]
+        serve(socket_path=Path(socket_path) if socket_path else default_socket_path())
+        return
+
+    if args[:1] == ['build-catalog']:
+        from .catalog import build_catalog_main
+        sys.exit(build_catalog_main(args=args[1:]))
+
+    if args[:1] == ['completion']:
+        from .completion import completion_main
+        sys.exit(completion_main(args=args[1:]))
+
+    if args[:1] == ['batch']:
+        from .batch import batch_main
+        sys.exit(batch_main(args=args[1:]))
+
+    if args[:1] == ['concurrent']:
+        from .batch import segments_main
+        sys.exit(segments_main(args=args[1:]))
+
+    if socket_path:
+        try:
+            sock = connect(socket_path=Path(socket_path))
+        except OSError:
+            pass
+        else:
+            sys.exit(request(args=args, sock=sock))
+
+    from .api import SnakeParse
     SnakeParse(args=args, config=None).run()
 
 
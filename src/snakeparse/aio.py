@@ -0,0 +1,217 @@
+'''Runs Snakemake workflows from an asyncio event loop.
+
+:meth:`~snakeparse.api.SnakeParse.run` blocks until Snakemake exits, then
+exits itself.  The coroutines here start Snakemake with
+:func:`asyncio.create_subprocess_exec` instead, so that many workflows can be
+supervised from one event loop without a thread per run, and return the exit
+code.  For example:
+
+.. code-block:: python
+
+    >>> snakeparse = SnakeParse(args=args, config=config)
+    >>> exit_code = await snakeparse.run_async(timeout=3600, stdout=print)
+
+or, to consume the output as async line streams:
+
+.. code-block:: python
+
+    >>> process = await snakeparse.start_async()
+    >>> async for line in process.stdout:
+    ...     print(line)
+    >>> exit_code = await process.wait()
+
+Snakemake is started in a new session, so that it and the jobs it runs locally
+are in their own process group.  If the run times out, or the task awaiting it
+is cancelled, the process group is sent ``SIGTERM``, then ``SIGKILL`` if
+Snakemake has not exited after a grace period, and the
+:class:`asyncio.TimeoutError` or :class:`asyncio.CancelledError` is re-raised.
+
+The module contains the following public classes and methods:
+
+    - :class:`~snakeparse.aio.SnakemakeProcess` -- A Snakemake process
+      started from the event loop.
+    - :func:`~snakeparse.aio.start` -- Starts the Snakemake workflow of a
+      parsed invocation.
+    - :func:`~snakeparse.aio.run` -- Runs the Snakemake workflow of a parsed
+      invocation to completion, and returns its exit code.
+'''
+
+import asyncio
+import inspect
+import os
+import signal
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional
+
+from .api import SnakeParse, SnakeParseException
+from .profiling import phase
+
+
+'''The seconds to wait for the Snakemake process group to exit after
+``SIGTERM``, before sending ``SIGKILL``.'''
+GRACE_PERIOD = 10.0
+
+'''The longest line read from Snakemake's output.'''
+_LINE_LIMIT = 1 << 20
+
+
+async def _lines(reader: asyncio.StreamReader) -> AsyncIterator[str]:
+    '''Yields the lines read, without their line endings.'''
+    async for line in reader:
+        yield line.decode('utf-8', errors='replace').rstrip('\r\n')
+
+
+class SnakemakeProcess(object):
+    '''A Snakemake process started from the event loop by
+    :func:`~snakeparse.aio.start`.
+
+    Attributes
+    ----------
+    process : asyncio.subprocess.Process
+        The Snakemake process, the leader of its own process group.
+    stdout : Optional[AsyncIterator[str]]
+        The lines written by Snakemake to standard output, if captured.
+    stderr : Optional[AsyncIterator[str]]
+        The lines written by Snakemake to standard error, if captured.
+    grace_period : float
+        The seconds to wait for the process group to exit after ``SIGTERM``,
+        before sending ``SIGKILL``.
+
+    The captured streams must be consumed while waiting for the process,
+    otherwise Snakemake may block writing to a full pipe.
+    '''
+
+    def __init__(self,
+                 process: asyncio.subprocess.Process,
+                 snakeparse: SnakeParse,
+                 grace_period: float = GRACE_PERIOD) -> None:
+        self.process      = process
+        self.snakeparse   = snakeparse
+        self.grace_period = grace_period
+        self.stdout: Optional[AsyncIterator[str]] = None
+        self.stderr: Optional[AsyncIterator[str]] = None
+        if process.stdout is not None:
+            self.stdout = _lines(process.stdout)
+        if process.stderr is not None:
+            self.stderr = _lines(process.stderr)
+
+    @property
+    def pid(self) -> int:
+        '''The process id of Snakemake, and its process group id.'''
+        return self.process.pid
+
+    @property
+    def returncode(self) -> Optional[int]:
+        '''The exit code of Snakemake, or None if it is still running.'''
+        return self.process.returncode
+
+    def send_signal(self, sig: int) -> None:
+        '''Sends the signal to the Snakemake process group, if Snakemake is
+        still running.'''
+        if self.process.returncode is not None:
+            return
+        try:
+            os.killpg(self.process.pid, sig)
+        except ProcessLookupError:
+            pass
+
+    async def stop(self) -> int:
+        '''Terminates the Snakemake process group, killing it if Snakemake has
+        not exited after the grace period, and returns the exit code.'''
+        self.send_signal(signal.SIGTERM)
+        try:
+            return await asyncio.wait_for(self.process.wait(), self.grace_period)
+        except asyncio.TimeoutError:
+            self.send_signal(signal.SIGKILL)
+            return await self.process.wait()
+
+    async def wait(self, timeout: Optional[float] = None) -> int:
+        '''Waits for Snakemake to exit, and returns its exit code.  If the
+        timeout (in seconds) elapses, or the wait is cancelled, the process
+        group is stopped, and the error re-raised.'''
+        return await self._supervise(self.process.wait(), timeout=timeout)
+
+    async def _supervise(self, awaitable: Awaitable[int], timeout: Optional[float]) -> int:
+        '''Awaits the awaitable, stopping the process group if it fails, times
+        out, or is cancelled, and removing the arguments file afterwards.'''
+        try:
+            return await asyncio.wait_for(awaitable, timeout)
+        except BaseException:
+            await asyncio.shield(self.stop())
+            raise
+        finally:
+            self.snakeparse.cleanup()
+
+
+async def start(snakeparse: SnakeParse,
+                stdout: bool = True,
+                stderr: bool = True,
+                grace_period: float = GRACE_PERIOD) -> SnakemakeProcess:
+    '''Starts the Snakemake workflow of the parsed invocation in a new process
+    group, capturing its standard output and error as line streams if
+    requested (otherwise they are inherited).  Standard input is not
+    inherited.'''
+    env  = dict(os.environ, **snakeparse.snakemake_env) if snakeparse.snakemake_env else None
+    pipe = asyncio.subprocess.PIPE
+    try:
+        if snakeparse.in_process:
+            raise SnakeParseException('Workflows run in-process cannot be run asynchronously')
+        process = await asyncio.create_subprocess_exec(
+            *snakeparse.command,
+            env=env,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=pipe if stdout else None,
+            stderr=pipe if stderr else None,
+            start_new_session=True,
+            limit=_LINE_LIMIT
+        )
+    except BaseException:
+        snakeparse.cleanup()
+        raise
+    return SnakemakeProcess(process=process, snakeparse=snakeparse, grace_period=grace_period)
+
+
+async def _pump(lines: AsyncIterator[str], callback: Callable[[str], Any]) -> None:
+    '''Gives each line to the callback, awaiting the result if awaitable.'''
+    async for line in lines:
+        result = callback(line)
+        if inspect.isawaitable(result):
+            await result
+
+
+async def run(snakeparse: SnakeParse,
+              timeout: Optional[float] = None,
+              stdout: Optional[Callable[[str], Any]] = None,
+              stderr: Optional[Callable[[str], Any]] = None,
+              grace_period: float = GRACE_PERIOD) -> int:
+    '''Runs the Snakemake workflow of the parsed invocation to completion, and
+    returns its exit code.
+
+    Keyword Arguments
+    -----------------
+    timeout : Optional[float]
+        Optionally, the seconds after which the run is stopped and
+        :class:`asyncio.TimeoutError` raised.
+    stdout : Optional[Callable[[str], Any]]
+        Optionally, called with each line Snakemake writes to standard output
+        (and awaited if it returns an awaitable), otherwise standard output is
+        inherited.
+    stderr : Optional[Callable[[str], Any]]
+        As ``stdout``, for standard error.
+    grace_period : float
+        The seconds to wait for the process group to exit after ``SIGTERM``,
+        before sending ``SIGKILL``.
+    '''
+    with phase('snakemake'):
+        process = await start(snakeparse=snakeparse, stdout=stdout is not None,
+                              stderr=stderr is not None, grace_period=grace_period)
+        pumps: List[Awaitable[None]] = []
+        if process.stdout is not None and stdout is not None:
+            pumps.append(_pump(lines=process.stdout, callback=stdout))
+        if process.stderr is not None and stderr is not None:
+            pumps.append(_pump(lines=process.stderr, callback=stderr))
+
+        async def communicate() -> int:
+            await asyncio.gather(*pumps)
+            return await process.process.wait()
+
+        return await process._supervise(communicate(), timeout=timeout)
@@ -136,12 +136,16 @@ The module contains the following public classes:
         on the command line, the paths to the snakefile and SnakeParse file, a
         workflow group to which this workflow belongs, and a short description
         to display on the commad line.
+    - :class:`~snakeparse.api.WorkflowTable` -- The workflows of a configuration, by name,
+        in order.
     - :class:`~snakeparse.api.SnakeParseConfig` -- The class used to configure SnakeParse.  In
         particular, where workflows are located (if they are to be discovered),
         definitions for the workflow (if they are to be explicitly defined),
         where SnakeParse files live (either generally or relative to the
         Snakemake files), the names of the workflow groups, and other
         miscellaneous options.
+    - :class:`~snakeparse.api.RefreshResult` -- The workflows added, removed, and
+        modified when refreshing the configuration.
     - :class:`~snakeparse.api.SnakeParse` -- The main entry point for command-line parsing for
         Snakemake. The configuration for SnakeParse will be optionally loaded, then the
         workflow to run will be parsed, then the workflow arguments will be
@@ -152,22 +156,62 @@ All other classes in this module are considered implementation details.
 '''
 
 import argparse
+import base64
+import builtins
+import copy
 import inspect
 import json
+import os
+import pickle
 import shutil
 import subprocess
 import sys
 import tempfile
+import threading
+import time
+import uuid
+import weakref
 from abc import ABC, abstractmethod
+from argparse import ONE_OR_MORE, OPTIONAL, ZERO_OR_MORE
 from collections import OrderedDict
+from contextlib import contextmanager
+from io import StringIO
 from pathlib import Path
-from typing import Any, Callable, Dict, IO, List, Optional, Sequence, Tuple
+from types import CodeType
+from typing import Any, Callable, Dict, IO, Iterable, Iterator, List, Mapping, MutableMapping, \
+    NamedTuple, Optional, Sequence, Set, Tuple
+
+from .cache import ConfigCache, DirectoryCache, ListingCache, SnakefileCache, \
+    default_cache_dir, translate_snakefile
+from .catalog import WorkflowCatalog
+from .discovery import expand_globs
+from .index import WorkflowIndex
+from .metadata import WorkflowMetadata, extract_metadata, metadata_from_parser
+from .profiling import Profiler, active_profiler, phase
+from .schema import ArgumentValidator, parser_schema
+from .version import __version__
 
-import pyhocon
-import snakemake.parser as snakemake_parser
-import yaml
 
-from .version import __version__
+'''The workflow arguments parsed when running Snakemake in this process, by
+token.  See :attr:`~snakeparse.api.SnakeParse.ARGUMENT_TOKEN_KEY`.'''
+_PARSED_ARGS: Dict[str, Any] = {}
+
+'''The workflow arguments parsed from arguments files in this process, keyed by
+the arguments file's path, modification time, and size, and the parser's key
+(see :meth:`~snakeparse.api.SnakeParser._memo_key`).'''
+_PARSED_ARGS_FILES: Dict[Tuple[str, int, int, str], Any] = {}
+
+'''The number of snakefiles being executed from each directory inserted into
+:data:`sys.path` (see :func:`~snakeparse.api._snakefile_dir_on_path`).'''
+_SYS_PATH_REFS: Dict[str, int] = {}
+
+'''The original index in :data:`sys.path` of each directory moved to its front,
+or None if it was not on :data:`sys.path` (see
+:func:`~snakeparse.api._snakefile_dir_on_path`).'''
+_SYS_PATH_INDICES: Dict[str, Optional[int]] = {}
+
+'''Guards :data:`sys.path` and :data:`~snakeparse.api._SYS_PATH_REFS`.'''
+_SYS_PATH_LOCK = threading.Lock()
 
 
 class _ArgumentParser(argparse.ArgumentParser):
@@ -217,17 +261,61 @@ class SnakeParser(ABC):
     def parse_config(self, config: dict) -> Any:
         '''Parses arguments from a Snakemake config object.  It is assumed the
         arguments are contained in an arguments file, whose path is stored in
-        the config with key ``SnakeParse.ARGUMENT_FILE_NAME_KEY``.'''
-        args_file = config[SnakeParse.ARGUMENT_FILE_NAME_KEY]
+        the config with key ``SnakeParse.ARGUMENT_FILE_NAME_KEY``, unless the
+        arguments were parsed in this process, in which case the token to
+        retrieve them is stored in the config with key
+        ``SnakeParse.ARGUMENT_TOKEN_KEY``, or the arguments were already parsed
+        and passed in the environment, in which case the environment variable
+        is stored in the config with key ``SnakeParse.ARGUMENT_ENV_KEY``.  A
+        copy of the arguments parsed in this process is returned each time.'''
+        env_var = config.get(SnakeParse.ARGUMENT_ENV_KEY)
+        if env_var is not None:
+            if env_var not in os.environ:
+                raise SnakeParseException(
+                    f"The workflow arguments were not found in the environment variable"
+                    f" '{env_var}'"
+                )
+            return pickle.loads(base64.b64decode(os.environ[env_var]))
+        token = config.get(SnakeParse.ARGUMENT_TOKEN_KEY)
+        if token is not None:
+            if token not in _PARSED_ARGS:
+                raise SnakeParseException(
+                    'The workflow arguments were parsed in another process and are not available'
+                    f' in this process (token: {token})'
+                )
+            return copy.copy(_PARSED_ARGS[token])
+        args_file = config.get(SnakeParse.ARGUMENT_FILE_NAME_KEY)
         if args_file is not None:
             args_file = Path(config[SnakeParse.ARGUMENT_FILE_NAME_KEY])
-            return self.parse_args_file(args_file=args_file)
+            return self._parse_args_file_memoized(args_file=args_file)
         else:
             try:
                 return self.parse_args([''])
             except SnakeParseException:
                 return argparse.Namespace()
 
+    def _parse_args_file_memoized(self, args_file: Path) -> Any:
+        '''Parses the arguments file once per process, as the snakefile may be
+        evaluated many times (ex. with ``include:``).  The arguments are read
+        from the sidecar written by :class:`~snakeparse.api.SnakeParse`, if any,
+        rather than parsed again.  A copy of the parsed arguments is returned
+        each time.'''
+        try:
+            stat = args_file.stat()
+        except OSError:
+            return self.parse_args_file(args_file=args_file)
+        key = (str(args_file.resolve()), stat.st_mtime_ns, stat.st_size, self._memo_key())
+        if key not in _PARSED_ARGS_FILES:
+            namespace = SnakeParse._read_args_sidecar(args_file=args_file, key=key)
+            if namespace is None:
+                namespace = self.parse_args_file(args_file=args_file)
+            _PARSED_ARGS_FILES[key] = namespace
+        return copy.copy(_PARSED_ARGS_FILES[key])
+
+    def _memo_key(self) -> str:
+        '''Identifies the parser when memoizing the arguments it parsed.'''
+        return type(self).__qualname__
+
     @abstractmethod
     def print_help(self, file: Optional[IO[str]]=None) -> None:
         '''Prints the help message'''
@@ -284,16 +372,46 @@ class SnakeArgumentParser(SnakeParser):
         '''Prints the help message'''
         self.parser.print_help(suppress=False, file=file)
 
+    def schema(self) -> Dict[str, Any]:
+        '''Returns the definition of the parser's arguments as plain JSON types
+        (see :mod:`~snakeparse.schema`).  The arguments cannot be validated with
+        the schema if this class overrides how they are parsed.'''
+        schema = parser_schema(parser=self.parser)
+        cls = type(self)
+        if cls.parse_args is not SnakeArgumentParser.parse_args \
+                or cls.parse_args_file is not SnakeArgumentParser.parse_args_file:
+            schema['checked'] = False
+        return schema
+
+    def _memo_key(self) -> str:
+        '''Identifies the parser by its class and arguments.'''
+        actions = [(action.dest, action.option_strings, action.nargs, action.required,
+                    getattr(action.type, '__name__', action.type))
+                   for action in self.parser._actions]
+        return f'{type(self).__qualname__}:{actions!r}'
+
 
 class SnakeParseException(Exception):
     '''The exception raised by classes in this module.'''
     pass
 
 
+def _intern_group(group: Optional[str]) -> Optional[str]:
+    '''Returns the interned group name, so that the workflows in a group share
+    a single string.'''
+    return None if group is None else sys.intern(group)
+
+
 class SnakeParseWorkflow(object):
     '''A container class for basic meta information about a workflow to be
     included on the command line.
 
+    Workflows are compact records (they have no ``__dict__``), as there may be
+    tens of thousands of them: the group names are interned, and the
+    directories containing the snakefiles are shared between the workflows in
+    a :class:`~snakeparse.api.WorkflowTable` (the snakefile's path is built
+    from its directory and file name when accessed).
+
     Keyword Arguments
     -----------------
     name : str
@@ -305,20 +423,249 @@ class SnakeParseWorkflow(object):
         line.
     description : Optional[str]
         A short description of the workflow, used when listing the workflows.
+    aliases : Optional[List[str]]
+        Optionally, other names for the workflow accepted on the command line.
+    check_exists : bool
+        False if the snakefile is already known to exist (e.g. it was found by
+        walking the file system), otherwise it is checked to exist.
     '''
 
+    __slots__ = ['name', 'aliases', '_directory', '_filename', '_group', '_description',
+                 '_loader']
+
     def __init__(self,
                  name: str,
                  snakefile: Path,
                  group: Optional[str] = None,
-                 description: Optional[str] = None) -> None:
-        self.name        = name
-        self.snakefile   = snakefile
-        self.group       = group
-        self.description = description
-        if not self.snakefile.exists():
+                 description: Optional[str] = None,
+                 aliases: Optional[List[str]] = None,
+                 check_exists: bool = True) -> None:
+        self.name         = name
+        self.snakefile    = snakefile
+        self.aliases      = [] if aliases is None else list(aliases)
+        self._group       = _intern_group(group)
+        self._description = description
+        self._loader: Optional[Callable[['SnakeParseWorkflow'], None]] = None
+        if check_exists and not self.snakefile.exists():
             raise SnakeParseException(f'Snakefile does not exists: {self.snakefile}')
 
+    @property
+    def snakefile(self) -> Path:
+        '''The path to the snakefile.'''
+        return self._directory / self._filename
+
+    @snakefile.setter
+    def snakefile(self, value: Path) -> None:
+        self._directory = value.parent
+        self._filename  = value.name
+
+    def defer(self, loader: Callable[['SnakeParseWorkflow'], None]) -> None:
+        '''Defers setting the group and description until either is first
+        accessed, at which point the loader is called once with this
+        workflow.'''
+        self._loader = loader
+
+    def _load(self) -> None:
+        if self._loader is not None:
+            loader, self._loader = self._loader, None
+            loader(self)
+
+    @property
+    def group(self) -> Optional[str]:
+        '''The name of the workflow group.'''
+        self._load()
+        return self._group
+
+    @group.setter
+    def group(self, value: Optional[str]) -> None:
+        self._group = _intern_group(value)
+
+    @property
+    def description(self) -> Optional[str]:
+        '''A short description of the workflow.'''
+        self._load()
+        return self._description
+
+    @description.setter
+    def description(self, value: Optional[str]) -> None:
+        self._description = value
+
+
+class RefreshResult(NamedTuple):
+    '''The names of the workflows added, removed, and modified by
+    :meth:`~snakeparse.api.SnakeParseConfig.refresh`.'''
+    added: List[str]
+    removed: List[str]
+    modified: List[str]
+
+    @property
+    def changed(self) -> bool:
+        '''True if any workflow was added, removed, or modified.'''
+        return bool(self.added or self.removed or self.modified)
+
+
+class WorkflowTable(MutableMapping[str, SnakeParseWorkflow]):
+    '''The workflows of a configuration, by name, in the order they were added
+    or last sorted, except that removing a workflow moves the last workflow
+    into its place.
+
+    The workflows are kept in columns (a list of names, and a list of
+    workflows in the same order) along with the position of each name, so that
+    looking up a workflow by name is a single hash lookup, iterating over the
+    workflows walks a list, sorting reorders the columns rather than building
+    a new mapping, and removing a workflow takes constant time.  The positions
+    of the workflows in each group are indexed when the groups are first used,
+    and the directories containing the snakefiles are shared between the
+    workflows in the table.
+
+    Keyword Arguments
+    -----------------
+    workflows : Optional[Mapping[str, SnakeParseWorkflow]]
+        Optionally, the workflows to add, in order.
+    '''
+
+    def __init__(self, workflows: Optional[Mapping[str, SnakeParseWorkflow]] = None) -> None:
+        self._names: List[str] = []
+        self._workflows: List[SnakeParseWorkflow] = []
+        self._positions: Dict[str, int] = {}
+        # the positions of the workflows in each group, and the group each
+        # position is indexed under, built when first needed
+        self._groups: Optional[Dict[Optional[str], Set[int]]] = None
+        self._row_groups: List[Optional[str]] = []
+        # the directories shared by the workflows, and the number of workflows
+        # in each
+        self._directories: Dict[Path, Path] = {}
+        self._directory_counts: Dict[Path, int] = {}
+        if workflows is not None:
+            for name, workflow in workflows.items():
+                self[name] = workflow
+
+    def __getitem__(self, name: str) -> SnakeParseWorkflow:
+        return self._workflows[self._positions[name]]
+
+    def __setitem__(self, name: str, workflow: SnakeParseWorkflow) -> None:
+        position = self._positions.get(name)
+        if position is None:
+            position = len(self._names)
+            self._positions[name] = position
+            self._names.append(name)
+            self._workflows.append(workflow)
+        else:
+            self._remove_row(position=position)
+            self._workflows[position] = workflow
+        self._add_row(position=position)
+
+    def __delitem__(self, name: str) -> None:
+        position = self._positions.pop(name)
+        self._remove_row(position=position)
+        last = len(self._names) - 1
+        if position != last:
+            moved = self._names[last]
+            self._names[position]     = moved
+            self._workflows[position] = self._workflows[last]
+            self._positions[moved]    = position
+            if self._groups is not None:
+                group = self._row_groups[last]
+                self._groups[group].discard(last)
+                self._groups[group].add(position)
+                self._row_groups[position] = group
+        self._names.pop()
+        self._workflows.pop()
+        if self._groups is not None:
+            self._row_groups.pop()
+
+    def _add_row(self, position: int) -> None:
+        '''Shares the directory of the workflow at the position, and indexes
+        its group if the groups are indexed.'''
+        workflow = self._workflows[position]
+        shared   = self._directories.get(workflow._directory)
+        if shared is None:
+            self._directories[workflow._directory]      = workflow._directory
+            self._directory_counts[workflow._directory] = 1
+        else:
+            workflow._directory = shared
+            self._directory_counts[shared] += 1
+        if self._groups is None:
+            return
+        # getting the group may load the workflow, discarding the index
+        group = workflow.group
+        if self._groups is not None:
+            self._groups.setdefault(group, set()).add(position)
+            if position == len(self._row_groups):
+                self._row_groups.append(group)
+            else:
+                self._row_groups[position] = group
+
+    def _remove_row(self, position: int) -> None:
+        '''Releases the directory of the workflow at the position, and removes
+        it from the index of its group.'''
+        directory = self._workflows[position]._directory
+        count = self._directory_counts.get(directory)
+        if count == 1:
+            del self._directories[directory]
+            del self._directory_counts[directory]
+        elif count is not None:
+            self._directory_counts[directory] = count - 1
+        if self._groups is not None:
+            group = self._row_groups[position]
+            rows  = self._groups[group]
+            rows.discard(position)
+            if not rows:
+                del self._groups[group]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._positions
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({self._names!r})'
+
+    def records(self) -> List[SnakeParseWorkflow]:
+        '''Returns the workflows, in order.'''
+        return list(self._workflows)
+
+    def sort(self, key: Callable[[SnakeParseWorkflow], Any]) -> None:
+        '''Sorts the workflows in place by the given key.'''
+        order = sorted(range(len(self._workflows)), key=lambda i: key(self._workflows[i]))
+        self._names     = [self._names[i] for i in order]
+        self._workflows = [self._workflows[i] for i in order]
+        self._positions = {name: index for index, name in enumerate(self._names)}
+        self.groups_changed()
+
+    def groups_changed(self) -> None:
+        '''Discards the index of the groups, to be built again when next used.
+        Must be called when the group of a workflow in the table changes.'''
+        self._groups     = None
+        self._row_groups = []
+
+    def _group_rows(self) -> Dict[Optional[str], Set[int]]:
+        '''The positions of the workflows in each group.'''
+        if self._groups is None:
+            # getting the groups may load the workflows, discarding the index
+            row_groups = [wf.group for wf in self._workflows]
+            groups: Dict[Optional[str], Set[int]] = {}
+            for position, group in enumerate(row_groups):
+                groups.setdefault(group, set()).add(position)
+            self._groups, self._row_groups = groups, row_groups
+        return self._groups
+
+    def in_group(self, group: Optional[str]) -> List[SnakeParseWorkflow]:
+        '''Returns the workflows in the given group (None for the workflows
+        without a group), in order.'''
+        rows = self._group_rows().get(group, set())
+        return [self._workflows[position] for position in sorted(rows)]
+
+    def groups(self) -> List[Optional[str]]:
+        '''Returns the groups of the workflows, in the order their first
+        workflow appears.'''
+        groups = self._group_rows()
+        return sorted(groups, key=lambda group: min(groups[group]))
+
 
 class SnakeParseConfig(object):
     '''The class used to configure SnakeParse.
@@ -340,7 +687,9 @@ class SnakeParseConfig(object):
         workflow's group name.  Only applied when searching directories for
         snakefiles, or when group name is not explicitly given.
     workflows : Dict[str, 'SnakeParseWorkflow']
-        Optionally, the list of workflows as SnakeParseWorkflow objects.
+        Optionally, the list of workflows as SnakeParseWorkflow objects.  They
+        are copied into :attr:`workflows` (a
+        :class:`~snakeparse.api.WorkflowTable`).
     groups : Dict[str, str]
         Optionally, one or more key-value pairs, with the key being the
         canonical workflow group name, and the value being a description for
@@ -348,6 +697,29 @@ class SnakeParseConfig(object):
     snakefile_globs : Optional[List[str]]
         Optionally, or more glob strings specifying where snakefile files can be
         found.
+    cache_dir : Optional[Path]
+        Optionally, the directory in which to cache the translated and compiled
+        snakefiles (see :class:`~snakeparse.cache.SnakefileCache`), and the data
+        loaded from YAML and HOCON configuration files (see
+        :class:`~snakeparse.cache.ConfigCache`).  No caching is performed if not
+        given.  The cache directory given in the configuration file is only used
+        for snakefiles.
+    lazy : bool
+        True to load the group and description of each workflow only when first
+        accessed, rather than when the configuration is created.  In this case,
+        the workflows are only sorted by group and name by
+        :meth:`~snakeparse.api.SnakeParseConfig.sort_workflows`.
+    jobs : int
+        The number of processes used to load the group and description of the
+        workflows when the configuration is created.  Not used when lazy.
+    catalog : Optional[Path]
+        Optionally, the path to a catalog of workflows built with
+        ``snakeparse build-catalog`` (see
+        :class:`~snakeparse.catalog.WorkflowCatalog`).  If given, the workflows
+        are read from the catalog, rather than from the snakefile globs and
+        workflows in the configuration file, and their snakefiles are only
+        loaded if they were modified since the catalog was built.  Workflows
+        whose snakefile was deleted since are dropped.
 
 
     NB: the values in the configuration file take precedence over the keyword
@@ -369,10 +741,14 @@ class SnakeParseConfig(object):
           workflow specified.  They object key should be the canonical
           workflow name to be displayed on the command line, with a dictionary
           of key value pairs specifying the wofklow configuration with the
-          same names as SnakeParseWorkflow (snakefile, group, and
-          description).  Only the snakefile key-value pair is required.
+          same names as SnakeParseWorkflow (snakefile, group, description,
+          and aliases).  Only the snakefile key-value pair is required.
         - groups - optional; see the similarly named keyword argument.
         - snakefile_globs -- optional; see the similarly named keyword argument.
+        - cache_dir -- optional; see the similarly named keyword argument.
+        - lazy -- optional; see the similarly named keyword argument.
+        - jobs -- optional; see the similarly named keyword argument.
+        - catalog -- optional; see the similarly named keyword argument.
     '''
 
     def __init__(self,
@@ -383,32 +759,53 @@ class SnakeParseConfig(object):
                  parent_dir_is_group_name: bool=True,
                  workflows: Dict[str, 'SnakeParseWorkflow'] = OrderedDict(),
                  groups: Dict[str, str] = OrderedDict(),
-                 snakefile_globs: Optional[List[str]] = []) -> None:
+                 snakefile_globs: Optional[List[str]] = [],
+                 cache_dir: Optional[Path] = None,
+                 lazy: bool = False,
+                 jobs: int = 1,
+                 catalog: Optional[Path] = None) -> None:
         self.prog                     = prog
         self.snakemake                = snakemake
         self.name_transform           = None
         self.parent_dir_is_group_name = parent_dir_is_group_name
-        self.workflows                = workflows
+        self.workflows                = WorkflowTable(workflows=workflows)
         self.groups                   = groups
+        self.cache: Optional[SnakefileCache] = None
+        self._index: Optional[WorkflowIndex] = None
+        # the workflow with each name or alias, so that they are unique
+        self._keys: Dict[str, str] = {}
+        for name, workflow in self.workflows.items():
+            self._add_keys(name=name, aliases=workflow.aliases)
+        self._group_index: Optional[Dict[Optional[str], List[SnakeParseWorkflow]]] = None
+        self._listings: Dict[Tuple[int, bool], str] = {}
+        self._parsers: Dict[Path, Tuple[Tuple[int, int], SnakeParser]] = {}
+        self.lazy                     = lazy
+        self.jobs                     = jobs
+        self.catalog: Optional[WorkflowCatalog] = None
+        self._catalog_current         = False
+        self.snakefile_globs: List[str] = []
+        self._directories: Optional[DirectoryCache] = None
+        # the workflows found from the snakefile globs, by snakefile
+        self._discovered: Dict[Path, str] = {}
+        # the group and description of each workflow before loading them from
+        # its snakefile, and the signature of the snakefile they were loaded from
+        self._configured: Dict[str, Tuple[Optional[str], Optional[str]]] = {
+            name: (wf._group, wf._description) for name, wf in workflows.items()
+        }
+        self._signatures: Dict[str, Tuple[int, int]] = {}
+        # the schema of each workflow's arguments stored in the catalog
+        self._schemas: Dict[str, Dict[str, Any]] = {}
 
         if config_path is None:
             data: OrderedDict = OrderedDict()
         else:
-            # Load the JSON configuration data
-            with config_path.open('r') as fh:
-                name = config_path.name
-                if name.endswith('.json'):
-                    data = json.loads(fh.read(), object_pairs_hook=OrderedDict)
-                elif name.endswith('.yaml') or name.endswith('.yml'):
-                    data = yaml.load(fh)
+            with phase('load_config'):
+                if cache_dir is not None and not config_path.name.endswith('.json'):
+                    # JSON is as fast to load as the cache
+                    data = ConfigCache(cache_dir=cache_dir).load(config_path=config_path,
+                                                                 loader=self._read_config)
                 else:
-                    try:
-                        data = pyhocon.ConfigFactory.parse_string(content=fh.read())
-                    except pyhocon.exceptions.ConfigException as e:
-                        if name.endswith('.conf'):
-                            raise e
-                        raise SnakeParseException(f"Don't know how to open a {config_path.suffix}"
-                                                  f" config file: {config_path}")
+                    data = self._read_config(config_path=config_path)
 
         ''' Basic conciguration '''
 
@@ -419,6 +816,20 @@ class SnakeParseConfig(object):
         if 'prog' in data:
             self.prog = data['prog']
 
+        # Configure where to cache translated snakefiles
+        if 'cache_dir' in data:
+            cache_dir = Path(data['cache_dir'])
+        if cache_dir is not None:
+            self.cache = SnakefileCache(cache_dir=cache_dir)
+
+        # Configure if the workflows' group and description are loaded on demand
+        if 'lazy' in data:
+            self.lazy = str(data['lazy']).lower() in ['true', 't', 'yes', 'y']
+
+        # Configure how many processes load the workflows' group and description
+        if 'jobs' in data:
+            self.jobs = int(data['jobs'])
+
         # Configure how we transform the snakefile file name to the workflow name
         if 'name_transform' in data:
             if name_transform is not None:
@@ -438,27 +849,54 @@ class SnakeParseConfig(object):
         else:
             self.parent_dir_is_group_name = False
 
-        def paths_from(maybe_glob: str) -> List[Path]:
-            if maybe_glob.startswith('/'):
-                glob_root = Path('/')
-                glob = maybe_glob[1:]
-            else:
-                glob_root = Path('.')
-                glob = maybe_glob
-            paths = [p for p in glob_root.glob(glob)]
-            if not paths:
-                raise SnakeParseException(f"No paths found from glob '{maybe_glob}'")
-            return paths
+        # Add all the workflows from the catalog, if given.  The group and
+        # description of workflows whose snakefile has not been modified are
+        # not loaded again, while workflows whose snakefile was deleted since
+        # the catalog was built are dropped.
+        if 'catalog' in data:
+            catalog = Path(data['catalog'])
+        catalogued: Set[str] = set()
+        if catalog is not None:
+            with phase('load_catalog'):
+                self.catalog = WorkflowCatalog.load(path=catalog)
+            for entry in self.catalog.entries:
+                current = entry.is_current()
+                if not current and not os.path.exists(entry.snakefile):
+                    continue
+                self.add_workflow(SnakeParseWorkflow(
+                    name=entry.name,
+                    snakefile=Path(entry.snakefile),
+                    group=entry.group if current else None,
+                    description=entry.description if current else None,
+                    aliases=entry.aliases,
+                    check_exists=not current
+                ), loaded=current)
+                self._configured[entry.name] = (None, None)
+                if current:
+                    catalogued.add(entry.name)
+                    self._signatures[entry.name] = (entry.mtime_ns, entry.size)
+                    if entry.schema is not None:
+                        self._schemas[entry.name] = entry.schema
+            for group, desc in self.catalog.groups.items():
+                self.groups.setdefault(group, desc)
+            self._catalog_current = len(catalogued) == len(self.catalog.entries)
 
         # Add all the workflows via the snakefile_globs
         if 'snakefile_globs' in data:
             snakefile_globs.extend(data['snakefile_globs'])
-        for maybe_glob in snakefile_globs:
-            for snakefile in paths_from(maybe_glob=maybe_glob):
-                self.add_snakefile(snakefile=snakefile)
+        if snakefile_globs and self.catalog is None:
+            self.snakefile_globs = list(snakefile_globs)
+            self._directories    = DirectoryCache(cache_dir=cache_dir)
+            with phase('expand_globs'):
+                snakefile_lists = self._expand_globs()
+            for maybe_glob, snakefiles in zip(snakefile_globs, snakefile_lists):
+                if not snakefiles:
+                    raise SnakeParseException(f"No paths found from glob '{maybe_glob}'")
+                for snakefile in snakefiles:
+                    self._add_discovered(snakefile=snakefile)
 
         # Configure workflows explicitly
-        if 'workflows' in data:
+        if 'workflows' in data and self.catalog is None:
             workflows = data['workflows']
             if not isinstance(workflows, list):
                 raise SnakeParseException(
@@ -487,6 +925,7 @@ class SnakeParseConfig(object):
                 snakefile   = get_existing('snakefile')
                 group       = get_existing('group')
                 description = get_existing('description')
+                aliases     = get_existing('aliases')
 
                 # snakefile
                 if 'snakefile' in workflow_data:
@@ -505,48 +944,347 @@ class SnakeParseConfig(object):
                 if group is not None:
                     self.groups[group] = None
 
-                # override description
+                # override description and aliases
                 description = workflow_data.get('description', description)
+                aliases     = workflow_data.get('aliases', aliases)
 
                 # build the workflow
                 workflow = SnakeParseWorkflow(
                     name=name,
                     snakefile=snakefile,
                     group=group,
-                    description=description
+                    description=description,
+                    aliases=aliases
                 )
+                self._add_keys(name=name, aliases=workflow.aliases)
                 self.workflows[name] = workflow
+                self._configured[name] = (group, description)
+                self._index = None
+                self._groups_changed()
 
         # Next, load the group and description from the snakeparse files, if the
-        # former values are not set.
-        for wf in self.workflows.values():
-            if wf.group is not None and wf.description is not None:
-                continue
-            parser = self.parser_from(workflow=wf)
-            if parser.group is not None:
-                wf.group = parser.group
-            if parser.description is not None:
-                wf.description = parser.description
-
-        # sort the workflows by group, then name
-        sorted_workflows = sorted(self.workflows.values(), key=lambda wf: (str(wf.group), wf.name))
-        self.workflows = OrderedDict([(wf.name, wf) for wf in sorted_workflows])
+        # former values are not set, then sort the workflows.  When lazy, this
+        # is deferred until the group or description is needed.
+        pending = [wf for wf in self.workflows.records() if wf.name not in catalogued]
+        if self.lazy:
+            for wf in pending:
+                wf.defer(loader=self.load_metadata)
+        else:
+            with phase('load_metadata'):
+                self.load_all_metadata(workflows=pending)
+            self.sort_workflows()
 
         # Add the description for each group
         if 'groups' in data:
             self.groups[group] = data['groups']
 
-    def add_workflow(self, workflow: SnakeParseWorkflow) -> 'SnakeParseWorkflow':
+    @staticmethod
+    def _read_config(config_path: Path) -> Any:
+        '''Reads the configuration data from a JSON, YAML, or HOCON file.'''
+        with config_path.open('r') as fh:
+            name = config_path.name
+            if name.endswith('.json'):
+                return json.loads(fh.read(), object_pairs_hook=OrderedDict)
+            elif name.endswith('.yaml') or name.endswith('.yml'):
+                import yaml
+                return yaml.load(fh, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
+            else:
+                import pyhocon
+                try:
+                    data = pyhocon.ConfigFactory.parse_string(content=fh.read())
+                except pyhocon.exceptions.ConfigException as e:
+                    if name.endswith('.conf'):
+                        raise e
+                    raise SnakeParseException(f"Don't know how to open a {config_path.suffix}"
+                                              f" config file: {config_path}")
+                return data.as_plain_ordered_dict()
+
+    def load_metadata(self, workflow: SnakeParseWorkflow) -> None:
+        '''Sets the group and description of the workflow from its snakefile,
+        unless both are already set.  This avoids executing the snakefile when
+        the values can be found statically.'''
+        if workflow.group is not None and workflow.description is not None:
+            return
+        self._record_signature(workflow=workflow)
+        metadata = self.metadata_from(workflow=workflow, cache=self.cache)
+        self._apply_metadata(workflow=workflow, metadata=metadata)
+        self._groups_changed()
+
+    @staticmethod
+    def _signature(snakefile: Path) -> Optional[Tuple[int, int]]:
+        '''The modification time and size of the snakefile, or None if it does
+        not exist.'''
+        try:
+            stat = os.stat(snakefile)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _record_signature(self, workflow: SnakeParseWorkflow) -> None:
+        '''Records the signature of the workflow's snakefile before its group
+        and description are loaded from it.'''
+        signature = self._signature(snakefile=workflow.snakefile)
+        if signature is not None:
+            self._signatures[workflow.name] = signature
+
+    def load_all_metadata(self, workflows: Optional[Iterable[SnakeParseWorkflow]] = None) -> None:
+        '''Sets the group and description of the given workflows, or every
+        workflow if none are given, from their snakefiles
+        (see :meth:`~snakeparse.api.SnakeParseConfig.load_metadata`).  The
+        snakefiles are loaded in ``jobs`` worker processes when more than one,
+        with the results (and the first error, if any) taken in the order of
+        the workflows, as when loading them one at a time.'''
+        if workflows is None:
+            workflows = self.workflows.records()
+        pending = [wf for wf in workflows if wf.group is None or wf.description is None]
+        jobs = min(self.jobs, len(pending))
+        if jobs <= 1:
+            for wf in pending:
+                self.load_metadata(workflow=wf)
+            return
+        cache_dir = None if self.cache is None else self.cache.cache_dir
+        for wf in pending:
+            self._record_signature(workflow=wf)
+        # import here, as importing the process pool imports multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            records = executor.map(_metadata_record,
+                                   [wf.snakefile for wf in pending],
+                                   [cache_dir] * len(pending),
+                                   chunksize=max(1, len(pending) // (jobs * 4)))
+            for wf, metadata in zip(pending, records):
+                self._apply_metadata(workflow=wf, metadata=metadata)
+            self._groups_changed()
+
+    @staticmethod
+    def _apply_metadata(workflow: SnakeParseWorkflow, metadata: WorkflowMetadata) -> None:
+        '''Sets the group and description of the workflow from the metadata, if
+        defined.'''
+        if metadata.group is not None:
+            workflow.group = metadata.group
+        if metadata.description is not None:
+            workflow.description = metadata.description
+
+    def sort_workflows(self) -> None:
+        '''Sorts the workflows by group, then name.  When lazy, this loads the
+        group and description of every workflow.'''
+        self.workflows.sort(key=lambda wf: (str(wf.group), wf.name))
+        self._groups_changed()
+
+    def add_workflow(self,
+                     workflow: SnakeParseWorkflow,
+                     loaded: bool = False) -> 'SnakeParseWorkflow':
         '''Adds the workflow to the list of workflows.  A workflow with the same
-        name should not exist.'''
+        name should not exist.  When lazy, the group and description are loaded
+        from the snakefile when first accessed, unless ``loaded`` is True (e.g.
+        they were read from an up-to-date catalog).'''
         if workflow.name in self.workflows:
             raise SnakeParseException(f"Multiple workflows with name '{workflow.name}'.")
+        self._add_keys(name=workflow.name, aliases=workflow.aliases)
+        if self.lazy and not loaded:
+            workflow.defer(loader=self.load_metadata)
         self.workflows[workflow.name] = workflow
+        self._configured[workflow.name] = (workflow._group, workflow._description)
+        self._index = None
+        self._groups_changed()
         return workflow
 
-    def add_snakefile(self, snakefile: Path) -> 'SnakeParseWorkflow':
+    def _add_keys(self, name: str, aliases: List[str]) -> None:
+        '''Records the name and aliases of a workflow, which must not be the name
+        or alias of another workflow.'''
+        keys = [name] + [alias for alias in aliases if alias != name]
+        for key in keys:
+            if self._keys.get(key, name) != name:
+                raise SnakeParseException(f"Multiple workflows with name or alias '{key}'.")
+        for key in keys:
+            self._keys[key] = name
+
+    def _remove_workflow(self, name: str) -> None:
+        '''Removes the workflow with the given name.'''
+        workflow = self.workflows.pop(name)
+        for key in [name] + workflow.aliases:
+            if self._keys.get(key) == name:
+                del self._keys[key]
+        self._configured.pop(name, None)
+        self._signatures.pop(name, None)
+        self._schemas.pop(name, None)
+        self._parsers.pop(workflow.snakefile, None)
+        self._index = None
+        self._groups_changed()
+
+    def _expand_globs(self) -> List[List[Path]]:
+        '''Finds the snakefiles matching each of the snakefile globs.'''
+        try:
+            return expand_globs(globs=self.snakefile_globs, cache=self._directories)
+        except ValueError as e:
+            raise SnakeParseException(str(e))
+
+    def _add_discovered(self, snakefile: Path) -> 'SnakeParseWorkflow':
+        '''Adds the workflow for a snakefile found from the snakefile globs.'''
+        # found by walking the file system, so known to exist
+        workflow = self.add_snakefile(snakefile=snakefile, check_exists=False)
+        self._discovered[snakefile] = workflow.name
+        return workflow
+
+    def refresh(self) -> 'RefreshResult':
+        '''Brings the workflows up to date with the snakefiles, without
+        creating the configuration again:
+
+            - the workflows whose snakefiles no longer match the snakefile globs
+              are removed, and those for new snakefiles are added;
+            - the group and description of each workflow whose snakefile was
+              modified since they were loaded from it are loaded again.
+
+        Only the added and modified snakefiles are loaded (when first needed,
+        if lazy), and the workflows are sorted again (unless lazy).  Only the
+        directories modified since the globs were last expanded are listed
+        again.  Returns the names of the workflows added, removed, and
+        modified.'''
+        added: List[SnakeParseWorkflow] = []
+        removed: List[str] = []
+        modified: List[SnakeParseWorkflow] = []
+
+        if self.snakefile_globs:
+            with phase('expand_globs'):
+                found = [snakefile for snakefiles in self._expand_globs()
+                         for snakefile in snakefiles]
+            found_set = set(found)
+            for snakefile, name in list(self._discovered.items()):
+                if snakefile in found_set:
+                    continue
+                del self._discovered[snakefile]
+                workflow = self.workflows.get(name)
+                if workflow is not None and workflow.snakefile == snakefile:
+                    self._remove_workflow(name=name)
+                    removed.append(name)
+            for snakefile in found:
+                if snakefile not in self._discovered:
+                    added.append(self._add_discovered(snakefile=snakefile))
+
+        for name, signature in list(self._signatures.items()):
+            workflow = self.workflows[name]
+            current = self._signature(snakefile=workflow.snakefile)
+            if current is None or current == signature:
+                continue
+            del self._signatures[name]
+            self._schemas.pop(name, None)
+            workflow.group, workflow.description = self._configured.get(name, (None, None))
+            modified.append(workflow)
+
+        pending = added + modified
+        if self.lazy:
+            for wf in pending:
+                wf.defer(loader=self.load_metadata)
+        else:
+            with phase('load_metadata'):
+                self.load_all_metadata(workflows=pending)
+        if added or removed or modified:
+            self._catalog_current = False
+            self._groups_changed()
+            if not self.lazy:
+                self.sort_workflows()
+        return RefreshResult(added=[wf.name for wf in added], removed=removed,
+                             modified=[wf.name for wf in modified])
+
+    @property
+    def index(self) -> WorkflowIndex:
+        '''The index used to resolve workflow names and aliases given on the
+        command line.  It is built when first used after workflows are added
+        with :meth:`~snakeparse.api.SnakeParseConfig.add_workflow`.'''
+        if self._index is None:
+            self._index = WorkflowIndex(
+                names=self.workflows.keys(),
+                aliases={name: wf.aliases for name, wf in self.workflows.items()}
+            )
+        return self._index
+
+    @property
+    def group_index(self) -> Dict[Optional[str], List[SnakeParseWorkflow]]:
+        '''The workflows in each group, with the configured groups first, then
+        the other groups in the order their first workflow appears.  It is
+        built when first used after workflows or groups are added, sorted, or
+        their metadata loaded.'''
+        if self._group_index is None:
+            index: Dict[Optional[str], List[SnakeParseWorkflow]] = OrderedDict(
+                (group, []) for group in self.groups
+            )
+            for wf in self.workflows.records():
+                index.setdefault(wf.group, []).append(wf)
+            self._group_index = index
+        return self._group_index
+
+    def _groups_changed(self) -> None:
+        '''Discards the group indices and the rendered workflow listings.'''
+        self._group_index = None
+        self._listings.clear()
+        self.workflows.groups_changed()
+
+    def workflow_listing(self, columns: int, debug: bool = False) -> str:
+        '''Renders the listing of the available workflows, grouped by group,
+        for a terminal with the given number of columns.
+
+        The listing is kept until the workflows or groups change.  When every
+        workflow comes from an up-to-date catalog, the listing is also cached
+        on disk, keyed by the catalog's content, the groups, the number of
+        columns, and whether the snakefiles are listed (``debug``), so that
+        printing the usage costs little more than reading the cached text.'''
+        key = (columns, debug)
+        listing = self._listings.get(key)
+        if listing is not None:
+            return listing
+        disk_key = self._listing_cache_key(columns=columns, debug=debug)
+        if disk_key is not None:
+            assert self.cache is not None
+            listing = ListingCache(cache_dir=self.cache.cache_dir).get(key=disk_key)
+        if listing is None:
+            listing = self._render_listing(columns=columns, debug=debug)
+            if disk_key is not None:
+                assert self.cache is not None
+                ListingCache(cache_dir=self.cache.cache_dir).put(key=disk_key, listing=listing)
+        self._listings[key] = listing
+        return listing
+
+    def _listing_cache_key(self, columns: int, debug: bool) -> Optional[str]:
+        '''The key of the listing cached on disk, or None if the listing should
+        not be cached on disk.'''
+        catalog = self.catalog
+        if self.cache is None or catalog is None or catalog.digest is None \
+                or not self._catalog_current or len(self.workflows) != len(catalog.entries):
+            return None
+        groups = json.dumps(list(self.groups.items()))
+        return f'{catalog.digest}:{columns}:{debug}:{groups}'
+
+    def _render_listing(self, columns: int, debug: bool) -> str:
+        '''Renders the listing of the available workflows, in a single pass
+        over the group index.'''
+        group_name_columns = 38  # includes the colon
+        group_description_columns = columns - group_name_columns
+        workflow_name_columns = group_name_columns - 3
+        workflow_description_columns = group_description_columns - 1
+        line = ('-' * 60) + '\n'
+
+        if not self.workflows:
+            return '\nNo workflows configured.\n' + line
+
+        parts = ['\nAvailable Workflows:\n', line]
+        for group, workflows in self.group_index.items():
+            name = ('Worfklows' if group is None else group) + ':'
+            desc = None if group is None else self.groups.get(group)
+            desc = '' if desc is None else desc
+            parts.append(f'{name:<{group_name_columns}}{desc:<{group_description_columns}}\n')
+            for wf in workflows:
+                desc = str(wf.snakefile) if wf.description is None else wf.description
+                parts.append(f'    {wf.name:<{workflow_name_columns}}'
+                             f'{desc:<{workflow_description_columns}}\n')
+                if debug:
+                    parts.append(f'        snakefile:  {wf.snakefile}\n')
+            parts.append(line)
+        return ''.join(parts)
+
+    def add_snakefile(self, snakefile: Path, check_exists: bool = True) -> 'SnakeParseWorkflow':
         '''Adds a new workflow with the given snakefile. A workflow with the
-        same name should not exist.'''
+        same name should not exist.  The snakefile is checked to exist unless
+        ``check_exists`` is ``False``.'''
         name        = snakefile.with_suffix('').name
         if self.name_transform is not None:
             name = self.name_transform(name)
@@ -560,7 +1298,8 @@ class SnakeParseConfig(object):
             name=name,
             snakefile=snakefile,
             group=group,
-            description=description
+            description=description,
+            check_exists=check_exists
         )
         return self.add_workflow(workflow=workflow)
 
@@ -570,6 +1309,7 @@ class SnakeParseConfig(object):
         if strict and name in self.groups:
             raise SnakeParseException(f"Group '{name}' already defined")
         self.groups[name] = description
+        self._groups_changed()
         return self
 
     @staticmethod
@@ -600,36 +1340,114 @@ class SnakeParseConfig(object):
         first_char = camel_str[0].lower()
         return first_char + ''.join(['_' + c.lower() if c.isupper() else c for c in camel_str[1:]])
 
+    def parser_for(self, workflow: 'SnakeParseWorkflow') -> SnakeParser:
+        '''Returns the SnakeParser for the given workflow, re-using the parser
+        built previously by this configuration if the workflow's snakefile has
+        not been modified since (by modification time and size).'''
+        snakefile = workflow.snakefile.resolve()
+        stat = snakefile.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self._parsers.get(snakefile)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        parser = self.parser_from(workflow=workflow, cache=self.cache)
+        self._parsers[snakefile] = (signature, parser)
+        return parser
+
+    def validator_for(self, workflow: 'SnakeParseWorkflow') -> Optional[ArgumentValidator]:
+        '''Returns the validator for the workflow's arguments, compiled from
+        the schema stored in the catalog, or None if no schema is stored (or
+        the workflow's snakefile was modified since the catalog was built).'''
+        schema = self._schemas.get(workflow.name)
+        return None if schema is None else ArgumentValidator(schema=schema)
+
+    @staticmethod
+    def parser_from(workflow: 'SnakeParseWorkflow',
+                    cache: Optional[SnakefileCache] = None) -> SnakeParser:
+        '''Builds the SnakeParser for the given workflow.  If a cache is given,
+        the translated snakefile will be retrieved from or stored in the
+        cache.'''
+        code = SnakeParseConfig._translate(workflow=workflow, cache=cache)[1]
+        return SnakeParseConfig._parser_from_code(workflow=workflow, code=code)
+
     @staticmethod
-    def parser_from(workflow: 'SnakeParseWorkflow') -> SnakeParser:
-        '''Builds the SnakeParser for the given workflow'''
+    def metadata_from(workflow: 'SnakeParseWorkflow',
+                      cache: Optional[SnakefileCache] = None) -> WorkflowMetadata:
+        '''Returns the metadata (group, description, and arguments) for the given
+        workflow.  The metadata is extracted from the snakefile without
+        executing it when possible, otherwise the SnakeParser is built.'''
+        source, code = SnakeParseConfig._translate(workflow=workflow, cache=cache)
+        with phase('extract_metadata', workflow=workflow.name):
+            metadata = extract_metadata(source=source)
+        if metadata is None:
+            parser = SnakeParseConfig._parser_from_code(workflow=workflow, code=code)
+            metadata = metadata_from_parser(parser=parser)
+        return metadata
+
+    @staticmethod
+    def _translate(workflow: 'SnakeParseWorkflow',
+                   cache: Optional[SnakefileCache] = None) -> Tuple[str, CodeType]:
+        '''Translates the snakefile using snakemake's parse method, using the
+        cache if given.'''
+        with phase('translate', workflow=workflow.name):
+            if cache is None:
+                return translate_snakefile(snakefile=workflow.snakefile)
+            else:
+                return cache.translate(snakefile=workflow.snakefile)
+
+    @staticmethod
+    def _parser_from_code(workflow: 'SnakeParseWorkflow', code: CodeType) -> SnakeParser:
+        '''Builds the SnakeParser for the given workflow by executing the
+        compiled snakefile.'''
 
         # Insert the directory containing the snakefile file so that relative
-        # imports work and imports in the snakefile directory
-        parent_module_name = str(workflow.snakefile.resolve().parent)
-        sys.path.insert(0, parent_module_name)
+        # imports work and imports in the snakefile directory, while the parser
+        # is built
+        with _snakefile_dir_on_path(directory=str(workflow.snakefile.resolve().parent)):
+            return SnakeParseConfig._exec_parser(workflow=workflow, code=code)
 
-        exec_exception = None
+    @staticmethod
+    def _exec_parser(workflow: 'SnakeParseWorkflow', code: CodeType) -> SnakeParser:
+        '''Executes the snakefile to build its parser, with a stub of Snakemake's
+        workflow object (see :class:`~snakeparse.api._WorkflowStub`), unless the
+        snakefile uses more of the workflow object than the stub provides, in
+        which case the snakefile is executed again with Snakemake's.'''
+        snakefile = str(workflow.snakefile)
+        try:
+            return SnakeParseConfig._exec_parser_with(
+                workflow=workflow, code=code, workflow_object=_WorkflowStub(snakefile=snakefile)
+            )
+        except _WorkflowStubError:
+            # import here, as Snakemake's workflow is slow to import
+            from snakemake.workflow import Workflow
+            return SnakeParseConfig._exec_parser_with(
+                workflow=workflow, code=code, workflow_object=Workflow(snakefile=snakefile)
+            )
 
-        # Compile and execute it!
-        from snakemake.workflow import Workflow
+    @staticmethod
+    def _exec_parser_with(workflow: 'SnakeParseWorkflow',
+                          code: CodeType,
+                          workflow_object: Any) -> SnakeParser:
+        exec_exception = None
 
         snakefile = str(workflow.snakefile)
 
-        # create a config with an undefined argument file so that parsing is skipped
-        global config
-        config = dict([(SnakeParse.ARGUMENT_FILE_NAME_KEY, None)])  # type: ignore
-        # add the config to a globals copy
-        globals_copy = dict(globals())
-        globals_copy['config'] = dict([(SnakeParse.ARGUMENT_FILE_NAME_KEY, None)])
-        # parsing with snakemake requires there to be a global workflow object
-        globals_copy['workflow'] = Workflow(snakefile=snakefile)
-
-        # compile the snakefile using snakemake's parse method
-        code, linemap, rulecount = snakemake_parser.parse(snakefile)
-        code = compile(code, snakefile, 'exec')
+        # a minimal namespace, with a config with an undefined argument file so
+        # that parsing is skipped, and the global workflow object required when
+        # parsing with snakemake
+        namespace: Dict[str, Any] = {
+            '__builtins__': builtins,
+            '__name__': __name__,
+            'config': dict([(SnakeParse.ARGUMENT_FILE_NAME_KEY, None)]),
+            'workflow': workflow_object
+        }
+
+        # Execute it!
         try:
-            exec(code, globals_copy)
+            with phase('exec', workflow=workflow.name):
+                exec(code, namespace)
+        except _WorkflowStubError:
+            raise
         except Exception as e:
             # in the case of required parser arguments, we may get some type
             # of exception
@@ -645,8 +1463,8 @@ class SnakeParseConfig(object):
         def methods_predicate(key: str, obj: Any) -> bool:
             return key == 'snakeparser' and inspect.isfunction(obj)
 
-        classes = [obj for key, obj in globals_copy.items() if classes_predicate(obj)]
-        methods = [obj for key, obj in globals_copy.items() if methods_predicate(key, obj)]
+        classes = [obj for key, obj in namespace.items() if classes_predicate(obj)]
+        methods = [obj for key, obj in namespace.items() if methods_predicate(key, obj)]
         if len(classes) + len(methods) == 0:
             raise SnakeParseException(
                 'Could not find either a concrete subclass of SnakeParser or a method named'
@@ -708,6 +1526,69 @@ class SnakeParseConfig(object):
                                  ' the parent directory of the snakefile as the group name',
                             type=bool,
                             default=False)
+        parser.add_argument('--cache-dir',
+                            help='The directory in which to cache translated snakefiles'
+                                 f' (default: {default_cache_dir()})',
+                            type=Path)
+        parser.add_argument('--no-cache',
+                            help='Do not cache translated snakefiles',
+                            action='store_true')
+        parser.add_argument('--lazy',
+                            help='Only load the group and description of a workflow when listing'
+                                 ' workflows, so that running a workflow loads only its snakefile',
+                            action='store_true')
+        parser.add_argument('--catalog',
+                            help="The path to a catalog of workflows built with 'snakeparse"
+                                 " build-catalog', used instead of finding and loading the"
+                                 " snakefiles",
+                            type=Path)
+        parser.add_argument('--load-jobs',
+                            help='The number of processes used to load the workflows',
+                            type=int,
+                            default=1)
+        parser.add_argument('--in-process',
+                            help='Run Snakemake in this process with its python API, rather than'
+                                 ' in a separate Snakemake process',
+                            action='store_true')
+        parser.add_argument('--args-transport',
+                            help="How the workflow arguments are passed to Snakemake: 'file'"
+                                 " writes them to a temporary file, while 'env' passes the parsed"
+                                 " arguments in an environment variable",
+                            choices=SnakeParse.TRANSPORTS)
+        parser.add_argument('--args-sidecar',
+                            help="Also write the parsed workflow arguments next to the arguments"
+                                 " file, so that snakefiles do not parse them again",
+                            action='store_true')
+        parser.add_argument('--concurrency',
+                            help="The maximum number of Snakemake runs at a time when running a"
+                                 " batch, or invocations separated by '++' (default: one for a"
+                                 " batch, otherwise all)",
+                            type=int)
+        parser.add_argument('--total-cores',
+                            help="The number of cores split across the Snakemake runs that do not"
+                                 " give --cores, when running a batch, or invocations separated"
+                                 " by '++' (default: none for a batch, otherwise the number of"
+                                 " available cores)",
+                            type=int)
+        parser.add_argument('--fail-fast',
+                            help="Stop all the Snakemake runs once one fails, when running a"
+                                 " batch, or invocations separated by '++', rather than running"
+                                 " every invocation to completion",
+                            action='store_true')
+        parser.add_argument('--profile-startup',
+                            help='Print the time taken by each phase of startup (and by'
+                                 ' Snakemake) to standard error once Snakemake exits.  Setting'
+                                 f' the {Profiler.ENV_VAR} environment variable to 1 does the'
+                                 ' same, while setting it to a path also writes the JSON report'
+                                 ' to that path',
+                            action='store_true')
+        parser.add_argument('--profile-json',
+                            help='Profile startup, and write the report as JSON to this path',
+                            type=Path)
+        parser.add_argument('--profile-cprofile',
+                            help='Profile startup, and also profile with cProfile, writing the'
+                                 ' statistics to this path',
+                            type=Path)
         parser.add_argument('--extra-help',
                             help='Produce help with extra debugging information',
                             type=bool,
@@ -715,6 +1596,114 @@ class SnakeParseConfig(object):
         return parser
 
 
+class _WorkflowStubError(AttributeError):
+    '''Raised by :class:`~snakeparse.api._WorkflowStub` for attributes of
+    Snakemake's workflow object that it does not provide.'''
+    pass
+
+
+class _WorkflowStub(object):
+    '''Stands in for Snakemake's workflow object when executing a snakefile to
+    build its parser: the rules, and the other directives, are ignored, so that
+    Snakemake's workflow need not be imported or created.'''
+
+    __slots__ = ['snakefile', 'basedir', 'current_basedir']
+
+    '''The directives the translated snakefile may call, which are ignored.
+    Any other attribute (e.g. ``workflow.cores``) is not known without
+    Snakemake's workflow, so raises a
+    :class:`~snakeparse.api._WorkflowStubError`.'''
+    DIRECTIVES = frozenset([
+        # rules, and their keywords
+        'rule', 'input', 'output', 'params', 'wildcard_constraints', 'message', 'benchmark',
+        'conda', 'singularity', 'container', 'containerized', 'envmodules', 'threads',
+        'shadow', 'resources', 'priority', 'version', 'log', 'cache_rule', 'handover',
+        'default_target_rule', 'retries', 'name', 'group', 'docstring', 'norun', 'shellcmd',
+        'script', 'notebook', 'wrapper', 'cwl', 'template_engine', 'localrule', 'userule',
+        'module',
+        # global directives
+        'include', 'workdir', 'configfile', 'pepfile', 'pepschema', 'report', 'ruleorder',
+        'localrules', 'subworkflow', 'global_wildcard_constraints', 'global_singularity',
+        'global_container', 'global_containerized', 'global_conda', 'register_envvars'
+    ])
+
+    def __init__(self, snakefile: str) -> None:
+        self.snakefile       = os.path.abspath(snakefile)
+        self.basedir         = os.path.dirname(self.snakefile)
+        self.current_basedir = self.basedir
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        if name in _WorkflowStub.DIRECTIVES:
+            return _WorkflowStub._directive
+        raise _WorkflowStubError(f"'workflow.{name}' is not available when building the parser"
+                                 f" of {self.snakefile}")
+
+    @staticmethod
+    def _directive(*args: Any, **kwargs: Any) -> Callable[[Any], Any]:
+        '''A directive (e.g. ``workflow.rule(...)`` or ``workflow.input(...)``)
+        that returns a decorator that ignores the decorated function.'''
+        return _WorkflowStub._decorator
+
+    @staticmethod
+    def _decorator(func: Any) -> Any:
+        '''A decorator used without arguments (e.g. ``workflow.run``).'''
+        return func
+
+    run       = _decorator
+    onstart   = _decorator
+    onsuccess = _decorator
+    onerror   = _decorator
+
+
+@contextmanager
+def _snakefile_dir_on_path(directory: str) -> Iterator[None]:
+    '''Moves the directory to the front of :data:`sys.path`, so that modules
+    next to the snakefile take precedence, and restores :data:`sys.path`
+    afterwards once no other snakefile in the directory is being executed, so
+    that :data:`sys.path` does not grow with the number of snakefiles loaded.'''
+    with _SYS_PATH_LOCK:
+        if directory in _SYS_PATH_REFS:
+            _SYS_PATH_REFS[directory] += 1
+        else:
+            index = sys.path.index(directory) if directory in sys.path else None
+            if index is not None:
+                del sys.path[index]
+            sys.path.insert(0, directory)
+            _SYS_PATH_REFS[directory]    = 1
+            _SYS_PATH_INDICES[directory] = index
+    try:
+        yield
+    finally:
+        with _SYS_PATH_LOCK:
+            _SYS_PATH_REFS[directory] -= 1
+            if _SYS_PATH_REFS[directory] == 0:
+                del _SYS_PATH_REFS[directory]
+                index = _SYS_PATH_INDICES.pop(directory)
+                if directory in sys.path:
+                    sys.path.remove(directory)
+                if index is None:
+                    sys.path_importer_cache.pop(directory, None)
+                else:
+                    sys.path.insert(index, directory)
+
+
+def _unlink_quietly(path: Path) -> None:
+    '''Removes the file, if it still exists.  Used to remove the files written
+    by :class:`~snakeparse.api.SnakeParse` once it is no longer needed.'''
+    try:
+        path.unlink()
+    except OSError:
+        pass
+
+
+def _metadata_record(snakefile: Path, cache_dir: Optional[Path]) -> WorkflowMetadata:
+    '''Returns the metadata for the snakefile.  Used by the worker processes in
+    :meth:`~snakeparse.api.SnakeParseConfig.load_all_metadata`.'''
+    workflow = SnakeParseWorkflow(name=snakefile.name, snakefile=snakefile)
+    cache = None if cache_dir is None else SnakefileCache(cache_dir=cache_dir)
+    return SnakeParseConfig.metadata_from(workflow=workflow, cache=cache)
+
+
 class SnakeParse(object):
     '''The main entry point for command-line parsing for Snakemake.
 
@@ -728,19 +1717,79 @@ class SnakeParse(object):
         Print extra debuggin information in the parser's help message.
     file : TextIOWrapper
         The file to write any error or help messages, defaults to sys.stdout.
+    in_process : bool
+        True to run Snakemake with its python API in this process, rather than
+        in a separate Snakemake process.  The parsed workflow arguments are then
+        given directly to the snakefile, rather than through a file.  In this
+        case, the configured path to the Snakemake executable is not used, and
+        snakefiles evaluated in other processes (ex. cluster jobs) cannot
+        retrieve the parsed workflow arguments.
+    transport : str
+        How the workflow arguments are passed to Snakemake when run in a
+        separate process: 'file' writes the arguments to a temporary file that
+        is parsed again by the snakefile, while 'env' passes the already parsed
+        arguments in the ``SNAKEPARSE_ARGS`` environment variable, so no file is
+        written and they are not parsed again.  With 'env', the arguments are
+        only available to snakefiles evaluated in processes that inherit the
+        environment.  If the parsed arguments cannot be pickled, or are too
+        large for an environment variable (see
+        :attr:`~snakeparse.api.SnakeParse.ARGUMENT_ENV_MAX_BYTES`), 'file' is
+        used.
+    args_sidecar : bool
+        True to also write the parsed arguments next to the arguments file when
+        using the 'file' transport, so that snakefiles read them rather than
+        parse the arguments file again.
     '''
 
     '''The default key to use in Snakemake's config dictionary.'''
     ARGUMENT_FILE_NAME_KEY = 'snakeparse_args_file'
 
+    '''The key in Snakemake's config dictionary for the token used to retrieve
+    arguments parsed in the same process.'''
+    ARGUMENT_TOKEN_KEY = 'snakeparse_args_token'
+
+    '''The key in Snakemake's config dictionary for the name of the environment
+    variable with the parsed arguments.'''
+    ARGUMENT_ENV_KEY = 'snakeparse_args_env'
+
+    '''The environment variable with the parsed arguments, when passed in the
+    environment.'''
+    ARGUMENT_ENV_VAR = 'SNAKEPARSE_ARGS'
+
+    '''The maximum size of the encoded parsed arguments passed in the
+    environment.  Linux limits each environment string to 128 KiB, and the
+    environment and command line together to a few MiB, so larger arguments
+    are passed in a file instead.'''
+    ARGUMENT_ENV_MAX_BYTES = 64 * 1024
+
+    '''The ways the workflow arguments can be passed to Snakemake.'''
+    TRANSPORTS = ['file', 'env']
+
     def __init__(self,
                  args: List[str]=[],
                  config: Optional['SnakeParseConfig']=None,
                  debug: bool = False,
-                 file: IO[str] = sys.stdout) -> None:
-        self.config = config
-        self.debug  = debug
-        self.file   = file
+                 file: IO[str] = sys.stdout,
+                 in_process: bool = False,
+                 transport: str = 'file',
+                 args_sidecar: bool = False) -> None:
+        started           = time.perf_counter()
+        self.config       = config
+        self.debug        = debug
+        self.file         = file
+        self.in_process   = in_process
+        self.transport    = transport
+        self.args_sidecar = args_sidecar
+        if transport not in SnakeParse.TRANSPORTS:
+            raise SnakeParseException(f"Unknown transport '{transport}'")
+
+        # the profiler started by (and reported by) this instance, if any
+        self.profiler: Optional[Profiler] = None
+        self.profile_json: Optional[Path] = None
+        profile_env = os.environ.get(Profiler.ENV_VAR, '')
+        if profile_env not in ['', '0'] and active_profiler() is None:
+            self._start_profiler(origin=started,
+                                 json_path=None if profile_env == '1' else Path(profile_env))
 
         # sets whether or not to output the SnakeParseConfig usage as part of the general
         # usage
@@ -760,9 +1809,10 @@ class SnakeParse(object):
             # parse the leading arguments until an unknonwn argument is found or no more
             # arguments exist.  Prepend an arg for argparse to work.
             try:
-                args_end, config_args = self._parse_known_args(
-                    args=args,
-                    parser=SnakeParseConfig.config_parser(usage=SnakeParse.usage_short()))
+                with phase('parse_options'):
+                    args_end, config_args = self._parse_known_args(
+                        args=args,
+                        parser=SnakeParseConfig.config_parser(usage=SnakeParse.usage_short()))
                 remaining_args = args[args_end:]
             except SnakeParseException as e:
                 self._usage(message=str(e))
@@ -773,19 +1823,26 @@ class SnakeParse(object):
                 self._usage(message=None)
                 sys.exit(2)
 
+            # Start profiling if requested, including the time to parse the options
+            profile = config_args.profile_startup or config_args.profile_json is not None \
+                or config_args.profile_cprofile is not None
+            if profile and active_profiler() is None:
+                profiler = self._start_profiler(origin=started,
+                                                json_path=config_args.profile_json,
+                                                cprofile=config_args.profile_cprofile)
+                profiler.record(name='parse_options', start=started, end=time.perf_counter())
+
             # Create the config
-            self.config = SnakeParseConfig(
-                config_path              = config_args.config,
-                prog                     = config_args.prog,
-                snakemake                = config_args.snakemake,
-                name_transform           = config_args.name_transform,
-                parent_dir_is_group_name = config_args.parent_dir_is_group_name,
-                snakefile_globs          = config_args.snakefile_globs
-            )
+            with phase('create_config'):
+                self.config = self._config_from(config_args=config_args)
 
             # Remove the arguments used by snakeparse
             args  = remaining_args
             self.debug = debug or config_args.extra_help
+            self.in_process = in_process or config_args.in_process
+            if config_args.args_transport is not None:
+                self.transport = config_args.args_transport
+            self.args_sidecar = args_sidecar or config_args.args_sidecar
 
         assert self.config is not None
 
@@ -825,18 +1882,31 @@ class SnakeParse(object):
         ------------------------------------------------------------------------
         Find the name of the workflow to execute.  If we find '--' in args, then
         either we have one workflow (use its name), or the workflow name is the
-        argument immediately after the '--'.  Otherwise, go through the
-        available workflows, and find the first one whose name is in args.
+        argument immediately after the '--'.  Otherwise, find the first argument
+        that is the name (or alias) of a workflow.  Names are resolved with the
+        configuration's index, so the cost does not depend on the number of
+        workflows.
         '''
+        try:
+            index = self.config.index
+        except SnakeParseException as e:
+            # the workflows' names or aliases were changed after being added
+            self._usage(message=str(e))
+            sys.exit(2)
         if workflow_name is not None:
             # already set above
             pass
         elif '--' in args:
-            # Check if the workflow name is _after_ the '--'
+            # Check if the workflow name is _after_ the '--'.  When there are
+            # multiple workflows, only a workflow name may follow, so it may
+            # also be given ignoring case or as a unique prefix.
             idx = args.index('--')
             if idx + 1 < len(args):
-                name = args[idx + 1]
-                if name in self.config.workflows:
+                if len(self.config.workflows) == 1:
+                    name = index.get(args[idx + 1])
+                else:
+                    name = index.resolve(args[idx + 1])
+                if name is not None:
                     workflow_name = name
                     snakemake_args_end = idx
                     workflow_args_start = idx + 2
@@ -845,16 +1915,17 @@ class SnakeParse(object):
                 snakemake_args_end = idx
                 workflow_args_start = idx + 1
         elif args:
-            # find workflow name in args, use it
-            for wf_name in self.config.workflows:
-                if wf_name in args:
-                    workflow_name       = wf_name
-                    snakemake_args_end  = args.index(wf_name)
-                    workflow_args_start = args.index(wf_name) + 1
+            # find the first argument that names a workflow, use it
+            for idx, arg in enumerate(args):
+                name = index.get(arg)
+                if name is not None:
+                    workflow_name       = name
+                    snakemake_args_end  = idx
+                    workflow_args_start = idx + 1
+                    break
 
         if workflow_name is None:
-            # TODO: search in args for any similar workflow now and suggest it
-            self._usage('No workflow given.')
+            self._usage(self._no_workflow_message(args=args))
         self.snakemake_args = args[:snakemake_args_end]
         workflow_args  = args[workflow_args_start:]
 
@@ -868,40 +1939,311 @@ class SnakeParse(object):
              --config <ARGUMENT_FILE_NAME_KEY>=<file>
         4. Add the Snakemake argument for the snakefile if necessary:
              --snakefile <workflow.snakefile>
+
+        When running in-process, the parsed arguments are instead kept in
+        memory, and only a token to retrieve them is given to Snakemake:
+             --config <ARGUMENT_TOKEN_KEY>=<token>
+
+        When passing the arguments in the environment, the parsed arguments
+        are instead serialized to an environment variable for Snakemake:
+             --config <ARGUMENT_ENV_KEY>=<ARGUMENT_ENV_VAR>
         '''
         self.workflow = self.config.workflows[workflow_name]
-        # 1. Write the workflow arguments to a file
-        with tempfile.NamedTemporaryFile('w', suffix='.args.txt', delete=False) as fh:
-            for arg in workflow_args:
-                fh.write(arg + '\n')
-            self.snakeparse_args_file = Path(fh.name)
-        # 2. Parse with snakeparse
-        self._parse_workflow_args(workflow=self.workflow,
-                                  args_file=Path(self.snakeparse_args_file).resolve())
-        # 3. Add the custom config argument.
-        self.snakemake_args.extend(
-            ['--config', f"{SnakeParse.ARGUMENT_FILE_NAME_KEY}={self.snakeparse_args_file}"]
-        )
+        self.snakeparse_args_file: Optional[Path] = None
+        self.snakeparse_args_sidecar: Optional[Path] = None
+        self.snakeparse_args_token: Optional[str] = None
+        self.snakemake_env: Dict[str, str] = {}
+        encoded: Optional[str] = None
+        if self.in_process or self.transport == 'env':
+            namespace = self._parse_workflow_args(workflow=self.workflow, args=workflow_args)
+            if not self.in_process:
+                encoded = self._encode_namespace(namespace=namespace)
+        if self.in_process:
+            self.snakeparse_args_token = f'snakeparse-{uuid.uuid4().hex}'
+            _PARSED_ARGS[self.snakeparse_args_token] = namespace
+            # released when no longer needed, even if never run
+            weakref.finalize(self, _PARSED_ARGS.pop, self.snakeparse_args_token, None)
+            self.snakemake_args.extend(
+                ['--config', f"{SnakeParse.ARGUMENT_TOKEN_KEY}={self.snakeparse_args_token}"]
+            )
+        elif encoded is not None:
+            self.snakemake_env[SnakeParse.ARGUMENT_ENV_VAR] = encoded
+            self.snakemake_args.extend(
+                ['--config', f"{SnakeParse.ARGUMENT_ENV_KEY}={SnakeParse.ARGUMENT_ENV_VAR}"]
+            )
+        else:
+            # 1. Write the workflow arguments to a file
+            with tempfile.NamedTemporaryFile('w', suffix='.args.txt', delete=False) as fh:
+                for arg in workflow_args:
+                    fh.write(arg + '\n')
+                self.snakeparse_args_file = Path(fh.name)
+            # removed when no longer needed, even if never run
+            weakref.finalize(self, _unlink_quietly, self.snakeparse_args_file)
+            # 2. Parse with snakeparse, removing the file if parsing fails.  The
+            #    parser need not be built if the arguments are valid according
+            #    to the workflow's schema.
+            try:
+                if self.args_sidecar or not self._validate_workflow_args(
+                        workflow=self.workflow, args=workflow_args):
+                    namespace = self._parse_workflow_args(
+                        workflow=self.workflow,
+                        args_file=Path(self.snakeparse_args_file).resolve()
+                    )
+            except BaseException:
+                self.snakeparse_args_file.unlink()
+                raise
+            if self.args_sidecar:
+                self.snakeparse_args_sidecar = self._write_args_sidecar(
+                    args_file=self.snakeparse_args_file,
+                    parser=self.config.parser_for(workflow=self.workflow),
+                    namespace=namespace
+                )
+                if self.snakeparse_args_sidecar is not None:
+                    weakref.finalize(self, _unlink_quietly, self.snakeparse_args_sidecar)
+            # 3. Add the custom config argument.
+            self.snakemake_args.extend(
+                ['--config', f"{SnakeParse.ARGUMENT_FILE_NAME_KEY}={self.snakeparse_args_file}"]
+            )
         # 4. Add the --snakefile argument if necessary
         if not has_snakefile_argument:
             self.snakemake_args.extend(['--snakefile', str(self.workflow.snakefile.resolve())])
 
+    def _config_from(self, config_args: argparse.Namespace) -> 'SnakeParseConfig':
+        '''Creates the configuration from the parsed snakeparse options.'''
+        return self.config_from_args(config_args=config_args)
+
+    @staticmethod
+    def config_from_args(config_args: argparse.Namespace) -> 'SnakeParseConfig':
+        '''Creates the configuration from the snakeparse options parsed with
+        :meth:`~snakeparse.api.SnakeParseConfig.config_parser`.'''
+        return SnakeParseConfig(
+            config_path              = config_args.config,
+            prog                     = config_args.prog,
+            snakemake                = config_args.snakemake,
+            name_transform           = config_args.name_transform,
+            parent_dir_is_group_name = config_args.parent_dir_is_group_name,
+            workflows                = OrderedDict(),
+            groups                   = OrderedDict(),
+            snakefile_globs          = list(config_args.snakefile_globs),
+            cache_dir                = SnakeParse._cache_dir_from(config_args),
+            lazy                     = config_args.lazy,
+            jobs                     = config_args.load_jobs,
+            catalog                  = config_args.catalog
+        )
+
+    def _no_workflow_message(self, args: List[str]) -> str:
+        '''The error message when no workflow was found in the args, suggesting
+        workflows with names similar to the arguments.'''
+        if '--' in args:
+            idx = args.index('--')
+            candidates = args[idx + 1:idx + 2]
+        else:
+            candidates = [arg for arg in args if not arg.startswith('-')]
+        suggestions: List[str] = []
+        for candidate in candidates:
+            for name in self.config.index.suggestions(key=candidate):
+                if name not in suggestions:
+                    suggestions.append(name)
+        if not suggestions:
+            return 'No workflow given.'
+        return f"No workflow given.  Did you mean: {', '.join(suggestions[:3])}?"
+
+    @staticmethod
+    def _encode_namespace(namespace: Any) -> Optional[str]:
+        '''Serializes the parsed arguments for an environment variable, or
+        returns None if they cannot be serialized, or are larger than
+        :attr:`~snakeparse.api.SnakeParse.ARGUMENT_ENV_MAX_BYTES` once
+        serialized.'''
+        try:
+            data = pickle.dumps(namespace, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, AttributeError, TypeError):
+            return None
+        encoded = base64.b64encode(data).decode('ascii')
+        if len(encoded) > SnakeParse.ARGUMENT_ENV_MAX_BYTES:
+            return None
+        return encoded
+
+    @property
+    def command(self) -> List[str]:
+        '''The command line used to execute the Snakemake workflow in a separate
+        process.'''
+        snakemake = self.config.snakemake if self.config.snakemake else 'snakemake'
+        return [str(snakemake)] + self.snakemake_args
+
     def run(self) -> None:
         '''Execute the Snakemake workflow'''
-        snakemake = self.config.snakemake if self.config.snakemake else 'snakemake'
-        retcode = subprocess.call([str(snakemake)] + self.snakemake_args)
-        self.snakeparse_args_file.unlink()
+        try:
+            if self.in_process:
+                with phase('snakemake'):
+                    retcode = self._run_in_process()
+            else:
+                env = dict(os.environ, **self.snakemake_env) if self.snakemake_env else None
+                with phase('snakemake'):
+                    retcode = subprocess.call(self.command, env=env)
+        finally:
+            self.cleanup()
+        self.report_profile()
         sys.exit(retcode)
 
-    def _parse_workflow_args(self, workflow: 'SnakeParseWorkflow', args_file: Path) -> None:
+    async def start_async(self,
+                          stdout: bool = True,
+                          stderr: bool = True,
+                          grace_period: Optional[float] = None) -> Any:
+        '''Starts the Snakemake workflow from the running event loop, without
+        waiting for it to exit, and returns the
+        :class:`~snakeparse.aio.SnakemakeProcess`, with its standard output and
+        error as async line streams if captured.  See
+        :func:`~snakeparse.aio.start`.'''
+        # import here to avoid a circular import
+        from . import aio
+        return await aio.start(snakeparse=self, stdout=stdout, stderr=stderr,
+                               grace_period=aio.GRACE_PERIOD if grace_period is None
+                               else grace_period)
+
+    async def run_async(self,
+                        timeout: Optional[float] = None,
+                        stdout: Optional[Callable[[str], Any]] = None,
+                        stderr: Optional[Callable[[str], Any]] = None,
+                        grace_period: Optional[float] = None) -> int:
+        '''Execute the Snakemake workflow from the running event loop, and
+        return its exit code.  Each line of output is given to the ``stdout``
+        or ``stderr`` callback, if given.  On timeout or cancellation, the
+        Snakemake process group is stopped.  See
+        :func:`~snakeparse.aio.run`.'''
+        # import here to avoid a circular import
+        from . import aio
+        try:
+            return await aio.run(snakeparse=self, timeout=timeout, stdout=stdout, stderr=stderr,
+                                 grace_period=aio.GRACE_PERIOD if grace_period is None
+                                 else grace_period)
+        finally:
+            self.report_profile()
+
+    @staticmethod
+    def run_many(argvs: Sequence[List[str]],
+                 config: 'SnakeParseConfig',
+                 concurrency: int = 1,
+                 file: IO[str] = sys.stdout,
+                 **kwargs: Any) -> Any:
+        '''Validates the arguments of every invocation (the arguments after the
+        snakeparse options), reporting all the errors together, then, if all
+        are valid, runs them with at most ``concurrency`` running at a time.
+        The configuration, and the parser for each workflow, are re-used by
+        every invocation.  Any other keyword arguments are given to
+        :func:`~snakeparse.batch.run_many`.  Returns the
+        :class:`~snakeparse.batch.BatchResult`.'''
+        # import here to avoid a circular import
+        from .batch import run_many
+        return run_many(argvs=argvs, config=config, concurrency=concurrency, file=file,
+                        **kwargs)
+
+    def _start_profiler(self,
+                        origin: float,
+                        json_path: Optional[Path] = None,
+                        cprofile: Optional[Path] = None) -> Profiler:
+        '''Starts profiling the phases of startup, reported by
+        :meth:`~snakeparse.api.SnakeParse.report_profile`.'''
+        self.profiler     = Profiler(cprofile=cprofile, origin=origin).start()
+        self.profile_json = json_path
+        return self.profiler
+
+    def report_profile(self, file: Optional[IO[str]] = None) -> None:
+        '''Stops the profiler started from the command line options (or
+        environment), if any, and writes its report to the given file
+        (standard error by default), and as JSON if requested.'''
+        if self.profiler is None:
+            return
+        self.profiler.stop()
+        self.profiler.write_text(file=sys.stderr if file is None else file)
+        if self.profile_json is not None:
+            with self.profile_json.open('w') as fh:
+                self.profiler.write_json(file=fh)
+        self.profiler = None
+
+    def cleanup(self) -> None:
+        '''Removes the arguments file and its sidecar, if any, and releases the
+        arguments parsed for running in this process.'''
+        for path in [self.snakeparse_args_file, self.snakeparse_args_sidecar]:
+            if path is not None and path.exists():
+                path.unlink()
+        if self.snakeparse_args_token is not None:
+            _PARSED_ARGS.pop(self.snakeparse_args_token, None)
+
+    @staticmethod
+    def _args_sidecar_path(args_file: Path) -> Path:
+        return args_file.with_name(args_file.name + '.pickle')
+
+    @staticmethod
+    def _write_args_sidecar(args_file: Path,
+                            parser: 'SnakeParser',
+                            namespace: Any) -> Optional[Path]:
+        '''Writes the arguments parsed from the arguments file by the parser,
+        readable only by the current user.  Returns the path to the sidecar, or
+        None if the arguments could not be written.'''
+        sidecar = SnakeParse._args_sidecar_path(args_file=args_file)
+        stat = args_file.stat()
+        key = (str(args_file.resolve()), stat.st_mtime_ns, stat.st_size, parser._memo_key())
+        try:
+            data = pickle.dumps((key, namespace), protocol=pickle.HIGHEST_PROTOCOL)
+            fd = os.open(str(sidecar), os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except (pickle.PicklingError, AttributeError, TypeError, OSError):
+            return None
+        with os.fdopen(fd, 'wb') as fh:
+            fh.write(data)
+        return sidecar
+
+    @staticmethod
+    def _read_args_sidecar(args_file: Path, key: Tuple[str, int, int, str]) -> Any:
+        '''Reads the arguments written by
+        :meth:`~snakeparse.api.SnakeParse._write_args_sidecar`, returning None
+        if there is no sidecar, it was not written by the current user, or it
+        was written for a different arguments file or parser.'''
+        sidecar = SnakeParse._args_sidecar_path(args_file=args_file)
+        try:
+            with sidecar.open('rb') as fh:
+                stat = os.fstat(fh.fileno())
+                if stat.st_uid != os.getuid() or stat.st_mode & 0o077:
+                    return None
+                sidecar_key, namespace = pickle.load(fh)
+        except Exception:
+            return None
+        return namespace if sidecar_key == key else None
+
+    def _run_in_process(self) -> int:
+        '''Executes the Snakemake workflow with Snakemake's python API in this
+        process, and returns the exit code.  The parsed workflow arguments are
+        available to the snakefile until Snakemake returns.'''
+        import snakemake
+        try:
+            snakemake.main(argv=list(self.snakemake_args))
+            retcode = 0
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                retcode = 0 if e.code is None else e.code
+            else:
+                self.file.write(f'{e.code}\n')
+                retcode = 1
+        finally:
+            _PARSED_ARGS.pop(self.snakeparse_args_token, None)
+        return retcode
+
+    def _parse_workflow_args(self,
+                             workflow: 'SnakeParseWorkflow',
+                             args_file: Optional[Path] = None,
+                             args: Optional[List[str]] = None) -> Any:
         '''Dynamically loads the module containing the workflow parser and
-        attempts to parse the arguments in the given arguments file.
+        attempts to parse the arguments in the given arguments file, or the
+        given arguments if no file is given.  Returns the parsed arguments.
 
         The module must have a single concrete class implementing SnakeParser.
         '''
-        parser = self.config.parser_from(workflow=workflow)
+        parser = self.config.parser_for(workflow=workflow)
         try:
-            parser.parse_args_file(args_file=args_file)
+            with phase('parse_workflow_args', workflow=workflow.name):
+                if args_file is not None:
+                    return parser.parse_args_file(args_file=args_file)
+                else:
+                    return parser.parse_args(args=[] if args is None else args)
         except SnakeParseException as e:
             # error in specifying the argument
             self._print_workflow_help(workflow=workflow, parser=parser, message=str(e))
@@ -909,6 +2251,25 @@ class SnakeParse(object):
             # most likely help
             self._print_workflow_help(workflow=workflow, parser=parser, message=None)
 
+    def _validate_workflow_args(self, workflow: 'SnakeParseWorkflow', args: List[str]) -> bool:
+        '''Returns True if the workflow arguments are valid according to the
+        schema of the workflow's parser stored in the catalog, so that the
+        parser need not be built.  Otherwise, the arguments must be parsed with
+        the parser, namely when there is no schema, the arguments cannot be
+        validated with the schema, or they are invalid (so that the parser
+        gives the help message).'''
+        validator = self.config.validator_for(workflow=workflow)
+        if validator is None:
+            return False
+        # the arguments are read back from the arguments file one per line
+        if ''.join(arg + '\n' for arg in args).splitlines() != args:
+            return False
+        with phase('validate_workflow_args', workflow=workflow.name):
+            try:
+                return validator.validate(args=args)
+            except SnakeParseException:
+                return False
+
     def _print_workflow_help(self,
                              workflow: 'SnakeParseWorkflow',
                              parser: 'SnakeParser',
@@ -927,11 +2288,134 @@ class SnakeParse(object):
         self.file.write('\n')
         sys.exit(2)
 
+    @staticmethod
+    def _cache_dir_from(config_args: argparse.Namespace) -> Optional[Path]:
+        '''Returns the cache directory given the parsed snakeparse options, or
+        None if caching is disabled.'''
+        if config_args.no_cache:
+            return None
+        elif config_args.cache_dir is not None:
+            return config_args.cache_dir
+        else:
+            return default_cache_dir()
+
     @staticmethod
     def _parse_known_args(parser: argparse.ArgumentParser,
                           args: Sequence[str]) -> Tuple[int, argparse.Namespace]:
         '''Parses the args with the given parsers until an unknown argument is
-        encountered.'''
+        encountered.
+
+        The first unknown argument is found in a single pass over the args using
+        the parser's option table, after which the known arguments are parsed
+        once.  This gives the same result as parsing successively longer
+        prefixes of the args (see
+        :meth:`~snakeparse.api.SnakeParse._parse_known_args_by_prefix`), which
+        is used for parsers that cannot be split in a single pass.'''
+        if not args:
+            namespace, remaining = parser.parse_known_args(args=args)
+            return 1, namespace
+
+        split = SnakeParse._split_known_args(parser=parser, args=args)
+        if split is None:
+            return SnakeParse._parse_known_args_by_prefix(parser=parser, args=args)
+        unknown, parsable = split
+
+        try:
+            if unknown is not None:
+                namespace, remaining = parser.parse_known_args(args=args[:unknown + 1])
+                if remaining:
+                    return unknown, namespace
+            elif parsable > 0:
+                namespace, remaining = parser.parse_known_args(args=args[:parsable])
+                if not remaining:
+                    return len(args) + 1, namespace
+            else:
+                return len(args) + 1, argparse.Namespace()
+        except SnakeParseException:
+            # for example, a value could not be converted to the option's type
+            pass
+        return SnakeParse._parse_known_args_by_prefix(parser=parser, args=args)
+
+    @staticmethod
+    def _split_known_args(parser: argparse.ArgumentParser,
+                          args: Sequence[str]) -> Optional[Tuple[Optional[int], int]]:
+        '''Finds the index of the first argument unknown to the parser in a
+        single pass over the args.  Returns the index (or None if all arguments
+        are known), and the length of the longest prefix of the args that can be
+        parsed without error.  Returns None if the parser has features that are
+        not supported (positional arguments, abbreviations, argument files,
+        required options, or mutually exclusive options).'''
+        if parser.allow_abbrev or parser.fromfile_prefix_chars \
+                or parser._mutually_exclusive_groups \
+                or any(action.required or not action.option_strings
+                       for action in parser._actions):
+            return None
+
+        def parse_optional(arg: str) -> Optional[Tuple[Optional[argparse.Action], Optional[str]]]:
+            '''None if the argument is a value, otherwise the option's action (None if
+            unknown) and explicit argument (ex. ``--option=value``).'''
+            result = parser._parse_optional(arg)  # type: ignore
+            if result is None:
+                return None
+            if isinstance(result, list):
+                if len(result) != 1:
+                    raise ValueError(arg)
+                result = result[0]
+            return result[0], result[-1]
+
+        try:
+            index = 0
+            while index < len(args):
+                optional = parse_optional(args[index])
+                if optional is None or optional[0] is None:
+                    return index, index
+                action, explicit_arg = optional
+                nargs = action.nargs
+                if isinstance(action, (argparse._HelpAction, argparse._VersionAction)):
+                    # these exit, so neither this nor any longer prefix parses
+                    return None, index
+                elif explicit_arg is not None:
+                    if nargs == 0 and args[index][1:2] not in parser.prefix_chars:
+                        return None  # combined short flags (ex. -abc)
+                    elif nargs == 0:
+                        return None, index
+                    elif nargs not in [None, OPTIONAL, ZERO_OR_MORE, ONE_OR_MORE, 1]:
+                        return None
+                    index += 1
+                    continue
+
+                if nargs is None:
+                    minimum, maximum = 1, 1
+                elif nargs == OPTIONAL:
+                    minimum, maximum = 0, 1
+                elif nargs == ZERO_OR_MORE:
+                    minimum, maximum = 0, len(args)
+                elif nargs == ONE_OR_MORE:
+                    minimum, maximum = 1, len(args)
+                elif isinstance(nargs, int):
+                    minimum, maximum = nargs, nargs
+                else:
+                    return None
+
+                # consume the values for this option
+                end = index + 1
+                while end - index - 1 < maximum and end < len(args) \
+                        and parse_optional(args[end]) is None:
+                    end += 1
+                if end - index - 1 < minimum:
+                    # missing values, so neither this nor any longer prefix parses
+                    return None, index
+                index = end
+            return None, len(args)
+        except (ValueError, SnakeParseException):
+            return None
+
+    @staticmethod
+    def _parse_known_args_by_prefix(parser: argparse.ArgumentParser,
+                                    args: Sequence[str]) -> Tuple[int, argparse.Namespace]:
+        '''Parses the args with the given parsers until an unknown argument is
+        encountered, by parsing successively longer prefixes of the args.  This
+        is quadratic in the number of args.'''
         if not args:
             namespace, remaining = parser.parse_known_args(args=args)
             return 1, namespace
@@ -968,53 +2452,33 @@ class SnakeParse(object):
         self.file.write(('-' * 60) + '\n')
 
     def _usage(self, message: Optional[str] = None, exit: bool =True) -> None:
-        '''The long usage that lists all the available workflows.'''
+        '''The long usage that lists all the available workflows.  The usage is
+        rendered into a single buffer and written at once, with the listing of
+        the workflows built from the configuration's group index (see
+        :meth:`~snakeparse.api.SnakeParseConfig.workflow_listing`).'''
         terminal_size = shutil.get_terminal_size(fallback=(80, 24))
-        group_name_columns = 38  # includes the colon
-        group_description_columns = terminal_size.columns - group_name_columns
-        workflow_name_columns = group_name_columns - 3
-        workflow_description_columns = group_description_columns - 1
 
         # Pre-amble
-        self.file.write("Usage: " + self._usage_short() + '\n')
-        self.file.write(f'Version: {__version__}\n')
+        buffer = StringIO()
+        buffer.write("Usage: " + self._usage_short() + '\n')
+        buffer.write(f'Version: {__version__}\n')
 
         # SnakeParse help
         if self._config_usage:
-            self.file.write('\n')
+            buffer.write('\n')
             SnakeParseConfig.config_parser().print_help(  # type: ignore
-                file=self.file,
+                file=buffer,
                 suppress=False)
 
-        # Print the workflows, grouped by group.
-        if self.config.workflows:
-            self.file.write('\nAvailable Workflows:\n')
-            self._print_line()
-            groups = OrderedDict(self.config.groups)
-            for wf in self.config.workflows.values():
-                if wf.group not in groups:
-                    groups[wf.group] = None
-            for group, desc in groups.items():
-                name = ('Worfklows' if group is None else group) + ':'
-                desc = '' if desc is None else desc
-                self.file.write(
-                    f'{name:<{group_name_columns}}{desc:<{group_description_columns}}\n'
-                )
-                for wf in self.config.workflows.values():
-                    if wf.group != group:
-                        continue
-                    desc = str(wf.snakefile) if wf.description is None else wf.description
-                    self.file.write(f'    {wf.name:<{workflow_name_columns}}'
-                                    f'{desc:<{workflow_description_columns}}\n')
-                    if self.debug:
-                        self.file.write(f'        snakefile:  {wf.snakefile}\n')
-                self._print_line()
-        else:
-            self.file.write('\nNo workflows configured.\n')
-            self._print_line()
+        # The workflows, grouped by group.
+        if self.config.lazy:
+            self.config.sort_workflows()
+        buffer.write(self.config.workflow_listing(columns=terminal_size.columns,
+                                                  debug=self.debug))
 
-        # Write the message
+        # The message
         if message is not None:
-            self.file.write(f'\n{message}\n')
+            buffer.write(f'\n{message}\n')
+        self.file.write(buffer.getvalue())
         if exit:
             sys.exit(2)
@@ -0,0 +1,392 @@
+'''Validates and runs many workflow invocations from a single process.
+
+Running ``snakeparse <workflow> ...`` once per invocation creates the
+configuration, and builds each workflow's parser, every time.  In batch mode,
+the configuration is created once and each workflow's parser is built once
+(see :meth:`~snakeparse.api.SnakeParseConfig.parser_for`), then:
+
+1. the arguments of every invocation are validated up front, and if any are
+   invalid, all the errors are reported together and nothing is run;
+2. otherwise, the Snakemake runs are launched, at most ``concurrency`` at a
+   time, and their exit codes aggregated: the batch exits with the exit code
+   of the first failed invocation (in the given order), or zero if all
+   succeeded.
+
+Optionally, the output of each run is streamed prefixed with the name of its
+workflow, a total number of cores is split across the runs that do not give
+Snakemake's ``--cores``, and with ``fail_fast``, the first failed run stops the
+runs still going, and those not yet started are skipped.  Otherwise, every run
+is run to completion (keep going).
+
+From the command line, run ``snakeparse batch [snakeparse options] jobs.tsv``,
+where each (non-empty) line of the jobs file is one invocation, with one
+argument per tab-separated field, as would be given to snakeparse after its own
+options.  Lines starting with ``#`` are ignored, and ``-`` reads the jobs from
+standard input.  Alternatively, run ``snakeparse concurrent [snakeparse options]
+WorkflowA ... ++ WorkflowB ...`` to run the invocations separated by ``++``
+concurrently, with their output prefixed, and the available cores split across
+them (see ``--concurrency``, ``--total-cores``, and ``--fail-fast``).  Without
+the ``concurrent`` command, ``++`` is an ordinary workflow argument.
+From Python, use :meth:`~snakeparse.api.SnakeParse.run_many`.
+
+The module contains the following public classes and methods:
+
+    - :class:`~snakeparse.batch.JobError` -- The error found validating an
+      invocation.
+    - :class:`~snakeparse.batch.BatchResult` -- The validation errors, or the
+      exit codes, of a batch.
+    - :func:`~snakeparse.batch.validate` -- Validates every invocation.
+    - :func:`~snakeparse.batch.run_many` -- Validates, then runs, every
+      invocation.
+    - :func:`~snakeparse.batch.read_jobs` -- Reads the invocations from a jobs
+      file.
+    - :func:`~snakeparse.batch.split_segments` -- Splits the invocations
+      separated by ``++`` on the command line.
+    - :func:`~snakeparse.batch.batch_main` -- The entry point for
+      ``snakeparse batch``.
+    - :func:`~snakeparse.batch.segments_main` -- The entry point for
+      ``snakeparse concurrent``.
+'''
+
+import os
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, IO, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from .api import SnakeParse, SnakeParseConfig, SnakeParseException, SnakeParseWorkflow, \
+    SnakeParser
+
+
+class JobError(NamedTuple):
+    '''The error found validating an invocation.
+
+    Attributes
+    ----------
+    position : int
+        The zero-based position of the invocation in the batch.
+    args : List[str]
+        The arguments of the invocation.
+    message : str
+        The error message.
+    '''
+    position: int
+    args: List[str]
+    message: str
+
+
+class BatchResult(NamedTuple):
+    '''The result of running a batch.
+
+    Attributes
+    ----------
+    errors : List[JobError]
+        The errors found validating the invocations.  If any, no invocations
+        were run.
+    exit_codes : List[Optional[int]]
+        The exit code of each invocation, or None if it was not run (because
+        of an invalid invocation, or a failed one when failing fast).
+    '''
+    errors: List[JobError]
+    exit_codes: List[Optional[int]]
+
+    @property
+    def exit_code(self) -> int:
+        '''Two if any invocation was invalid, otherwise the exit code of the
+        first invocation that exited with an error, one if the only failed
+        invocations were stopped by a signal, or zero if all succeeded.'''
+        if self.errors:
+            return 2
+        codes = [code for code in self.exit_codes if code]
+        return next((code for code in codes if code > 0), 1 if codes else 0)
+
+
+class _JobException(SnakeParseException):
+    '''Raised instead of printing the usage when validating an invocation.'''
+    pass
+
+
+class _BatchSnakeParse(SnakeParse):
+    '''Raises the error for an invalid invocation, rather than printing the
+    usage and exiting.'''
+
+    def _usage(self, message: Optional[str] = None, exit: bool = True) -> None:
+        raise _JobException(message or 'Invalid arguments.')
+
+    def _print_workflow_help(self,
+                             workflow: SnakeParseWorkflow,
+                             parser: SnakeParser,
+                             message: Optional[str] = None) -> None:
+        raise _JobException(f'{workflow.name}: {message or "invalid workflow arguments"}')
+
+
+def validate(argvs: Sequence[List[str]],
+             config: SnakeParseConfig,
+             **kwargs: Any) -> Tuple[List[SnakeParse], List[JobError]]:
+    '''Validates the arguments of every invocation with the given configuration,
+    returning the parsed invocations and the errors.  Any other keyword arguments
+    are given to each :class:`~snakeparse.api.SnakeParse`.  If there are any
+    errors, the parsed invocations are cleaned up and none are returned.'''
+    if kwargs.get('in_process'):
+        raise SnakeParseException('Batches cannot be run in-process')
+    parsed: List[SnakeParse] = []
+    errors: List[JobError] = []
+    for index, argv in enumerate(argvs):
+        try:
+            parsed.append(_BatchSnakeParse(args=list(argv), config=config, **kwargs))
+        except (SnakeParseException, SystemExit) as e:
+            message = str(e) if isinstance(e, SnakeParseException) else 'Invalid arguments.'
+            errors.append(JobError(position=index, args=list(argv), message=message))
+    if errors:
+        for job in parsed:
+            job.cleanup()
+        parsed = []
+    return parsed, errors
+
+
+'''The Snakemake options that give the number of cores.'''
+_CORES_OPTIONS = ['--cores', '--jobs', '-j']
+
+
+def _has_cores(args: Sequence[str]) -> bool:
+    '''True if the Snakemake arguments give the number of cores.'''
+    for arg in args:
+        if arg in _CORES_OPTIONS or arg.startswith('--cores=') or arg.startswith('--jobs=') \
+                or (arg.startswith('-j') and arg[2:].isdigit()):
+            return True
+    return False
+
+
+def _split_cores(jobs: Sequence[SnakeParse], total_cores: int, concurrency: int) -> None:
+    '''Gives Snakemake an equal share of the total cores for each invocation
+    that does not give the number of cores, given the number run at a time.'''
+    pending = [job for job in jobs if not _has_cores(job.snakemake_args)]
+    if not pending:
+        return
+    share = max(1, total_cores // min(concurrency, len(pending)))
+    for job in pending:
+        job.snakemake_args[:0] = ['--cores', str(share)]
+
+
+def _labels(jobs: Sequence[SnakeParse]) -> List[str]:
+    '''The label prefixing the output of each invocation: the name of its
+    workflow, followed by its (one-based) position if the name is not
+    unique.'''
+    names = [job.workflow.name for job in jobs]
+    return [name if names.count(name) == 1 else f'{name}:{position + 1}'
+            for position, name in enumerate(names)]
+
+
+class _Runner(object):
+    '''Runs the Snakemake workflows of parsed invocations, optionally
+    prefixing their output, and optionally stopping all runs once one fails.'''
+
+    '''The exit code of a run that could not be launched, as the shell uses for
+    a command that is not found.'''
+    LAUNCH_FAILED = 127
+
+    def __init__(self, file: IO[str], prefix_output: bool, fail_fast: bool) -> None:
+        self.file          = file
+        self.prefix_output = prefix_output
+        self.fail_fast     = fail_fast
+        self.lock          = threading.Lock()
+        self.failed        = False
+        self.processes: Set[subprocess.Popen] = set()
+
+    def run(self, job: SnakeParse, label: str) -> Optional[int]:
+        '''Runs the invocation, and returns its exit code, or None if it was
+        skipped after another failed.  A run that cannot be launched fails with
+        exit code :attr:`~snakeparse.batch._Runner.LAUNCH_FAILED`.'''
+        env = dict(os.environ, **job.snakemake_env) if job.snakemake_env else None
+        try:
+            with self.lock:
+                if self.failed:
+                    return None
+                try:
+                    if self.prefix_output:
+                        process = subprocess.Popen(job.command, env=env,
+                                                   stdin=subprocess.DEVNULL,
+                                                   stdout=subprocess.PIPE,
+                                                   stderr=subprocess.STDOUT)
+                    else:
+                        process = subprocess.Popen(job.command, env=env)
+                except OSError as e:
+                    self.file.write(f'[{label}] error: could not run {job.command[0]}: {e}\n')
+                    self._failed()
+                    return _Runner.LAUNCH_FAILED
+                self.processes.add(process)
+            if process.stdout is not None:
+                with process.stdout:
+                    for line in process.stdout:
+                        text = line.decode('utf-8', errors='replace').rstrip('\r\n')
+                        with self.lock:
+                            self.file.write(f'[{label}] {text}\n')
+            retcode = process.wait()
+        finally:
+            job.cleanup()
+        with self.lock:
+            self.processes.discard(process)
+            if retcode != 0:
+                self._failed()
+        return retcode
+
+    def _failed(self) -> None:
+        '''Stops the runs still going, and skips those not yet started, if
+        failing fast.  Must be called with the lock held.'''
+        if self.fail_fast and not self.failed:
+            self.failed = True
+            for other in self.processes:
+                other.terminate()
+
+
+def run_many(argvs: Sequence[List[str]],
+             config: SnakeParseConfig,
+             concurrency: int = 1,
+             file: IO[str] = sys.stdout,
+             prefix_output: bool = False,
+             total_cores: Optional[int] = None,
+             fail_fast: bool = False,
+             **kwargs: Any) -> BatchResult:
+    '''Validates the arguments of every invocation, and if all are valid, runs
+    them with at most ``concurrency`` running at a time.  The errors, if any,
+    and a summary of any failed invocations are written to the given file.
+
+    Keyword Arguments
+    -----------------
+    prefix_output : bool
+        True to stream the output of each run to the given file, with each line
+        prefixed by the name of its workflow, otherwise the runs write directly
+        to standard output and error.
+    total_cores : Optional[int]
+        Optionally, the number of cores to split equally across the runs that
+        do not give Snakemake's ``--cores`` (given the number run at a time).
+    fail_fast : bool
+        True to stop the runs still going, and skip those not yet started, once
+        a run fails, otherwise run every invocation to completion.
+
+    Any other keyword arguments are given to each
+    :class:`~snakeparse.api.SnakeParse`.'''
+    if concurrency < 1:
+        raise SnakeParseException(f'The concurrency must be at least one: {concurrency}')
+    jobs, errors = validate(argvs=argvs, config=config, **kwargs)
+    if errors:
+        file.write(f'Found {len(errors)} invalid invocation(s) of {len(argvs)}:\n')
+        for error in errors:
+            file.write(f'    job {error.position + 1} ({" ".join(error.args)}): {error.message}\n')
+        return BatchResult(errors=errors, exit_codes=[None] * len(argvs))
+
+    if total_cores is not None:
+        _split_cores(jobs=jobs, total_cores=total_cores, concurrency=concurrency)
+    runner = _Runner(file=file, prefix_output=prefix_output, fail_fast=fail_fast)
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            exit_codes = list(executor.map(runner.run, jobs, _labels(jobs=jobs)))
+    finally:
+        for job in jobs:
+            job.cleanup()
+
+    failed = [index for index, code in enumerate(exit_codes) if code]
+    if failed:
+        file.write(f'{len(failed)} of {len(argvs)} invocation(s) failed:\n')
+        for index in failed:
+            file.write(f'    job {index + 1} ({" ".join(argvs[index])}): exit code'
+                       f' {exit_codes[index]}\n')
+    skipped = exit_codes.count(None)
+    if skipped:
+        file.write(f'{skipped} of {len(argvs)} invocation(s) were not run.\n')
+    return BatchResult(errors=[], exit_codes=exit_codes)
+
+
+def read_jobs(lines: Sequence[str]) -> List[List[str]]:
+    '''Reads the invocations from the lines of a jobs file: one invocation per
+    non-empty line, with one argument per tab-separated field.  Lines starting
+    with ``#`` are ignored.'''
+    argvs = []
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if not line.strip() or line.startswith('#'):
+            continue
+        argvs.append(line.split('\t'))
+    return argvs
+
+
+def split_segments(args: Sequence[str]) -> List[List[str]]:
+    '''Splits the arguments into the invocations separated by ``++``.'''
+    segments: List[List[str]] = [[]]
+    for arg in args:
+        if arg == '++':
+            segments.append([])
+        else:
+            segments[-1].append(arg)
+    if any(not segment for segment in segments):
+        raise SnakeParseException("Found an empty invocation before or after '++'")
+    return segments
+
+
+def _run_from_options(config_args: Any,
+                      argvs: List[List[str]],
+                      file: IO[str],
+                      concurrency: int,
+                      total_cores: Optional[int]) -> BatchResult:
+    '''Runs the invocations with the configuration and options given by the
+    parsed snakeparse options.'''
+    if config_args.in_process:
+        raise SnakeParseException('--in-process cannot be given with more than one invocation')
+    config = SnakeParse.config_from_args(config_args=config_args)
+    return run_many(argvs=argvs, config=config, concurrency=concurrency, file=file,
+                    prefix_output=concurrency > 1, total_cores=total_cores,
+                    fail_fast=config_args.fail_fast, debug=config_args.extra_help,
+                    transport=config_args.args_transport or 'file',
+                    args_sidecar=config_args.args_sidecar)
+
+
+def batch_main(args: List[str], file: IO[str] = sys.stdout) -> int:
+    '''Runs the invocations in the jobs file given in the arguments, with the
+    snakeparse options in the arguments.  The invocations are run one at a time
+    unless ``--concurrency`` is given, in which case their output is prefixed.
+    Returns the exit code.'''
+    parser = SnakeParseConfig.config_parser(
+        usage='snakeparse batch [snakeparse options] jobs.tsv'
+    )
+    parser.add_argument('jobs', help="The jobs file, or '-' for standard input.")
+    try:
+        config_args = parser.parse_args(args)
+        if config_args.jobs == '-':
+            argvs = read_jobs(lines=sys.stdin.readlines())
+        else:
+            with Path(config_args.jobs).open('r') as fh:
+                argvs = read_jobs(lines=fh.readlines())
+        result = _run_from_options(config_args=config_args, argvs=argvs, file=file,
+                                   concurrency=config_args.concurrency or 1,
+                                   total_cores=config_args.total_cores)
+    except (SnakeParseException, OSError) as e:
+        parser.print_help(file=file, suppress=False)  # type: ignore
+        if e.args and e.args[0]:
+            file.write(f'\nerror: {e}\n')
+        return 2
+    return result.exit_code
+
+
+def segments_main(args: List[str], file: IO[str] = sys.stdout) -> int:
+    '''Runs the invocations separated by ``++`` in the arguments, after the
+    snakeparse options, for ``snakeparse concurrent``.  By default, all the
+    invocations are run at once, with their output prefixed, and the available
+    cores split across them.  Returns the exit code.'''
+    parser = SnakeParseConfig.config_parser(
+        usage='snakeparse concurrent [snakeparse options] [snakemake options] [workflow name]'
+              ' [workflow options] ++ [snakemake options] [workflow name] [workflow options] ...'
+    )
+    try:
+        args_end, config_args = SnakeParse._parse_known_args(parser=parser, args=args)
+        argvs = split_segments(args=args[args_end:])
+        result = _run_from_options(config_args=config_args, argvs=argvs, file=file,
+                                   concurrency=config_args.concurrency or len(argvs),
+                                   total_cores=config_args.total_cores or os.cpu_count() or 1)
+    except SnakeParseException as e:
+        parser.print_help(file=file, suppress=False)  # type: ignore
+        if e.args and e.args[0]:
+            file.write(f'\nerror: {e}\n')
+        return 2
+    return result.exit_code
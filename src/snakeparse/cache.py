@@ -0,0 +1,380 @@
+'''Persistent on-disk caches used to speed up loading snakefiles.
+
+Translating a snakefile with Snakemake's parser and compiling the result is
+by far the most expensive part of building a workflow's parser.  The caches
+in this module store the results on disk so that subsequent invocations can
+skip the translation entirely.
+
+The module contains the following public classes and methods:
+
+    - :class:`~snakeparse.cache.SnakefileCache` -- Caches the translated and
+      compiled code of snakefiles, keyed by the snakefile's path, modification
+      time, size, and content hash, as well as the Snakemake and Snakeparse
+      versions.
+    - :class:`~snakeparse.cache.ConfigCache` -- Caches the data loaded from
+      YAML and HOCON configuration files, keyed by the content of the file and
+      of every file it includes.
+    - :class:`~snakeparse.cache.ListingCache` -- Caches the rendered listing
+      of the available workflows, keyed by a description of the workflows
+      (e.g. the content of the catalog they come from).
+    - :class:`~snakeparse.cache.DirectoryCache` -- Caches the listings of the
+      directories walked when expanding snakefile globs, keyed by each
+      directory's modification time.
+    - :func:`~snakeparse.cache.default_cache_dir` -- The default directory in
+      which caches are stored.
+    - :func:`~snakeparse.cache.translate_snakefile` -- Translates and compiles a
+      snakefile without any caching.
+'''
+
+import hashlib
+import marshal
+import os
+import re
+import sys
+from functools import lru_cache
+from importlib.util import MAGIC_NUMBER
+from pathlib import Path
+from types import CodeType
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from .version import __version__
+
+
+def default_cache_dir() -> Path:
+    '''Returns the default directory in which to store caches, namely
+    ``$XDG_CACHE_HOME/snakeparse``, or ``~/.cache/snakeparse`` if the
+    ``XDG_CACHE_HOME`` environment variable is not set.'''
+    root = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return Path(root) / 'snakeparse'
+
+
+def translate_snakefile(snakefile: Path) -> Tuple[str, CodeType]:
+    '''Translates the snakefile to python source with Snakemake's parser, and
+    returns the source and the compiled code.'''
+    import snakemake.parser as snakemake_parser
+    path = str(snakefile)
+    source, linemap, rulecount = snakemake_parser.parse(path)
+    return source, compile(source, path, 'exec')
+
+
+@lru_cache(maxsize=None)
+def _snakemake_version() -> str:
+    '''The version of Snakemake, found without importing Snakemake unless it
+    has already been imported, or its package metadata is not available.'''
+    if 'snakemake' not in sys.modules:
+        try:
+            from importlib.metadata import version
+            return version('snakemake')
+        except Exception:
+            pass
+    import snakemake
+    return snakemake.__version__
+
+
+class SnakefileCache(object):
+    '''Caches the translated source and compiled code of snakefiles on disk.
+
+    Each snakefile has a single entry, named after a hash of its resolved path.
+    An entry is only used if the snakefile's path, modification time, size, and
+    content hash, as well as the Snakemake, Snakeparse, and Python bytecode
+    versions, match those the entry was built with.  Otherwise, the snakefile
+    is translated again and the entry is replaced.  Failures to read or write
+    the cache are not fatal: the snakefile is simply translated.
+
+    Keyword Arguments
+    -----------------
+    cache_dir : Path
+        The directory in which to store the cache entries.  Will be created if
+        it does not exist.
+    '''
+
+    '''The suffix of the cache entry files.'''
+    SUFFIX = '.snakefile.marshal'
+
+    def __init__(self, cache_dir: Path) -> None:
+        self.cache_dir = cache_dir
+
+    def translate(self, snakefile: Path) -> Tuple[str, CodeType]:
+        '''Returns the translated source and compiled code for the given
+        snakefile, using the cached values when they are up to date.'''
+        key = self._key(snakefile=snakefile)
+        entry = self._entry_path(snakefile=snakefile)
+
+        cached = self._read(entry=entry)
+        if cached is not None and cached[0] == key:
+            return cached[1], cached[2]
+
+        source, code = translate_snakefile(snakefile=snakefile)
+        self._write(entry=entry, value=(key, source, code))
+        return source, code
+
+    def compile(self, snakefile: Path) -> CodeType:
+        '''Returns the compiled code for the given snakefile.'''
+        return self.translate(snakefile=snakefile)[1]
+
+    def _entry_path(self, snakefile: Path) -> Path:
+        '''The path to the cache entry for the given snakefile.'''
+        digest = hashlib.sha256(str(snakefile.resolve()).encode('utf-8')).hexdigest()
+        return self.cache_dir / (digest + SnakefileCache.SUFFIX)
+
+    @staticmethod
+    def _key(snakefile: Path) -> Tuple[Any, ...]:
+        '''The values that must match for a cache entry to be used.  The path
+        is included as given, since it is embedded in the translated source.'''
+        with snakefile.open('rb') as fh:
+            stat = os.fstat(fh.fileno())
+            digest = hashlib.sha256(fh.read()).hexdigest()
+        return (str(snakefile), stat.st_mtime_ns, stat.st_size, digest,
+                _snakemake_version(), __version__, MAGIC_NUMBER)
+
+    @staticmethod
+    def _read(entry: Path) -> Optional[Tuple[Any, ...]]:
+        '''Reads a cache entry, returning None if it is missing or corrupt.'''
+        try:
+            with entry.open('rb') as fh:
+                value = marshal.load(fh)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if not isinstance(value, tuple) or len(value) != 3:
+            return None
+        return value
+
+    def _write(self, entry: Path, value: Tuple[Any, ...]) -> None:
+        '''Atomically writes a cache entry, ignoring any failures.'''
+        _write_entry(cache_dir=self.cache_dir, entry=entry, data=marshal.dumps(value))
+
+
+class ConfigCache(object):
+    '''Caches the data loaded from YAML and HOCON configuration files on disk.
+
+    Each configuration file has a single entry, named after a hash of its
+    resolved path.  An entry is only used if the content of the configuration
+    file, and of every file it includes (for HOCON), as well as the values of
+    the environment variables it may substitute, and the Snakeparse version,
+    match those the entry was built with.  HOCON files that include URLs,
+    packages, or globs are not cached.  Failures to read or write the cache are
+    not fatal: the configuration file is simply loaded.
+
+    Keyword Arguments
+    -----------------
+    cache_dir : Path
+        The directory in which to store the cache entries.  Will be created if
+        it does not exist.
+    '''
+
+    '''The suffix of the cache entry files.'''
+    SUFFIX = '.config.pickle'
+
+    '''Matches HOCON include statements, capturing the kind of include (if
+    any) and the included path or URL.'''
+    _INCLUDE = re.compile(r'\binclude\s+(?:required\s*\(\s*)?(?:(\w+)\s*\(\s*)?"([^"]*)"',
+                          re.IGNORECASE)
+
+    '''Matches HOCON substitutions, capturing the name of the substitution.'''
+    _SUBSTITUTION = re.compile(r'\$\{\??\s*([^}\s]+)\s*\}')
+
+    def __init__(self, cache_dir: Path) -> None:
+        self.cache_dir = cache_dir
+
+    def load(self, config_path: Path, loader: Callable[[Path], Any]) -> Any:
+        '''Returns the data loaded from the configuration file with the given
+        loader, using the cached data when it is up to date.'''
+        # import here, so that completion (see :mod:`~snakeparse.completion`)
+        # does not import it
+        import pickle
+        key = self._key(config_path=config_path)
+        if key is None:
+            return loader(config_path)
+        digest = hashlib.sha256(key[0].encode('utf-8')).hexdigest()
+        entry = self.cache_dir / (digest + ConfigCache.SUFFIX)
+        try:
+            with entry.open('rb') as fh:
+                cached = pickle.load(fh)
+            if cached[0] == key:
+                return cached[1]
+        except Exception:
+            pass
+        data = loader(config_path)
+        try:
+            value = pickle.dumps((key, data), protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, AttributeError, TypeError):
+            return data
+        _write_entry(cache_dir=self.cache_dir, entry=entry, data=value)
+        return data
+
+    @staticmethod
+    def _key(config_path: Path) -> Optional[Tuple[Any, ...]]:
+        '''The values that must match for a cache entry to be used, or None if
+        the configuration file cannot be cached.'''
+        resolved = str(config_path.resolve())
+        if config_path.suffix in ['.yaml', '.yml']:
+            with config_path.open('rb') as fh:
+                digest = hashlib.sha256(fh.read()).hexdigest()
+            return (resolved, digest, __version__)
+        files: List[Tuple[str, Optional[str]]] = []
+        names: Set[str] = set()
+        # included files of the configuration file are relative to the working directory
+        if not ConfigCache._hocon_files(path=str(config_path), basedir=None,
+                                        files=files, names=names):
+            return None
+        environment = [(name, os.environ.get(name)) for name in sorted(names)]
+        return (resolved, os.getcwd(), files, environment, __version__)
+
+    @staticmethod
+    def _hocon_files(path: str,
+                     basedir: Optional[str],
+                     files: List[Tuple[str, Optional[str]]],
+                     names: Set[str]) -> bool:
+        '''Adds the path and content hash of the HOCON file, and of every file it
+        includes (recursively), to ``files``, and the names of the substitutions
+        to ``names``.  Missing files have no content hash.  Returns False if the
+        file includes a URL, package, or glob.'''
+        if any(path == p for p, _ in files):
+            return True
+        try:
+            with open(path, 'rb') as fh:
+                content = fh.read()
+        except OSError:
+            files.append((path, None))
+            return True
+        files.append((path, hashlib.sha256(content).hexdigest()))
+        text = content.decode('utf-8', errors='replace')
+        names.update(ConfigCache._SUBSTITUTION.findall(text))
+        for kind, value in ConfigCache._INCLUDE.findall(text):
+            if kind.lower() not in ['', 'file'] or '*' in value or '?' in value \
+                    or '://' in value:
+                return False
+            included = value if basedir is None else os.path.join(basedir, value)
+            if not ConfigCache._hocon_files(path=included, basedir=os.path.dirname(included),
+                                            files=files, names=names):
+                return False
+        return True
+
+
+class ListingCache(object):
+    '''Caches the rendered listing of the available workflows on disk.
+
+    Each listing has a single entry, named after a hash of the given key and
+    the Snakeparse version.  The key must describe everything the listing
+    depends on, for example the content hash of the catalog the workflows come
+    from, and the width of the terminal.  Failures to read or write the cache
+    are not fatal: the listing is simply rendered.
+
+    Keyword Arguments
+    -----------------
+    cache_dir : Path
+        The directory in which to store the cache entries.  Will be created if
+        it does not exist.
+    '''
+
+    '''The suffix of the cache entry files.'''
+    SUFFIX = '.listing.txt'
+
+    def __init__(self, cache_dir: Path) -> None:
+        self.cache_dir = cache_dir
+
+    def get(self, key: str) -> Optional[str]:
+        '''Returns the listing cached for the given key, or None if none is
+        cached.'''
+        try:
+            with self._entry_path(key=key).open('r', encoding='utf-8') as fh:
+                return fh.read()
+        except (OSError, UnicodeDecodeError):
+            return None
+
+    def put(self, key: str, listing: str) -> None:
+        '''Caches the listing for the given key.'''
+        _write_entry(cache_dir=self.cache_dir, entry=self._entry_path(key=key),
+                     data=listing.encode('utf-8'))
+
+    def _entry_path(self, key: str) -> Path:
+        '''The path to the cache entry for the given key.'''
+        digest = hashlib.sha256(f'{key}:{__version__}'.encode('utf-8')).hexdigest()
+        return self.cache_dir / (digest + ListingCache.SUFFIX)
+
+
+class DirectoryCache(object):
+    '''Caches the listings of directories on disk, so that directories that
+    have not changed need not be listed again when expanding snakefile globs
+    (see :mod:`~snakeparse.discovery`).
+
+    The listings are stored in a single entry, mapping the absolute path of
+    each directory to its modification time, the time it was listed, and its
+    entries' names and kinds.  A listing is only used if the directory's
+    modification time is unchanged, and was at least
+    :attr:`~snakeparse.cache.DirectoryCache.RACY_NANOS` before the directory
+    was listed, so that a change made within the file system's timestamp
+    granularity of the listing is not missed.  Failures to read or write the
+    cache are not fatal: the directories are simply listed.
+
+    Keyword Arguments
+    -----------------
+    cache_dir : Optional[Path]
+        The directory in which to store the cache entry.  Will be created if it
+        does not exist.  If not given, the listings are only kept in memory.
+    '''
+
+    '''The name of the cache entry file.'''
+    NAME = 'directories.marshal'
+
+    '''The nanoseconds a directory must have been unmodified for when it was
+    listed for the listing to be used.'''
+    RACY_NANOS = 2_000_000_000
+
+    def __init__(self, cache_dir: Optional[Path]) -> None:
+        self.cache_dir = cache_dir
+        self.listings: Dict[str, Tuple[int, int, Tuple[Tuple[str, int], ...]]] = {}
+        self.dirty     = False
+        if cache_dir is None:
+            return
+        try:
+            with (cache_dir / DirectoryCache.NAME).open('rb') as fh:
+                version, listings = marshal.load(fh)
+            if version == __version__ and isinstance(listings, dict):
+                self.listings = listings
+        except Exception:
+            pass
+
+    def get(self, directory: str, mtime_ns: int) -> Optional[Tuple[Tuple[str, int], ...]]:
+        '''Returns the entries cached for the directory with the given
+        modification time, or None if none are cached.'''
+        cached = self.listings.get(directory)
+        if cached is None or cached[0] != mtime_ns or cached[1] - mtime_ns < self.RACY_NANOS:
+            return None
+        return cached[2]
+
+    def put(self, directory: str, mtime_ns: int, listed_ns: int,
+            entries: Tuple[Tuple[str, int], ...]) -> None:
+        '''Caches the entries of the directory, listed at the given time.'''
+        self.listings[directory] = (mtime_ns, listed_ns, entries)
+        self.dirty = True
+
+    def discard(self, directory: str) -> None:
+        '''Removes the entries cached for the directory, if any.'''
+        if self.listings.pop(directory, None) is not None:
+            self.dirty = True
+
+    def save(self) -> None:
+        '''Writes the cache entry, if any listings were added or removed.'''
+        if self.dirty and self.cache_dir is not None:
+            _write_entry(cache_dir=self.cache_dir, entry=self.cache_dir / DirectoryCache.NAME,
+                         data=marshal.dumps((__version__, self.listings)))
+            self.dirty = False
+
+
+def _write_entry(cache_dir: Path, entry: Path, data: bytes) -> None:
+    '''Atomically writes a cache entry, ignoring any failures.'''
+    # import here, so that completion (see :mod:`~snakeparse.completion`) does
+    # not import it
+    import tempfile
+    tmp: Optional[str] = None
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile('wb', dir=str(cache_dir),
+                                         suffix='.tmp', delete=False) as fh:
+            tmp = fh.name
+            fh.write(data)
+        os.replace(tmp, str(entry))
+    except OSError:
+        if tmp is not None and os.path.exists(tmp):
+            os.unlink(tmp)
@@ -0,0 +1,195 @@
+'''A precomputed catalog of workflows for fast startup.
+
+Creating a :class:`~snakeparse.api.SnakeParseConfig` finds the snakefiles
+matching the configured globs and loads each one to find its group and
+description.  When the snakefiles do not change between invocations (for
+example, in an immutable deployment image), all of this can be done once, with
+``snakeparse build-catalog``, and stored in a catalog file.  Giving the catalog
+to the configuration (``catalog=path``) then skips finding and loading the
+snakefiles entirely.
+
+The catalog is a JSON file holding, for each workflow, its name, the absolute
+path to its snakefile, its group, description, aliases, argument
+specifications (see :class:`~snakeparse.metadata.WorkflowMetadata`), and the
+schema of its parser's arguments (see :mod:`~snakeparse.schema`), and the
+modification time, size, and content hash of its snakefile.  As the schema is
+exported from the workflow's parser, building the catalog executes every
+snakefile.  The schema lets the workflow's arguments be validated without
+building its parser.  When the catalog is loaded, each snakefile is checked
+with a single ``stat`` call; a workflow whose snakefile was modified since the
+catalog was built is loaded as if it were not in the catalog.
+
+The module contains the following public classes and methods:
+
+    - :class:`~snakeparse.catalog.CatalogEntry` -- The catalog entry for a
+      single workflow.
+    - :class:`~snakeparse.catalog.WorkflowCatalog` -- The catalog of workflows.
+    - :func:`~snakeparse.catalog.build_catalog_main` -- The entry point for
+      ``snakeparse build-catalog``.
+'''
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, IO, List, NamedTuple, Optional
+
+
+class CatalogEntry(NamedTuple):
+    '''The catalog entry for a single workflow.
+
+    Attributes
+    ----------
+    name : str
+        The canonical name of the workflow.
+    snakefile : str
+        The absolute path to the workflow's snakefile.
+    group : Optional[str]
+        The name of the workflow group.
+    description : Optional[str]
+        A short description of the workflow.
+    aliases : List[str]
+        The other names for the workflow.
+    arguments : Optional[List[Dict[str, Any]]]
+        The specification of each argument of the workflow's parser, if known.
+    schema : Optional[Dict[str, Any]]
+        The schema of the arguments of the workflow's parser, if it uses the
+        argparse module.
+    mtime_ns : int
+        The modification time of the snakefile, in nanoseconds.
+    size : int
+        The size of the snakefile, in bytes.
+    sha256 : str
+        The SHA-256 hex digest of the snakefile's contents.
+    '''
+    name: str
+    snakefile: str
+    group: Optional[str]
+    description: Optional[str]
+    aliases: List[str]
+    arguments: Optional[List[Dict[str, Any]]]
+    schema: Optional[Dict[str, Any]]
+    mtime_ns: int
+    size: int
+    sha256: str
+
+    def is_current(self) -> bool:
+        '''True if the snakefile has the same modification time and size as
+        when the catalog was built.'''
+        try:
+            stat = os.stat(self.snakefile)
+        except OSError:
+            return False
+        return stat.st_mtime_ns == self.mtime_ns and stat.st_size == self.size
+
+
+class WorkflowCatalog(object):
+    '''A catalog of workflows and their metadata.
+
+    Keyword Arguments
+    -----------------
+    entries : List[CatalogEntry]
+        The entries for each workflow.
+    groups : Dict[str, Optional[str]]
+        The description of each workflow group.
+    digest : Optional[str]
+        The SHA-256 hex digest of the catalog file, if loaded from a file.
+    '''
+
+    '''The version of the catalog file format.'''
+    VERSION = 2
+
+    def __init__(self,
+                 entries: List[CatalogEntry],
+                 groups: Dict[str, Optional[str]],
+                 digest: Optional[str] = None) -> None:
+        self.entries = entries
+        self.groups  = groups
+        self.digest  = digest
+
+    @staticmethod
+    def from_config(config: Any) -> 'WorkflowCatalog':
+        '''Builds the catalog for the workflows in the given
+        :class:`~snakeparse.api.SnakeParseConfig`, loading every snakefile.'''
+        # import here to avoid a circular import
+        from .api import SnakeArgumentParser, SnakeParseException
+        entries = []
+        for workflow in config.workflows.values():
+            metadata = config.metadata_from(workflow=workflow, cache=config.cache)
+            try:
+                parser = config.parser_for(workflow=workflow)
+            except SnakeParseException:
+                parser = None
+            schema = parser.schema() if isinstance(parser, SnakeArgumentParser) else None
+            snakefile = workflow.snakefile.resolve()
+            with snakefile.open('rb') as fh:
+                stat = os.fstat(fh.fileno())
+                digest = hashlib.sha256(fh.read()).hexdigest()
+            entries.append(CatalogEntry(
+                name=workflow.name,
+                snakefile=str(snakefile),
+                group=workflow.group,
+                description=workflow.description,
+                aliases=list(workflow.aliases),
+                arguments=metadata.arguments,
+                schema=schema,
+                mtime_ns=stat.st_mtime_ns,
+                size=stat.st_size,
+                sha256=digest
+            ))
+        return WorkflowCatalog(entries=entries, groups=dict(config.groups))
+
+    @staticmethod
+    def load(path: Path) -> 'WorkflowCatalog':
+        '''Reads the catalog from the given file.'''
+        # import here to avoid a circular import
+        from .api import SnakeParseException
+        with path.open('rb') as fh:
+            content = fh.read()
+        data = json.loads(content)
+        if data.get('version') != WorkflowCatalog.VERSION:
+            raise SnakeParseException(f"Unsupported catalog version '{data.get('version')}'"
+                                      f" in {path}; rebuild it with 'snakeparse build-catalog'")
+        return WorkflowCatalog(entries=[CatalogEntry(**entry) for entry in data['workflows']],
+                               groups=data['groups'],
+                               digest=hashlib.sha256(content).hexdigest())
+
+    def save(self, path: Path) -> None:
+        '''Atomically writes the catalog to the given file.'''
+        data = {
+            'version': WorkflowCatalog.VERSION,
+            'groups': self.groups,
+            'workflows': [entry._asdict() for entry in self.entries]
+        }
+        directory = path.parent
+        with tempfile.NamedTemporaryFile('w', dir=str(directory), suffix='.tmp',
+                                         delete=False) as fh:
+            json.dump(data, fh, separators=(',', ':'))
+        os.replace(fh.name, str(path))
+
+
+def build_catalog_main(args: List[str], file: IO[str] = sys.stdout) -> int:
+    '''Builds a catalog from the snakeparse options in the given arguments, and
+    writes it to the path given with ``-o/--output``.  Returns the exit code.'''
+    from .api import SnakeParse, SnakeParseConfig, SnakeParseException
+    parser = SnakeParseConfig.config_parser(
+        usage='snakeparse build-catalog [snakeparse options] --output catalog.json'
+    )
+    parser.add_argument('-o', '--output', help='The path to the catalog to write.',
+                        type=Path, required=True)
+    try:
+        config_args = parser.parse_args(args)
+        if config_args.catalog is not None:
+            raise SnakeParseException('--catalog cannot be given when building a catalog')
+        config = SnakeParse.config_from_args(config_args=config_args)
+        catalog = WorkflowCatalog.from_config(config=config)
+        catalog.save(path=config_args.output)
+    except SnakeParseException as e:
+        parser.print_help(file=file, suppress=False)  # type: ignore
+        if e.args and e.args[0]:
+            file.write(f'\nerror: {e}\n')
+        return 2
+    file.write(f'Wrote {len(catalog.entries)} workflows to {config_args.output}\n')
+    return 0
@@ -0,0 +1,82 @@
+'''A client for the snakeparse server.
+
+Starting ``snakeparse`` requires importing Snakemake and loading every
+workflow's snakefile, which dominates the run time of short invocations.  The
+snakeparse server (see :mod:`~snakeparse.server`) keeps these loaded, and this
+module forwards the command line arguments of an invocation to it.  To keep the
+client fast, this module only uses the python standard library.
+
+Requests and responses are sent over a Unix domain socket as lines of JSON.
+The request is a single object with the command line arguments (``args``), the
+current working directory (``cwd``), the environment (``env``), and whether or
+not to run the workflow after validating its arguments (``run``).  The
+response is zero or more objects with output to write (``out``), followed by
+an object with the exit code (``exit``).
+
+The module contains the following public methods:
+
+    - :func:`~snakeparse.client.default_socket_path` -- The default path to the
+      server's socket.
+    - :func:`~snakeparse.client.connect` -- Connects to the server.
+    - :func:`~snakeparse.client.request` -- Sends the command line arguments to
+      the server, writing its output, and returns the exit code.
+'''
+
+import json
+import os
+import socket
+import sys
+import tempfile
+from pathlib import Path
+from typing import IO, List
+
+
+'''The environment variable with the path to the server's socket.  When set,
+the ``snakeparse`` command forwards its arguments to the server.'''
+SOCKET_ENV = 'SNAKEPARSE_SOCKET'
+
+
+def default_socket_path() -> Path:
+    '''Returns the default path to the server's socket, namely
+    ``$XDG_RUNTIME_DIR/snakeparse.sock``, or a path in the temporary directory
+    specific to the user if ``XDG_RUNTIME_DIR`` is not set.'''
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return Path(runtime_dir) / 'snakeparse.sock'
+    return Path(tempfile.gettempdir()) / f'snakeparse-{os.getuid()}.sock'
+
+
+def connect(socket_path: Path) -> socket.socket:
+    '''Connects to the server listening on the given socket.  Raises an
+    :class:`OSError` if the server is not running.'''
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(socket_path))
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def request(args: List[str],
+            sock: socket.socket,
+            run: bool = True,
+            file: IO[str] = sys.stdout) -> int:
+    '''Sends the command line arguments to the server on the given (connected)
+    socket, writes the output of the server to the given file, and returns the
+    exit code.  If ``run`` is False, the arguments are only validated.  The
+    workflow is stopped if the socket is closed before it completes.'''
+    message = {'args': list(args), 'cwd': os.getcwd(), 'env': dict(os.environ), 'run': run}
+    with sock, sock.makefile('rwb') as fh:
+        fh.write(json.dumps(message).encode('utf-8') + b'\n')
+        fh.flush()
+        for line in fh:
+            response = json.loads(line)
+            if 'out' in response:
+                file.write(response['out'])
+                file.flush()
+            if 'exit' in response:
+                return int(response['exit'])
+    # the server closed the connection unexpectedly
+    file.write('error: lost the connection to the snakeparse server\n')
+    return 1
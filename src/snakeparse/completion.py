@@ -0,0 +1,502 @@
+'''Shell completion for ``snakeparse``, answered from a precomputed index.
+
+Completing workflow names, or the options of a workflow, from a
+:class:`~snakeparse.api.SnakeParseConfig` would find and load every snakefile
+on every press of TAB.  Instead, the names of the workflows (and their
+aliases), the options of Snakemake, and the options of each workflow are
+stored in a :class:`~snakeparse.completion.CompletionIndex` in the cache
+directory, and completions are answered from the index without importing
+:mod:`~snakeparse.api` (or Snakemake).
+
+Register completion by adding the output of ``snakeparse completion bash`` (or
+``zsh``, or ``fish``) to the shell's startup file, for example:
+
+.. code-block:: bash
+
+    eval "$(snakeparse completion bash)"
+
+The shell then runs ``snakeparse __complete -- <words>`` to complete the last
+of the words.  The index is keyed by the working directory and the snakeparse
+options that select the workflows (e.g. ``--config``, ``--snakefile-globs``,
+and ``--catalog``), so different configurations have separate indexes.  The
+index records the modification time and size of the configuration file, the
+catalog, every snakefile, and every directory listed when expanding the
+snakefile globs.  When any of these changed, or there is no index yet, the
+completion is answered from the index as it is (if any), and a new index is
+built by a background process (``snakeparse __complete --refresh``), so
+completion never waits for the snakefiles to be loaded.
+
+The module contains the following public classes and methods:
+
+    - :class:`~snakeparse.completion.CompletionIndex` -- The workflow names and
+      options used to complete a command line.
+    - :func:`~snakeparse.completion.complete` -- Returns the completions of the
+      last of the given words.
+    - :func:`~snakeparse.completion.completion_script` -- Returns the script
+      that registers completion with a shell.
+    - :func:`~snakeparse.completion.completion_main` -- The entry point for
+      ``snakeparse completion``.
+    - :func:`~snakeparse.completion.complete_main` -- The entry point for
+      ``snakeparse __complete``.
+'''
+
+import hashlib
+import marshal
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, IO, List, NamedTuple, Optional, Sequence, Tuple
+
+from .cache import _write_entry, default_cache_dir
+from .version import __version__
+
+
+'''The options of an index, mapping each option string to None if the option
+takes no value, otherwise to the values it may take (empty if any).'''
+Options = Dict[str, Optional[List[str]]]
+
+'''The snakeparse options (see
+:meth:`~snakeparse.api.SnakeParseConfig.config_parser`), mapping each option
+string to the number of values it takes, with -1 for any number of values.
+Kept here so that completing does not import :mod:`~snakeparse.api`.'''
+SNAKEPARSE_OPTIONS = {
+    '-h': 0, '--help': 0, '--config': 1, '--snakefile-globs': -1, '--prog': 1,
+    '--snakemake': 1, '--name-transform': 1, '--parent-dir-is-group-name': 1,
+    '--cache-dir': 1, '--no-cache': 0, '--lazy': 0, '--catalog': 1, '--load-jobs': 1,
+    '--in-process': 0, '--args-transport': 1, '--args-sidecar': 0, '--concurrency': 1,
+    '--total-cores': 1, '--fail-fast': 0, '--profile-startup': 0, '--profile-json': 1,
+    '--profile-cprofile': 1, '--extra-help': 1
+}
+
+'''The snakeparse options that select the workflows, so that each combination
+of their values has a separate index.'''
+_INDEX_OPTIONS = ['--config', '--snakefile-globs', '--name-transform', '--catalog']
+
+'''The commands of ``snakeparse`` that may be given instead of a workflow.'''
+_COMMANDS = ['batch', 'build-catalog', 'completion', 'concurrent']
+
+'''The suffix of the index files.'''
+_SUFFIX = '.completion.marshal'
+
+'''The seconds after which a refresh of an index that has not completed is
+assumed to have failed.'''
+_REFRESH_TIMEOUT = 300
+
+'''The shells for which a completion script is available.'''
+SHELLS = ['bash', 'zsh', 'fish']
+
+'''The completion script for each shell, with ``{function}`` replaced by the
+name of the completion function, and ``{commands}`` by the commands for which
+completion is registered.'''
+_SCRIPTS = {
+    'bash': '''\
+{function}() {{
+    local IFS=$'\\n'
+    COMPREPLY=($("${{COMP_WORDS[0]}}" __complete -- "${{COMP_WORDS[@]:1:$COMP_CWORD}}" \\
+        2>/dev/null))
+}}
+complete -o default -F {function} {commands}
+''',
+    'zsh': '''\
+{function}() {{
+    local -a completions
+    completions=("${{(@f)$("${{words[1]}}" __complete -- "${{(@)words[2,$CURRENT]}}" \\
+        2>/dev/null)}}")
+    if [[ -n "${{completions[1]}}" ]]; then
+        compadd -a completions
+    else
+        _files
+    fi
+}}
+compdef {function} {commands}
+''',
+    'fish': '''\
+function {function}
+    set -l previous (commandline -opc)
+    set -l current (commandline -ct)
+    if test (count $current) -eq 0
+        set current ''
+    end
+    set -l completions ($previous[1] __complete -- $previous[2..-1] $current 2>/dev/null)
+    if test (count $completions) -gt 0
+        printf '%s\\n' $completions
+    else
+        __fish_complete_path $current
+    end
+end
+for command in {commands}
+    complete -c $command -f -a '({function})'
+end
+'''
+}
+
+
+class CompletionIndex(NamedTuple):
+    '''The workflow names and options used to complete a command line.
+
+    Attributes
+    ----------
+    key : str
+        The key identifying the configuration the index was built for (see
+        :meth:`~snakeparse.completion.CompletionIndex.key_for`).
+    sources : List[Tuple[str, int, int]]
+        The path, modification time (in nanoseconds), and size of each file and
+        directory the workflows were found in or loaded from, with -1 for
+        those that did not exist.
+    workflows : Dict[str, str]
+        Maps each workflow name and alias to the canonical workflow name.
+    snakemake_options : Options
+        The options of Snakemake.
+    workflow_options : Dict[str, Options]
+        The options of each workflow, by canonical workflow name.
+    '''
+    key: str
+    sources: List[Tuple[str, int, int]]
+    workflows: Dict[str, str]
+    snakemake_options: Options
+    workflow_options: Dict[str, Options]
+
+    def is_current(self) -> bool:
+        '''True if none of the sources were modified since the index was
+        built.'''
+        for path, mtime_ns, size in self.sources:
+            if _signature(path=path) != (mtime_ns, size):
+                return False
+        return True
+
+    def complete(self, words: Sequence[str]) -> List[str]:
+        '''Returns the completions of the last of the given words.'''
+        return complete(words=words, index=self)
+
+    @staticmethod
+    def key_for(words: Sequence[str]) -> Tuple[str, Path]:
+        '''Returns the key of the index for the given words, and the path to the
+        index file.  Only the leading snakeparse options that select the
+        workflows, and the working directory, are part of the key.  The index
+        is stored in the directory given with ``--cache-dir``, otherwise in the
+        default cache directory.'''
+        end = _options_end(words=words)
+        selected: List[str] = []
+        cache_dir = default_cache_dir()
+        for option, values in _options(words=words[:end]):
+            if option in _INDEX_OPTIONS:
+                selected.append(option)
+                selected.extend(values)
+            elif option == '--cache-dir' and values:
+                cache_dir = Path(values[0])
+        key = '\0'.join([os.getcwd()] + selected)
+        digest = hashlib.sha256(f'{key}:{__version__}'.encode('utf-8')).hexdigest()
+        return key, cache_dir / (digest + _SUFFIX)
+
+    @staticmethod
+    def load(path: Path, key: str) -> Optional['CompletionIndex']:
+        '''Reads the index from the given file, returning None if it is missing,
+        corrupt, or not for the given key.'''
+        try:
+            # reading the file at once is much faster than unmarshalling from it
+            with path.open('rb') as fh:
+                version, values = marshal.loads(fh.read())
+            if version != __version__:
+                return None
+            index = CompletionIndex(*values)
+        except Exception:
+            return None
+        return index if index.key == key else None
+
+    def save(self, path: Path) -> None:
+        '''Atomically writes the index to the given file, ignoring any
+        failures.'''
+        _write_entry(cache_dir=path.parent, entry=path,
+                     data=marshal.dumps((__version__, tuple(self))))
+
+    @staticmethod
+    def build(words: Sequence[str]) -> 'CompletionIndex':
+        '''Builds the index for the configuration given by the leading
+        snakeparse options of the words, loading every snakefile.'''
+        # import here, as building the index is slow anyway
+        from .api import SnakeParse, SnakeParseConfig
+        from .discovery import DirectoryScanner
+
+        key, _ = CompletionIndex.key_for(words=words)
+        parser = SnakeParseConfig.config_parser()
+        config_args = parser.parse_args(list(words[:_options_end(words=words)]))
+        # only the names of the workflows are needed
+        config_args.lazy = True
+        config = SnakeParse.config_from_args(config_args=config_args)
+
+        paths: List[str] = []
+        if config_args.config is not None:
+            paths.append(str(config_args.config))
+        if config_args.catalog is not None:
+            paths.append(str(config_args.catalog))
+        if config.catalog is None and config.snakefile_globs:
+            scanner = DirectoryScanner()
+            for glob in config.snakefile_globs:
+                scanner.glob(pattern=glob)
+            paths.extend(scanner.directories)
+        workflows: Dict[str, str] = {}
+        for workflow in config.workflows.records():
+            paths.append(str(workflow.snakefile))
+            for name in [workflow.name] + list(workflow.aliases):
+                workflows[name] = workflow.name
+        sources = [(path,) + _signature(path=path) for path in paths]
+
+        entries = {} if config.catalog is None \
+            else {entry.name: entry for entry in config.catalog.entries}
+        workflow_options: Dict[str, Options] = {}
+        for workflow in config.workflows.records():
+            entry = entries.get(workflow.name)
+            arguments: Optional[List[Dict[str, Any]]] = None
+            if entry is not None and entry.is_current():
+                arguments = entry.arguments
+            if arguments is None:
+                try:
+                    arguments = config.metadata_from(workflow=workflow,
+                                                     cache=config.cache).arguments
+                except Exception:
+                    # the workflow's options are not completed
+                    pass
+            workflow_options[workflow.name] = _options_from(arguments=arguments or [])
+
+        try:
+            from snakemake import get_argument_parser
+            from .metadata import argument_spec
+            snakemake_options = _options_from(
+                arguments=[argument_spec(action)
+                           for action in get_argument_parser()._actions]
+            )
+        except ImportError:
+            snakemake_options = {}
+
+        return CompletionIndex(key=key, sources=sources, workflows=workflows,
+                               snakemake_options=snakemake_options,
+                               workflow_options=workflow_options)
+
+
+def complete(words: Sequence[str], index: Optional[CompletionIndex]) -> List[str]:
+    '''Returns the completions of the last of the given words (the words after
+    ``snakeparse`` on the command line), from the given index.  Without an
+    index, only the snakeparse options and commands are completed.
+
+    The words are split as :class:`~snakeparse.api.SnakeParse` splits its
+    arguments: the leading snakeparse options, then the Snakemake arguments up
+    to the first workflow name (or the word after ``--``), then the workflow's
+    arguments.  The options of the part the last word is in are completed if it
+    starts with ``-``, otherwise the workflow names if the workflow is not yet
+    given, unless the previous word is an option that takes a value.  Nothing
+    is returned when no completion is known (e.g. for a path), so that the
+    shell may complete a path.'''
+    if not words:
+        words = ['']
+    previous, current = list(words[:-1]), words[-1]
+    if previous[:1] == ['completion']:
+        return _matching(SHELLS, current) if len(previous) == 1 else []
+    elif previous[:1] in [['batch'], ['build-catalog']]:
+        # only the snakeparse options are known
+        if current.startswith('-') and _pending_values(previous[1:]) <= 0:
+            return _matching(list(SNAKEPARSE_OPTIONS), current)
+        return []
+    elif previous[:1] == ['concurrent']:
+        # each invocation after '++' is completed as the first
+        start = len(previous) - previous[::-1].index('++') if '++' in previous else 1
+        return [word for word in complete(words=words[start:], index=index)
+                if word not in _COMMANDS]
+
+    workflows = {} if index is None else index.workflows
+    options = {} if index is None else index.snakemake_options
+    end = _options_end(words=previous)
+    if end == len(previous):
+        # still in the snakeparse options
+        pending = _pending_values(previous)
+        if current.startswith('-') and pending <= 0:
+            return _matching(list(SNAKEPARSE_OPTIONS) + list(options), current)
+        elif pending != 0:
+            return []
+        elif not previous:
+            return _matching(_COMMANDS + list(workflows), current)
+        return _matching(list(workflows), current)
+
+    # find the workflow, if given
+    name: Optional[str] = None
+    start = end
+    rest = previous[end:]
+    if '--' in rest:
+        idx = end + rest.index('--')
+        if idx + 1 == len(previous):
+            return _matching(list(workflows), current)
+        name = workflows.get(previous[idx + 1])
+        start = idx + 2
+    else:
+        for idx in range(end, len(previous)):
+            name = workflows.get(previous[idx])
+            if name is not None:
+                start = idx + 1
+                break
+    if name is not None and index is not None:
+        options = index.workflow_options.get(name, {})
+
+    if len(previous) > start and previous[-1] in options:
+        values = options[previous[-1]]
+        if values is not None:
+            return _matching(values, current)
+    if current.startswith('-'):
+        return _matching(list(options), current)
+    return [] if name is not None else _matching(list(workflows), current)
+
+
+def completion_script(shell: str, commands: Sequence[str] = ('snakeparse',)) -> str:
+    '''Returns the script that registers completion of the given commands with
+    the given shell (one of :data:`~snakeparse.completion.SHELLS`).'''
+    if shell not in _SCRIPTS:
+        raise ValueError(f"Unknown shell '{shell}', must be one of: {', '.join(SHELLS)}")
+    return _SCRIPTS[shell].format(function='_snakeparse_completion',
+                                  commands=' '.join(commands))
+
+
+def completion_main(args: List[str], file: IO[str] = sys.stdout) -> int:
+    '''Writes the completion script for the shell given in the arguments,
+    optionally followed by the commands to register completion for.  Returns
+    the exit code.'''
+    if not args or args[0] not in SHELLS:
+        file.write('Usage: snakeparse completion {' + ','.join(SHELLS) + '} [command ...]\n')
+        return 2
+    file.write(completion_script(shell=args[0], commands=args[1:] or ['snakeparse']))
+    return 0
+
+
+def complete_main(args: List[str], file: IO[str] = sys.stdout) -> int:
+    '''Writes the completions (one per line) of the last of the words after
+    ``--`` in the arguments, refreshing the index in a background process when
+    needed.  With ``--refresh``, instead builds the index for the words.
+    Returns the exit code.'''
+    refresh = args[:1] == ['--refresh']
+    if refresh:
+        args = args[1:]
+    words = args[1:] if args[:1] == ['--'] else args
+    if refresh:
+        key, path = CompletionIndex.key_for(words=words)
+        try:
+            CompletionIndex.build(words=words).save(path=path)
+        finally:
+            _unlock(path=path)
+        return 0
+
+    # the last word is being completed, so is not part of the key, while the
+    # snakeparse options follow the concurrent command
+    options = words[1:-1] if words[:1] == ['concurrent'] else words[:-1]
+    key, path = CompletionIndex.key_for(words=options)
+    index = CompletionIndex.load(path=path, key=key)
+    if index is None or not index.is_current():
+        _refresh_in_background(words=options, path=path)
+    for completion in complete(words=words, index=index):
+        file.write(completion + '\n')
+    return 0
+
+
+def _options_end(words: Sequence[str]) -> int:
+    '''The index of the first of the words after the leading snakeparse options
+    (and their values).'''
+    idx = 0
+    while idx < len(words):
+        option = words[idx].split('=', 1)[0]
+        nargs = SNAKEPARSE_OPTIONS.get(option)
+        if nargs is None:
+            break
+        idx += 1
+        if '=' in words[idx - 1] or nargs == 0:
+            continue
+        elif nargs == -1:
+            while idx < len(words) and not words[idx].startswith('-'):
+                idx += 1
+        else:
+            idx += nargs
+    return min(idx, len(words))
+
+
+def _options(words: Sequence[str]) -> List[Tuple[str, List[str]]]:
+    '''Splits the snakeparse options into each option and its values.'''
+    options: List[Tuple[str, List[str]]] = []
+    for word in words:
+        if word.split('=', 1)[0] in SNAKEPARSE_OPTIONS:
+            option, _, value = word.partition('=')
+            options.append((option, [value] if value else []))
+        elif options:
+            options[-1][1].append(word)
+    return options
+
+
+def _pending_values(words: Sequence[str]) -> int:
+    '''The number of values the last of the snakeparse options in the words
+    still takes, with -1 for any number of values.'''
+    options = _options(words=words)
+    if not options or '=' in words[-1]:
+        return 0
+    option, values = options[-1]
+    nargs = SNAKEPARSE_OPTIONS[option]
+    return -1 if nargs == -1 else max(nargs - len(values), 0)
+
+
+def _matching(candidates: Sequence[str], prefix: str) -> List[str]:
+    '''The sorted candidates starting with the prefix.'''
+    return sorted(set(c for c in candidates if c.startswith(prefix)))
+
+
+def _options_from(arguments: List[Dict[str, Any]]) -> Options:
+    '''The options of the given argument specifications (see
+    :func:`~snakeparse.metadata.argument_spec`).'''
+    options: Options = {}
+    for spec in arguments:
+        # options with an optional value are completed as if they take none
+        if spec['nargs'] in [0, '?', '*']:
+            values = None
+        else:
+            values = [str(choice) for choice in spec['choices'] or []]
+        for option in spec['option_strings']:
+            options[option] = values
+    return options
+
+
+def _signature(path: str) -> Tuple[int, int]:
+    '''The modification time and size of the path, or -1 for both if it does
+    not exist.'''
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return -1, -1
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _refresh_in_background(words: Sequence[str], path: Path) -> None:
+    '''Builds the index for the words (the snakeparse options of which select
+    the configuration) in a detached process, unless a refresh of the index is
+    already in progress.'''
+    lock = path.with_name(path.name + '.lock')
+    try:
+        lock.parent.mkdir(parents=True, exist_ok=True)
+        if time.time() - lock.stat().st_mtime < _REFRESH_TIMEOUT:
+            return
+        lock.unlink()
+    except OSError:
+        pass
+    try:
+        os.close(os.open(str(lock), os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except OSError:
+        return
+
+    import subprocess
+    command = [sys.executable, '-m', 'snakeparse', '__complete', '--refresh', '--']
+    try:
+        subprocess.Popen(command + list(words),
+                         stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                         stderr=subprocess.DEVNULL, start_new_session=True)
+    except OSError:
+        _unlock(path=path)
+
+
+def _unlock(path: Path) -> None:
+    '''Removes the lock held while refreshing the index.'''
+    try:
+        path.with_name(path.name + '.lock').unlink()
+    except OSError:
+        pass
@@ -0,0 +1,214 @@
+'''Finds the snakefiles matching the configured globs.
+
+Expanding each glob with :meth:`pathlib.Path.glob` lists every directory the
+glob may match, for every glob, on every invocation.  On a large (or network
+mounted) repository of snakefiles, a ``**/*.smk`` glob may list tens of
+thousands of directories.  Instead, the globs are expanded together by a
+:class:`~snakeparse.discovery.DirectoryScanner`, which:
+
+    - lists each directory at most once, however many globs walk it;
+    - only lists the directories a glob can match: literal path components are
+      checked with a single ``stat``, and the entries that are not directories
+      are not descended into;
+    - optionally, keeps the listings in a :class:`~snakeparse.cache.DirectoryCache`,
+      so that on later invocations only the directories whose modification
+      time changed are listed again.
+
+The globs match as with :meth:`pathlib.Path.glob`: ``**`` matches zero or more
+directories (without following symbolic links), and absolute globs are
+matched from the root directory, and relative globs from the working
+directory.  The paths found are known to exist, so they need not be checked
+again.  The entries of a cached listing are assumed not to have changed kind
+(e.g. a symbolic link now pointing to a directory) without the directory being
+modified.
+
+The module contains the following public classes and methods:
+
+    - :class:`~snakeparse.discovery.DirectoryScanner` -- Matches globs against
+      directories, listing each directory at most once.
+    - :func:`~snakeparse.discovery.expand_globs` -- Expands the snakefile globs
+      with a single scanner.
+'''
+
+import fnmatch
+import os
+import re
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+from .cache import DirectoryCache
+
+
+'''The kind of a directory entry that is a directory, after following symbolic
+links.'''
+IS_DIR = 1
+
+'''The kind of a directory entry that is a symbolic link.'''
+IS_SYMLINK = 2
+
+'''A component of a glob: ``**``, a wildcard pattern, or a literal name.'''
+_Part = Tuple[str, Union[str, Callable[[str], Optional[re.Match]]]]
+
+
+class DirectoryScanner(object):
+    '''Matches globs against the file system, listing each directory at most
+    once.
+
+    Keyword Arguments
+    -----------------
+    cache : Optional[DirectoryCache]
+        Optionally, the cache from which to retrieve, and in which to store,
+        the listings of directories.
+
+    Attributes
+    ----------
+    listed : int
+        The number of directories listed (rather than retrieved from the
+        cache).
+    '''
+
+    def __init__(self, cache: Optional[DirectoryCache] = None) -> None:
+        self.cache     = cache
+        self.cwd       = os.getcwd()
+        self.listed    = 0
+        self._listings: Dict[str, Tuple[Tuple[str, int], ...]] = {}
+
+    @property
+    def directories(self) -> List[str]:
+        '''The absolute paths of the directories listed so far (or whose
+        listings were retrieved from the cache).'''
+        return list(self._listings.keys())
+
+    def glob(self, pattern: str) -> List[Path]:
+        '''Returns the paths matching the glob, in the order they are found.'''
+        if pattern.startswith('/'):
+            root = '/'
+        else:
+            root = ''
+        parts = self._parts(pattern=pattern)
+        found: Set[str] = set()
+        paths: List[Path] = []
+        for path in self._select(parts=parts, index=0, directory=root):
+            if path not in found:
+                found.add(path)
+                paths.append(Path(path))
+        return paths
+
+    def entries(self, directory: str) -> Tuple[Tuple[str, int], ...]:
+        '''Returns the name and kind (see :data:`~snakeparse.discovery.IS_DIR`
+        and :data:`~snakeparse.discovery.IS_SYMLINK`) of each entry in the
+        directory (the working directory if empty), sorted by name, or nothing
+        if the directory cannot be listed.'''
+        key     = os.path.normpath(os.path.join(self.cwd, directory))
+        listing = self._listings.get(key)
+        if listing is None:
+            listing = self._list(directory=key)
+            self._listings[key] = listing
+        return listing
+
+    def _list(self, directory: str) -> Tuple[Tuple[str, int], ...]:
+        '''Lists the directory, or retrieves its listing from the cache.'''
+        mtime_ns = 0
+        if self.cache is not None:
+            try:
+                mtime_ns = os.stat(directory).st_mtime_ns
+            except OSError:
+                self.cache.discard(directory=directory)
+                return ()
+            cached = self.cache.get(directory=directory, mtime_ns=mtime_ns)
+            if cached is not None:
+                return cached
+
+        listed_ns = time.time_ns()
+        entries: List[Tuple[str, int]] = []
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    kind = 0
+                    try:
+                        if entry.is_symlink():
+                            kind |= IS_SYMLINK
+                        if entry.is_dir():
+                            kind |= IS_DIR
+                    except OSError:
+                        pass
+                    entries.append((entry.name, kind))
+        except OSError:
+            return ()
+        self.listed += 1
+        listing = tuple(sorted(entries))
+        if self.cache is not None:
+            self.cache.put(directory=directory, mtime_ns=mtime_ns, listed_ns=listed_ns,
+                           entries=listing)
+        return listing
+
+    @staticmethod
+    def _parts(pattern: str) -> List[_Part]:
+        '''Splits the glob into its components.'''
+        parts: List[_Part] = []
+        for part in pattern.split('/'):
+            if part in ['', '.']:
+                continue
+            elif part == '**':
+                parts.append(('**', part))
+            elif '**' in part:
+                raise ValueError("Invalid pattern: '**' can only be an entire path component")
+            elif '*' in part or '?' in part or '[' in part:
+                parts.append(('*', re.compile(fnmatch.translate(part)).fullmatch))
+            else:
+                parts.append(('', part))
+        if not parts:
+            raise ValueError(f'Unacceptable pattern: {pattern!r}')
+        return parts
+
+    @staticmethod
+    def _join(directory: str, name: str) -> str:
+        if not directory:
+            return name
+        elif directory.endswith('/'):
+            return directory + name
+        return directory + '/' + name
+
+    def _select(self, parts: List[_Part], index: int, directory: str) -> Iterator[str]:
+        '''Yields the paths in the directory matching the glob components from
+        the given index onwards.'''
+        if index == len(parts):
+            yield directory
+            return
+        kind, value = parts[index]
+        last = index == len(parts) - 1
+        if kind == '**':
+            for subdirectory in self._directories(directory=directory):
+                yield from self._select(parts=parts, index=index + 1, directory=subdirectory)
+        elif kind == '*':
+            assert callable(value)
+            for name, entry_kind in self.entries(directory=directory):
+                if (last or entry_kind & IS_DIR) and value(name):
+                    yield from self._select(parts=parts, index=index + 1,
+                                            directory=self._join(directory, name))
+        else:
+            assert isinstance(value, str)
+            path = self._join(directory, value)
+            if (os.path.exists if last else os.path.isdir)(path):
+                yield from self._select(parts=parts, index=index + 1, directory=path)
+
+    def _directories(self, directory: str) -> Iterator[str]:
+        '''Yields the directory, then every directory below it, without
+        following symbolic links.'''
+        yield directory
+        for name, kind in self.entries(directory=directory):
+            if kind & IS_DIR and not kind & IS_SYMLINK:
+                yield from self._directories(directory=self._join(directory, name))
+
+
+def expand_globs(globs: Sequence[str],
+                 cache: Optional[DirectoryCache] = None) -> List[List[Path]]:
+    '''Returns the paths matching each glob, sharing the listings of
+    directories across the globs, and storing them in the cache if given.'''
+    scanner = DirectoryScanner(cache=cache)
+    try:
+        return [scanner.glob(pattern=glob) for glob in globs]
+    finally:
+        if cache is not None:
+            cache.save()
@@ -0,0 +1,126 @@
+'''An index for resolving workflow names given on the command line.
+
+The module contains the following public classes:
+
+    - :class:`~snakeparse.index.WorkflowIndex` -- Resolves names, aliases,
+      case-insensitive names, and unique prefixes to the canonical workflow
+      name, and suggests similar names for unknown ones.
+'''
+
+import difflib
+from typing import Dict, Iterable, List, Optional, Set
+
+
+class _TrieNode(object):
+    '''A node in a prefix trie, storing the canonical names of all keys that
+    have the node's prefix.'''
+    __slots__ = ['children', 'names']
+
+    def __init__(self) -> None:
+        self.children: Dict[str, '_TrieNode'] = {}
+        self.names: Set[str] = set()
+
+
+class WorkflowIndex(object):
+    '''Resolves workflow names and aliases to canonical workflow names.
+
+    Exact lookups of a name or alias are a single hash lookup.  Case-insensitive
+    lookups are also a single hash lookup, while unique-prefix lookups walk a
+    prefix trie (case-insensitive) built once, so their cost depends only on the
+    length of the given prefix, not the number of workflows.
+
+    Keyword Arguments
+    -----------------
+    names : Iterable[str]
+        The canonical workflow names.
+    aliases : Optional[Dict[str, Iterable[str]]]
+        Optionally, the aliases for each canonical workflow name.
+    '''
+
+    def __init__(self,
+                 names: Iterable[str] = (),
+                 aliases: Optional[Dict[str, Iterable[str]]] = None) -> None:
+        self._keys: Dict[str, str] = {}
+        self._names: Dict[str, List[str]] = {}
+        self._folded: Dict[str, Set[str]] = {}
+        self._root = _TrieNode()
+        for name in names:
+            self.add(name=name, aliases=[] if aliases is None else aliases.get(name, []))
+
+    def add(self, name: str, aliases: Iterable[str] = ()) -> None:
+        '''Adds the canonical workflow name and its aliases.  Names and aliases
+        must be unique across all workflows.'''
+        # import here to avoid a circular import
+        from .api import SnakeParseException
+        keys = [name] + [alias for alias in aliases if alias != name]
+        for key in keys:
+            if key in self._keys:
+                raise SnakeParseException(f"Multiple workflows with name or alias '{key}'.")
+        self._names[name] = keys
+        for key in keys:
+            self._keys[key] = name
+            folded = key.casefold()
+            self._folded.setdefault(folded, set()).add(name)
+            node = self._root
+            node.names.add(name)
+            for char in folded:
+                node = node.children.setdefault(char, _TrieNode())
+                node.names.add(name)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._keys
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def get(self, key: str) -> Optional[str]:
+        '''Returns the canonical name for the given workflow name or alias, or
+        None if there is none.'''
+        return self._keys.get(key)
+
+    def resolve(self, key: str, ignore_case: bool = True, prefix: bool = True) -> Optional[str]:
+        '''Returns the canonical name for the given workflow name or alias,
+        optionally ignoring case, and optionally accepting a prefix that matches a
+        single workflow.  Returns None if the key does not resolve to a single
+        workflow.'''
+        name = self._keys.get(key)
+        if name is not None:
+            return name
+        if ignore_case:
+            names = self._folded.get(key.casefold(), set())
+            if len(names) == 1:
+                return next(iter(names))
+        if prefix and key:
+            names = self._names_with_prefix(prefix=key)
+            if len(names) == 1:
+                name = next(iter(names))
+                # the trie is case-insensitive, so check the case if needed
+                if ignore_case or any(k.startswith(key) for k in self._names[name]):
+                    return name
+        return None
+
+    def completions(self, prefix: str) -> List[str]:
+        '''Returns the sorted canonical names of the workflows with a name or
+        alias starting with the given prefix, ignoring case.'''
+        return sorted(self._names_with_prefix(prefix=prefix))
+
+    def suggestions(self, key: str, n: int = 3) -> List[str]:
+        '''Returns up to ``n`` canonical names of workflows similar to the given
+        key, for "did you mean" messages.  Workflows whose name or alias starts
+        with the key are returned first, followed by close matches.'''
+        suggestions = self.completions(prefix=key)[:n]
+        if len(suggestions) < n:
+            folded = {k.casefold(): name for k, name in self._keys.items()}
+            for match in difflib.get_close_matches(key.casefold(), folded.keys(), n=n):
+                if folded[match] not in suggestions:
+                    suggestions.append(folded[match])
+        return suggestions[:n]
+
+    def _names_with_prefix(self, prefix: str) -> Set[str]:
+        node = self._root
+        for char in prefix.casefold():
+            child = node.children.get(char)
+            if child is None:
+                return set()
+            node = child
+        return node.names
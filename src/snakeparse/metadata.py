@@ -0,0 +1,317 @@
+'''Workflow metadata extraction.
+
+Listing the available workflows only requires each workflow's group and
+description, which are usually literal values assigned in the workflow's
+parser.  This module extracts them, along with the arguments added to the
+parser, from the abstract syntax tree of the translated snakefile without
+executing it.  When the static analysis cannot decide (for example, the group
+is computed, or more than one parser is defined), the snakefile must be
+executed instead.
+
+The module contains the following public classes and methods:
+
+    - :class:`~snakeparse.metadata.WorkflowMetadata` -- The group, description,
+      and argument specifications of a workflow.
+    - :func:`~snakeparse.metadata.extract_metadata` -- Statically extracts the
+      metadata from the translated source of a snakefile.
+    - :func:`~snakeparse.metadata.metadata_from_parser` -- Builds the metadata
+      from an instantiated parser.
+'''
+
+import argparse
+import ast
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Set, Union
+
+
+'''The names of the abstract base classes that workflow parsers derive from.'''
+_PARSER_BASES = ['SnakeParser', 'SnakeArgumentParser']
+
+'''The methods a direct subclass of SnakeParser must define to be concrete.'''
+_PARSER_ABSTRACT_METHODS = ['parse_args', 'parse_args_file', 'print_help']
+
+'''The name of the method that returns a workflow parser.'''
+_PARSER_METHOD = 'snakeparser'
+
+'''The parser attributes that are extracted.'''
+_ATTRIBUTES = ['group', 'description']
+
+
+class WorkflowMetadata(NamedTuple):
+    '''The metadata for a workflow.
+
+    Attributes
+    ----------
+    group : Optional[str]
+        The name of the workflow group set by the parser, if any.
+    description : Optional[str]
+        The description of the workflow set by the parser, if any.
+    arguments : Optional[List[Dict[str, Any]]]
+        The specification of each argument added to the parser, in the order
+        they were added, or None if they are not known.  Each specification
+        has the same keys as the attributes of :class:`~argparse.Action`
+        (``option_strings``, ``dest``, ``nargs``, ``const``, ``default``,
+        ``type``, ``choices``, ``required``, ``help``, ``metavar``), with the
+        ``action`` key holding the name of the action (ex. ``store_true``), and
+        the ``type`` key holding the name of the type (ex. ``int``).
+    '''
+    group: Optional[str]
+    description: Optional[str]
+    arguments: Optional[List[Dict[str, Any]]]
+
+
+class _Undecidable(Exception):
+    '''Raised when the metadata cannot be determined statically.'''
+    pass
+
+
+def extract_metadata(source: str) -> Optional[WorkflowMetadata]:
+    '''Extracts the workflow metadata from the translated source of a
+    snakefile without executing it.  Returns None if the metadata cannot be
+    determined statically, in which case the snakefile should be executed.'''
+    try:
+        module = ast.parse(source)
+    except SyntaxError:
+        return None
+
+    classes = [node for node in module.body
+               if isinstance(node, ast.ClassDef) and _is_concrete_parser_class(node)]
+    methods = [node for node in module.body
+               if isinstance(node, ast.FunctionDef) and node.name == _PARSER_METHOD]
+    if len(classes) + len(methods) != 1:
+        # none may be imported or created dynamically, while multiple is an
+        # error that is reported when executing
+        return None
+
+    node: Union[ast.ClassDef, ast.FunctionDef] = classes[0] if classes else methods[0]
+    if isinstance(node, ast.FunctionDef) and not _returns_argparser(node=node):
+        return None
+    try:
+        attributes = _attributes_from(node=node)
+        arguments = _arguments_from(node=node)
+    except _Undecidable:
+        return None
+    return WorkflowMetadata(group=attributes.get('group'),
+                            description=attributes.get('description'),
+                            arguments=arguments)
+
+
+def metadata_from_parser(parser: Any) -> WorkflowMetadata:
+    '''Builds the workflow metadata from an instantiated
+    :class:`~snakeparse.api.SnakeParser`.  The arguments are only known for
+    parsers that use the argparse module.'''
+    arguments: Optional[List[Dict[str, Any]]] = None
+    argument_parser = getattr(parser, 'parser', None)
+    if isinstance(argument_parser, argparse.ArgumentParser):
+        arguments = [argument_spec(action) for action in argument_parser._actions]
+    return WorkflowMetadata(group=parser.group,
+                            description=parser.description,
+                            arguments=arguments)
+
+
+def argument_spec(action: argparse.Action) -> Dict[str, Any]:
+    '''Returns the specification of an argparse action.  Values that are not
+    plain JSON types are converted to strings.'''
+    registry = action.container._registries['action']  # type: ignore
+    names = {cls: name for name, cls in registry.items() if name is not None}
+    type_name = None if action.type is None else getattr(action.type, '__name__', str(action.type))
+    return {
+        'option_strings': list(action.option_strings),
+        'dest': action.dest,
+        'action': names.get(type(action), type(action).__name__),
+        'nargs': action.nargs,
+        'const': _plain(action.const),
+        'default': _plain(action.default),
+        'type': type_name,
+        'choices': None if action.choices is None else [_plain(c) for c in action.choices],
+        'required': action.required,
+        'help': action.help,
+        'metavar': _plain(action.metavar),
+    }
+
+
+def _plain(value: Any) -> Any:
+    '''Converts a value to plain JSON types, using strings as a last resort.'''
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    elif isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    else:
+        return str(value)
+
+
+def _base_name(node: ast.expr) -> Optional[str]:
+    '''The name of a base class, for names and attributes (ex. api.SnakeParser).'''
+    if isinstance(node, ast.Name):
+        return node.id
+    elif isinstance(node, ast.Attribute):
+        return node.attr
+    return None
+
+
+def _is_concrete_parser_class(node: ast.ClassDef) -> bool:
+    '''True if the class directly derives from one of the parser base classes
+    and defines the methods needed to be concrete.'''
+    bases = [_base_name(base) for base in node.bases]
+    if not any(base in _PARSER_BASES for base in bases):
+        return False
+    defined = [item.name for item in node.body if isinstance(item, ast.FunctionDef)]
+    if 'SnakeArgumentParser' in bases:
+        return '__init__' in defined
+    return all(name in defined for name in _PARSER_ABSTRACT_METHODS)
+
+
+def _returns_argparser(node: ast.FunctionDef) -> bool:
+    '''True if the method only returns a parser created with
+    :func:`~snakeparse.parser.argparser`, so that no other code may have set the
+    group or description.'''
+    names: Set[str] = set()
+    for child in ast.walk(node):
+        if isinstance(child, ast.Assign) and isinstance(child.value, ast.Call) \
+                and _base_name(child.value.func) == 'argparser':
+            names.update(target.id for target in child.targets if isinstance(target, ast.Name))
+    returns = [child for child in ast.walk(node) if isinstance(child, ast.Return)]
+    return bool(returns) and all(isinstance(ret.value, ast.Name) and ret.value.id in names
+                                 for ret in returns)
+
+
+def _literal(node: ast.expr) -> Any:
+    '''Evaluates a literal expression, or raises _Undecidable.'''
+    try:
+        return ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError):
+        raise _Undecidable()
+
+
+def _set_attribute(attributes: Dict[str, Any], name: str, value: ast.expr) -> None:
+    '''Sets the attribute, requiring all assignments to agree.'''
+    literal = _literal(value)
+    if name in attributes and attributes[name] != literal:
+        raise _Undecidable()
+    attributes[name] = literal
+
+
+def _attributes_from(node: Union[ast.ClassDef, ast.FunctionDef]) -> Dict[str, Any]:
+    '''Extracts the values assigned to the group and description of the parser.
+    Class level assignments are included for parser classes, and attribute
+    assignments to the parser are included for both: ``self`` for parser
+    classes (ex. ``self.group = ...``), and the returned parser for parser
+    methods (ex. ``p.group = ...``).  Assignments to other objects (ex. an
+    argument group's ``group.description``) are ignored.'''
+    attributes: Dict[str, Any] = {}
+    if isinstance(node, ast.ClassDef):
+        owners = {'self'}
+        for item in node.body:
+            if isinstance(item, ast.Assign):
+                for target in item.targets:
+                    if isinstance(target, ast.Name) and target.id in _ATTRIBUTES:
+                        _set_attribute(attributes, target.id, item.value)
+    else:
+        owners = {child.value.id for child in ast.walk(node)
+                  if isinstance(child, ast.Return) and isinstance(child.value, ast.Name)}
+    for child in ast.walk(node):
+        if isinstance(child, ast.Assign):
+            targets: Sequence[ast.expr] = child.targets
+            value: Optional[ast.expr] = child.value
+        elif isinstance(child, (ast.AugAssign, ast.AnnAssign)):
+            targets, value = [child.target], child.value
+        elif isinstance(child, ast.Delete):
+            targets, value = child.targets, None
+        else:
+            continue
+        for target in targets:
+            if isinstance(target, ast.Attribute) and target.attr in _ATTRIBUTES \
+                    and isinstance(target.value, ast.Name) and target.value.id in owners:
+                if value is None or isinstance(child, ast.AugAssign):
+                    raise _Undecidable()
+                _set_attribute(attributes, target.attr, value)
+    return attributes
+
+
+def _arguments_from(node: Union[ast.ClassDef, ast.FunctionDef]) -> Optional[List[Dict[str, Any]]]:
+    '''Extracts the specification of each argument added with ``add_argument``,
+    or None if any argument is not made of literal values.'''
+    calls = [child for child in ast.walk(node)
+             if isinstance(child, ast.Call) and isinstance(child.func, ast.Attribute)]
+    if any(call.func.attr == 'add_mutually_exclusive_group' for call in calls):  # type: ignore
+        return None
+    calls = [call for call in calls if call.func.attr == 'add_argument']  # type: ignore
+    calls.sort(key=lambda call: (call.lineno, call.col_offset))
+    try:
+        return [_help_spec()] + [_argument_spec_from(call) for call in calls]
+    except _Undecidable:
+        return None
+
+
+def _positional_required(nargs: Any, kwargs: Dict[str, Any]) -> bool:
+    '''Whether argparse makes a positional argument required.'''
+    if nargs == '*':
+        return 'default' not in kwargs
+    return nargs != '?'
+
+
+def _help_spec() -> Dict[str, Any]:
+    '''The specification of the help option added by argparse.'''
+    return {
+        'option_strings': ['-h', '--help'], 'dest': 'help', 'action': 'help', 'nargs': 0,
+        'const': None, 'default': argparse.SUPPRESS, 'type': None, 'choices': None,
+        'required': False, 'help': 'show this help message and exit', 'metavar': None
+    }
+
+
+def _argument_spec_from(call: ast.Call) -> Dict[str, Any]:
+    '''Builds the specification for a single call to ``add_argument``.'''
+    if any(isinstance(arg, ast.Starred) for arg in call.args):
+        raise _Undecidable()
+    names = [_literal(arg) for arg in call.args]
+    if not names or not all(isinstance(name, str) for name in names):
+        raise _Undecidable()
+
+    kwargs: Dict[str, Any] = {}
+    for keyword in call.keywords:
+        if keyword.arg is None:
+            raise _Undecidable()  # **kwargs
+        elif keyword.arg == 'type':
+            type_name = _base_name(keyword.value)
+            if type_name is None:
+                raise _Undecidable()
+            kwargs['type'] = type_name
+        else:
+            kwargs[keyword.arg] = _literal(keyword.value)
+
+    action = kwargs.get('action', 'store')
+    if not isinstance(action, str):
+        raise _Undecidable()
+
+    positional = not names[0].startswith('-')
+    if positional:
+        option_strings: List[str] = []
+        dest = kwargs.get('dest', names[0])
+    else:
+        option_strings = names
+        long_names = [name for name in names if name.startswith('--')]
+        dest = kwargs.get('dest', (long_names or names)[0].lstrip('-').replace('-', '_'))
+
+    if action in ['store_true', 'store_false', 'store_const', 'append_const',
+                  'count', 'help', 'version']:
+        nargs = 0
+        default = {'store_true': False, 'store_false': True}.get(action)
+        const = {'store_true': True, 'store_false': False}.get(action)
+    else:
+        nargs = kwargs.get('nargs')
+        default = None
+        const = None
+    choices = kwargs.get('choices')
+
+    return {
+        'option_strings': option_strings,
+        'dest': dest,
+        'action': action,
+        'nargs': nargs,
+        'const': _plain(kwargs.get('const', const)),
+        'default': _plain(kwargs.get('default', default)),
+        'type': kwargs.get('type'),
+        'choices': None if choices is None else [_plain(c) for c in choices],
+        'required': kwargs.get('required', positional and _positional_required(nargs, kwargs)),
+        'help': kwargs.get('help'),
+        'metavar': _plain(kwargs.get('metavar')),
+    }
@@ -0,0 +1,245 @@
+'''Timing of the phases of snakeparse's startup.
+
+When snakeparse is slow to start, the time is spent in one (or more) of a few
+phases: reading the configuration file, expanding the snakefile globs,
+translating (compiling) and executing each workflow's snakefile to build its
+parser, parsing the arguments, and running Snakemake itself.  A
+:class:`~snakeparse.profiling.Profiler` records the time taken by each phase, and
+for the phases specific to a workflow, which workflow.
+
+Profiling is opt-in.  From the command line, give ``--profile-startup`` (or set
+the ``SNAKEPARSE_PROFILE_STARTUP`` environment variable) to print a report to
+standard error once Snakemake exits; ``--profile-json <path>`` also writes the
+report as JSON, and ``--profile-cprofile <path>`` also profiles with
+:mod:`cProfile`, writing the statistics for :mod:`pstats`.  From Python, use a
+profiler as a context manager, optionally adding a listener that is called with
+each phase's timing as it ends (e.g. to forward it to a monitoring system):
+
+.. code-block:: python
+
+    >>> profiler = Profiler()
+    >>> profiler.add_listener(lambda timing: print(timing.name, timing.seconds))
+    >>> with profiler:
+    ...     SnakeParse(args=args).run()
+    >>> profiler.report()
+
+The active profiler is held in a context variable, so profiling one request in
+a threaded server does not record the phases of another.  Phases run in other
+processes (e.g. when loading workflows with more than one job) are not
+recorded.  When no profiler is active, each phase costs a single lookup.
+
+The module contains the following public classes and methods:
+
+    - :class:`~snakeparse.profiling.PhaseTiming` -- The time taken by a single
+      phase.
+    - :class:`~snakeparse.profiling.Profiler` -- Records the time taken by each
+      phase, and reports it.
+    - :func:`~snakeparse.profiling.active_profiler` -- The active profiler, if any.
+    - :func:`~snakeparse.profiling.phase` -- Times a phase with the active
+      profiler, if any.
+'''
+
+import json
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Dict, IO, Iterator, List, NamedTuple, \
+    Optional
+
+
+class PhaseTiming(NamedTuple):
+    '''The time taken by a single phase.
+
+    Attributes
+    ----------
+    name : str
+        The name of the phase.
+    start : float
+        The time the phase started, in seconds since the profiler started.
+    seconds : float
+        The time taken by the phase, in seconds.
+    depth : int
+        The number of enclosing phases.
+    workflow : Optional[str]
+        The name of the workflow, for phases specific to a workflow.
+    '''
+    name: str
+    start: float
+    seconds: float
+    depth: int
+    workflow: Optional[str]
+
+
+'''The active profiler, if any.'''
+_PROFILER: ContextVar[Optional['Profiler']] = ContextVar('snakeparse_profiler', default=None)
+
+
+class Profiler(object):
+    '''Records the time taken by each phase of snakeparse's startup.
+
+    Keyword Arguments
+    -----------------
+    cprofile : Optional[Path]
+        Optionally, also profile with :mod:`cProfile` while the profiler is
+        active, writing the statistics to this path when it is stopped.
+    origin : Optional[float]
+        Optionally, the :func:`time.perf_counter` value the phases' start times
+        are relative to, otherwise the time the profiler is created.
+    '''
+
+    '''The environment variable that enables profiling from the command line.'''
+    ENV_VAR = 'SNAKEPARSE_PROFILE_STARTUP'
+
+    def __init__(self,
+                 cprofile: Optional[Path] = None,
+                 origin: Optional[float] = None) -> None:
+        self.timings: List[PhaseTiming] = []
+        self.listeners: List[Callable[[PhaseTiming], None]] = []
+        self.cprofile = cprofile
+        self._origin  = time.perf_counter() if origin is None else origin
+        self._end: Optional[float] = None
+        self._depth   = 0
+        self._token: Optional[Token] = None
+        self._cprofiler: Optional[Any] = None
+
+    def add_listener(self, listener: Callable[[PhaseTiming], None]) -> 'Profiler':
+        '''Adds a listener called with each phase's timing as the phase ends.'''
+        self.listeners.append(listener)
+        return self
+
+    def start(self) -> 'Profiler':
+        '''Makes this the active profiler.'''
+        self._token = _PROFILER.set(self)
+        if self.cprofile is not None:
+            import cProfile
+            self._cprofiler = cProfile.Profile()
+            self._cprofiler.enable()
+        return self
+
+    def stop(self) -> None:
+        '''Stops profiling, restoring the previously active profiler (if any),
+        and writes the :mod:`cProfile` statistics if requested.'''
+        self._end = time.perf_counter()
+        if self._cprofiler is not None:
+            self._cprofiler.disable()
+            assert self.cprofile is not None
+            self._cprofiler.dump_stats(str(self.cprofile))
+            self._cprofiler = None
+        if self._token is not None:
+            _PROFILER.reset(self._token)
+            self._token = None
+
+    def __enter__(self) -> 'Profiler':
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    @contextmanager
+    def phase(self, name: str, workflow: Optional[str] = None) -> Iterator[None]:
+        '''Times the phase run within the context.'''
+        start = time.perf_counter()
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            self.record(name=name, start=start, end=time.perf_counter(), workflow=workflow)
+
+    def record(self,
+               name: str,
+               start: float,
+               end: float,
+               workflow: Optional[str] = None) -> PhaseTiming:
+        '''Records a phase that started and ended at the given
+        :func:`time.perf_counter` values.'''
+        timing = PhaseTiming(name=name, start=start - self._origin, seconds=end - start,
+                             depth=self._depth, workflow=workflow)
+        self.timings.append(timing)
+        for listener in self.listeners:
+            listener(timing)
+        return timing
+
+    @property
+    def total_seconds(self) -> float:
+        '''The time since the profiler's origin until it was stopped (or now).'''
+        end = time.perf_counter() if self._end is None else self._end
+        return end - self._origin
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        '''The number of times each phase ran, and the total time taken, by
+        phase name, in the order the phases first started.'''
+        summary: Dict[str, Dict[str, Any]] = OrderedDict()
+        for timing in sorted(self.timings, key=lambda t: t.start):
+            entry = summary.setdefault(timing.name, {'count': 0, 'seconds': 0.0})
+            entry['count'] += 1
+            entry['seconds'] += timing.seconds
+        return summary
+
+    def workflows(self) -> Dict[str, Dict[str, float]]:
+        '''The total time taken by each phase specific to a workflow, by
+        workflow name.'''
+        workflows: Dict[str, Dict[str, float]] = OrderedDict()
+        for timing in self.timings:
+            if timing.workflow is not None:
+                phases = workflows.setdefault(timing.workflow, OrderedDict())
+                phases[timing.name] = phases.get(timing.name, 0.0) + timing.seconds
+        return workflows
+
+    def report(self) -> Dict[str, Any]:
+        '''The report of the time taken by each phase, suitable for JSON.'''
+        return {
+            'total_seconds': self.total_seconds,
+            'summary': self.summary(),
+            'workflows': self.workflows(),
+            'phases': [t._asdict() for t in sorted(self.timings, key=lambda t: t.start)]
+        }
+
+    def write_json(self, file: IO[str]) -> None:
+        '''Writes the report as JSON.'''
+        json.dump(self.report(), file, indent=2)
+        file.write('\n')
+
+    def write_text(self, file: IO[str], slowest: int = 10) -> None:
+        '''Writes a human-readable report: the total time taken by each phase,
+        and the workflows that took the longest.'''
+        file.write(f'Startup profile (total {self.total_seconds:.6f}s):\n')
+        file.write(f'    {"phase":<32} {"count":>8} {"seconds":>12}\n')
+        for name, entry in self.summary().items():
+            file.write(f'    {name:<32} {entry["count"]:>8} {entry["seconds"]:>12.6f}\n')
+        workflows = self.workflows()
+        if workflows:
+            ranked = sorted(workflows.items(), key=lambda item: -sum(item[1].values()))
+            file.write(f'Slowest workflows (of {len(workflows)}):\n')
+            for workflow, phases in ranked[:slowest]:
+                times = ', '.join(f'{name} {seconds:.6f}s' for name, seconds in phases.items())
+                file.write(f'    {workflow:<32} {times}\n')
+
+
+class _NullContext(object):
+    '''A re-usable context manager that does nothing.'''
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+
+_NULL_CONTEXT = _NullContext()
+
+
+def active_profiler() -> Optional[Profiler]:
+    '''The active profiler, if any.'''
+    return _PROFILER.get()
+
+
+def phase(name: str, workflow: Optional[str] = None) -> ContextManager[None]:
+    '''Times the phase run within the context with the active profiler, if
+    any.'''
+    profiler = _PROFILER.get()
+    if profiler is None:
+        return _NULL_CONTEXT
+    return profiler.phase(name=name, workflow=workflow)
@@ -0,0 +1,529 @@
+'''Argument schemas, for validating workflow arguments without argparse.
+
+Validating a workflow's arguments with its parser requires building the
+parser, and so translating and executing the workflow's snakefile.  Instead,
+the definition of the parser's arguments may be exported once as plain JSON
+(see :meth:`~snakeparse.api.SnakeArgumentParser.schema`), stored (for example,
+in a workflow catalog, see :mod:`~snakeparse.catalog`), and compiled into an
+:class:`~snakeparse.schema.ArgumentValidator`, which checks the arguments in a
+single pass, without the parser or the snakefile.  A schema is a JSON object
+with the following keys:
+
+    - ``version`` -- the version of the schema format;
+    - ``prefix_chars``, ``fromfile_prefix_chars``, and ``allow_abbrev`` -- as
+      given to the :class:`~argparse.ArgumentParser`;
+    - ``arguments`` -- the specification of each argument (see
+      :func:`~snakeparse.metadata.argument_spec`), in the order they were
+      added, each with a ``checked`` key that is true if the validator can
+      check the argument exactly (it uses one of argparse's actions, and a type
+      of ``str``, ``int``, ``float``, or :class:`~pathlib.Path`);
+    - ``exclusive`` -- the mutually exclusive groups, each with a ``required``
+      key and the ``arguments`` key holding the indices of its arguments;
+    - ``checked`` -- true if the arguments are parsed by argparse alone (the
+      parser does not override how arguments are parsed).
+
+The validator follows the rules of argparse (as of Python 3.11) for matching
+the arguments: unique prefixes of long options, ``--option=value``, combined
+single-dash options, ``--``, negative numbers, and the number of values each
+argument takes.  The arguments are either valid, invalid (with the message
+argparse would give), or cannot be validated without argparse, for example
+when they use an argument that is not checked, ask for help, or reference an
+arguments file, in which case the parser must be used.
+
+The module contains the following public classes and methods:
+
+    - :func:`~snakeparse.schema.parser_schema` -- Exports the definition of
+      the arguments of an argument parser.
+    - :class:`~snakeparse.schema.ArgumentValidator` -- Validates arguments
+      against a schema.
+'''
+
+import argparse
+import re
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from .metadata import argument_spec
+
+
+'''The version of the schema format.'''
+SCHEMA_VERSION = 1
+
+'''The actions whose effects the validator knows (none of them fail).  Actions
+added in later versions of python (e.g. ``extend``) are skipped when missing.'''
+_CHECKED_ACTIONS = tuple(
+    action for action in (getattr(argparse, name, None) for name in [
+        '_StoreAction', '_StoreConstAction', '_StoreTrueAction', '_StoreFalseAction',
+        '_AppendAction', '_AppendConstAction', '_CountAction', '_ExtendAction',
+        'BooleanOptionalAction'
+    ]) if action is not None
+)
+
+'''The conversions the validator performs, by the name of the argument's type.'''
+_TYPES: Dict[Optional[str], Callable[[str], Any]] = {
+    None: lambda value: value, 'str': str, 'int': int, 'float': float, 'Path': Path
+}
+
+'''The methods of :class:`~argparse.ArgumentParser` that parse arguments, which
+a parser must not override for its arguments to be checked.'''
+_PARSING_METHODS = ['parse_args', 'parse_known_args', '_parse_known_args', '_parse_optional',
+                    '_get_option_tuples', '_match_argument', '_match_arguments_partial',
+                    '_get_nargs_pattern', '_get_values', '_get_value', '_check_value',
+                    '_read_args_from_files', 'convert_arg_line_to_args']
+
+'''Matches arguments that look like negative numbers, as argparse does.'''
+_NEGATIVE_NUMBER = re.compile(r'^-\d+$|^-\d*\.\d+$')
+
+
+def parser_schema(parser: argparse.ArgumentParser) -> Dict[str, Any]:
+    '''Returns the definition of the arguments of the parser as plain JSON
+    types.'''
+    actions: List[argparse.Action] = parser._actions
+    arguments = []
+    for action in actions:
+        spec = argument_spec(action)
+        spec['checked'] = type(action) in _CHECKED_ACTIONS \
+            and action.type in (None, str, int, float, Path) \
+            and _checked_choices(action=action) \
+            and _is_plain(action.const) and _is_plain(action.default) \
+            and not (isinstance(action.metavar, tuple) and not action.option_strings)
+        arguments.append(spec)
+    exclusive = [{'required': group.required,
+                  'arguments': [actions.index(action) for action in group._group_actions]}
+                 for group in parser._mutually_exclusive_groups]
+    checked = all(getattr(type(parser), name) is getattr(argparse.ArgumentParser, name)
+                  for name in _PARSING_METHODS)
+    return {
+        'version': SCHEMA_VERSION,
+        'prefix_chars': parser.prefix_chars,
+        'fromfile_prefix_chars': parser.fromfile_prefix_chars,
+        'allow_abbrev': parser.allow_abbrev,
+        'arguments': arguments,
+        'exclusive': exclusive,
+        'checked': checked,
+    }
+
+
+def _checked_choices(action: argparse.Action) -> bool:
+    '''True if the validator can check the values are among the choices.'''
+    if action.choices is None:
+        return True
+    elif action.type is Path or not isinstance(action.choices, (list, tuple, range)):
+        return False
+    return all(_is_plain(choice) for choice in action.choices)
+
+
+def _is_plain(value: Any) -> bool:
+    '''True if the value is made of plain JSON types, so that it is exported
+    unchanged.'''
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return True
+    return isinstance(value, list) and all(_is_plain(v) for v in value)
+
+
+class _Undecidable(Exception):
+    '''Raised when the arguments cannot be validated without argparse.'''
+    pass
+
+
+class _Argument(object):
+    '''An argument in a compiled schema.'''
+    __slots__ = ['index', 'name', 'option_strings', 'dest', 'nargs', 'pattern', 'type', 'convert',
+                 'choices', 'const', 'default', 'required', 'help', 'checked', 'exclusive',
+                 'conflicts']
+
+    def __init__(self, index: int, spec: Dict[str, Any]) -> None:
+        self.index          = index
+        self.option_strings = spec['option_strings']
+        self.dest           = spec['dest']
+        self.nargs          = spec['nargs']
+        self.type           = spec['type']
+        self.choices        = spec['choices']
+        self.const          = spec['const']
+        self.default        = spec['default']
+        self.required       = spec['required']
+        self.help           = spec['help']
+        self.checked        = bool(spec.get('checked')) and self.type in _TYPES
+        self.convert        = _TYPES.get(self.type)
+        self.exclusive      = False
+        self.conflicts: List['_Argument'] = []
+        self.pattern        = self._pattern()
+        self.name           = self._name(metavar=spec['metavar'])
+
+    def _name(self, metavar: Any) -> Optional[str]:
+        '''The name of the argument in error messages.'''
+        if self.option_strings:
+            return '/'.join(self.option_strings)
+        elif metavar not in (None, argparse.SUPPRESS):
+            return str(metavar)
+        elif self.dest not in (None, argparse.SUPPRESS):
+            return self.dest
+        elif self.choices:
+            return '{' + ','.join(str(c) for c in self.choices) + '}'
+        return None
+
+    def _pattern(self) -> str:
+        '''The pattern matching the arguments for this argument.'''
+        nargs = self.nargs
+        if nargs is None:
+            pattern = '(-*A-*)'
+        elif nargs == argparse.OPTIONAL:
+            pattern = '(-*A?-*)'
+        elif nargs == argparse.ZERO_OR_MORE:
+            pattern = '(-*[A-]*)'
+        elif nargs == argparse.ONE_OR_MORE:
+            pattern = '(-*A[A-]*)'
+        elif nargs == argparse.REMAINDER:
+            pattern = '([-AO]*)'
+        elif nargs == argparse.PARSER:
+            pattern = '(-*A[-AO]*)'
+        elif nargs == argparse.SUPPRESS:
+            pattern = '(-*-*)'
+        else:
+            pattern = '(-*%s-*)' % '-*'.join('A' * nargs)
+        if self.option_strings:
+            pattern = pattern.replace('-*', '').replace('-', '')
+        return pattern
+
+
+'''An option found in the arguments: the argument (None if unknown), the
+option string, and the value given with the option (ex. ``--option=value``).'''
+_Option = Tuple[Optional[_Argument], str, Optional[str]]
+
+
+class ArgumentValidator(object):
+    '''Validates arguments against the schema exported from a parser, in a
+    single pass and without argparse.
+
+    Keyword Arguments
+    -----------------
+    schema : Dict[str, Any]
+        The schema (see :func:`~snakeparse.schema.parser_schema`).
+    '''
+
+    def __init__(self, schema: Dict[str, Any]) -> None:
+        self.prefix_chars: str = schema.get('prefix_chars', '-')
+        self.fromfile_prefix_chars: Optional[str] = schema.get('fromfile_prefix_chars')
+        self.allow_abbrev: bool = schema.get('allow_abbrev', True)
+        self.arguments = [_Argument(index=index, spec=spec)
+                          for index, spec in enumerate(schema.get('arguments', []))]
+        self.exclusive: List[Tuple[bool, List[_Argument]]] = [
+            (group['required'], [self.arguments[index] for index in group['arguments']])
+            for group in schema.get('exclusive', [])
+        ]
+        self.supported = schema.get('version') == SCHEMA_VERSION and bool(schema.get('checked')) \
+            and all(argument.name is not None and argument.nargs != argparse.PARSER
+                    for argument in self.arguments)
+
+        self._options: Dict[str, _Argument] = {}
+        for argument in self.arguments:
+            for option_string in argument.option_strings:
+                self._options[option_string] = argument
+        self._positionals = [argument for argument in self.arguments
+                             if not argument.option_strings]
+        self._negative_number_options = any(_NEGATIVE_NUMBER.match(option)
+                                            for option in self._options)
+        for _, group in self.exclusive:
+            for argument in group:
+                argument.exclusive = True
+                argument.conflicts.extend(other for other in group if other is not argument)
+
+    def validate(self, args: Sequence[str]) -> bool:
+        '''Returns True if the arguments are valid, False if they cannot be
+        validated without argparse, and raises a
+        :class:`~snakeparse.api.SnakeParseException` with the message argparse
+        would give if they are invalid.'''
+        if not self.supported:
+            return False
+        try:
+            self._validate(args=list(args))
+        except _Undecidable:
+            return False
+        return True
+
+    @staticmethod
+    def _error(message: str, argument: Optional[_Argument] = None) -> Exception:
+        '''The exception for invalid arguments, as given by argparse.'''
+        # import here to avoid a circular import
+        from .api import SnakeParseException
+        if argument is not None and argument.name is not None:
+            message = f'argument {argument.name}: {message}'
+        return SnakeParseException(message)
+
+    def _validate(self, args: List[str]) -> None:
+        if self.fromfile_prefix_chars is not None \
+                and any(arg and arg[0] in self.fromfile_prefix_chars for arg in args):
+            raise _Undecidable()
+
+        # find the options, and the pattern of options ('O'), other arguments
+        # ('A'), and the argument separator ('-')
+        options: Dict[int, _Option] = {}
+        parts: List[str] = []
+        separated = False
+        for index, arg in enumerate(args):
+            if separated:
+                parts.append('A')
+            elif arg == '--':
+                parts.append('-')
+                separated = True
+            else:
+                option = self._parse_optional(arg=arg)
+                if option is None:
+                    parts.append('A')
+                else:
+                    options[index] = option
+                    parts.append('O')
+        pattern = ''.join(parts)
+
+        seen: Set[_Argument] = set()
+        seen_non_default: Set[_Argument] = set()
+        positionals = list(self._positionals)
+        extras: List[str] = []
+
+        def take(argument: _Argument, strings: List[str]) -> None:
+            if not argument.checked:
+                raise _Undecidable()
+            seen.add(argument)
+            value = self._values(argument=argument, strings=strings)
+            if argument.exclusive and self._is_non_default(argument=argument, value=value):
+                seen_non_default.add(argument)
+                for conflict in argument.conflicts:
+                    if conflict in seen_non_default:
+                        raise self._error(f'not allowed with argument {conflict.name}', argument)
+
+        def consume_optional(start: int) -> int:
+            argument, option_string, explicit = options[start]
+            taken: List[Tuple[_Argument, List[str]]] = []
+            while True:
+                if argument is None:
+                    extras.append(args[start])
+                    return start + 1
+                if explicit is not None:
+                    count = self._match(argument=argument, pattern='A')
+                    if count == 0 and option_string[1] not in self.prefix_chars \
+                            and explicit != '':
+                        # combined single-dash options (ex. -xyz)
+                        taken.append((argument, []))
+                        option_string = option_string[0] + explicit[0]
+                        if option_string not in self._options:
+                            raise self._error(f'ignored explicit argument {explicit!r}',
+                                              argument)
+                        argument = self._options[option_string]
+                        explicit = explicit[1:] or None
+                    elif count == 1:
+                        stop = start + 1
+                        taken.append((argument, [explicit]))
+                        break
+                    else:
+                        raise self._error(f'ignored explicit argument {explicit!r}', argument)
+                else:
+                    count = self._match(argument=argument, pattern=pattern[start + 1:])
+                    stop = start + 1 + count
+                    taken.append((argument, args[start + 1:stop]))
+                    break
+            for argument, strings in taken:
+                take(argument=argument, strings=strings)
+            return stop
+
+        def consume_positionals(start: int) -> int:
+            counts = self._match_partial(arguments=positionals, pattern=pattern[start:])
+            for argument, count in zip(positionals, counts):
+                take(argument=argument, strings=args[start:start + count])
+                start += count
+            del positionals[:len(counts)]
+            return start
+
+        # consume the positionals and options alternately, as argparse does
+        start = 0
+        last_option = max(options) if options else -1
+        while start <= last_option:
+            next_option = min(index for index in options if index >= start)
+            if start != next_option:
+                end = consume_positionals(start=start)
+                if end > start:
+                    start = end
+                    continue
+                start = end
+            if start not in options:
+                extras.extend(args[start:next_option])
+                start = next_option
+            start = consume_optional(start=start)
+        stop = consume_positionals(start=start)
+        extras.extend(args[stop:])
+
+        self._check_defaults(seen=seen)
+        required = [argument.name for argument in self.arguments
+                    if argument not in seen and argument.required]
+        if required:
+            names = ', '.join(str(name) for name in required)
+            raise self._error(f'the following arguments are required: {names}')
+        for group_required, group in self.exclusive:
+            if group_required and not any(argument in seen_non_default for argument in group):
+                names = ' '.join(str(argument.name) for argument in group
+                                 if argument.help != argparse.SUPPRESS)
+                raise self._error(f'one of the arguments {names} is required')
+        if extras:
+            raise self._error(f"unrecognized arguments: {' '.join(extras)}")
+
+    def _parse_optional(self, arg: str) -> Optional[_Option]:
+        '''Returns the option given by the argument, or None if the argument is
+        not an option.'''
+        if not arg or arg[0] not in self.prefix_chars:
+            return None
+        if arg in self._options:
+            return self._options[arg], arg, None
+        if len(arg) == 1:
+            return None
+        if '=' in arg:
+            option_string, explicit = arg.split('=', 1)
+            if option_string in self._options:
+                return self._options[option_string], option_string, explicit
+        matches = self._option_tuples(arg=arg)
+        if len(matches) > 1:
+            found = ', '.join(option_string for _, option_string, _ in matches)
+            raise self._error(f'ambiguous option: {arg} could match {found}')
+        elif len(matches) == 1:
+            return matches[0]
+        if _NEGATIVE_NUMBER.match(arg) and not self._negative_number_options:
+            return None
+        if ' ' in arg:
+            return None
+        return None, arg, None
+
+    def _option_tuples(self, arg: str) -> List[_Option]:
+        '''Returns the options the argument may be a prefix of.'''
+        matches: List[_Option] = []
+        if arg[1] in self.prefix_chars:
+            if self.allow_abbrev:
+                prefix: str = arg
+                explicit: Optional[str] = None
+                if '=' in arg:
+                    prefix, explicit = arg.split('=', 1)
+                for option_string, argument in self._options.items():
+                    if option_string.startswith(prefix):
+                        matches.append((argument, option_string, explicit))
+        else:
+            short_prefix, short_explicit = arg[:2], arg[2:]
+            for option_string, argument in self._options.items():
+                if option_string == short_prefix:
+                    matches.append((argument, option_string, short_explicit))
+                elif option_string.startswith(arg):
+                    matches.append((argument, option_string, None))
+        return matches
+
+    def _match(self, argument: _Argument, pattern: str) -> int:
+        '''The number of arguments taken by the argument from those matching
+        the pattern.'''
+        match = re.match(argument.pattern, pattern)
+        if match is None:
+            nargs = argument.nargs
+            if nargs is None:
+                message = 'expected one argument'
+            elif nargs == argparse.OPTIONAL:
+                message = 'expected at most one argument'
+            elif nargs == argparse.ONE_OR_MORE:
+                message = 'expected at least one argument'
+            else:
+                message = f"expected {nargs} argument{'' if nargs == 1 else 's'}"
+            raise self._error(message, argument)
+        return len(match.group(1))
+
+    @staticmethod
+    def _match_partial(arguments: List[_Argument], pattern: str) -> List[int]:
+        '''The number of arguments taken by each of the leading positional
+        arguments, matching as many as possible.'''
+        for count in range(len(arguments), 0, -1):
+            match = re.match(''.join(argument.pattern for argument in arguments[:count]),
+                             pattern)
+            if match is not None:
+                return [len(group) for group in match.groups()]
+        return []
+
+    def _values(self, argument: _Argument, strings: List[str]) -> Any:
+        '''Converts and checks the values given for the argument.'''
+        nargs = argument.nargs
+        if nargs not in [argparse.PARSER, argparse.REMAINDER]:
+            strings = list(strings)
+            if '--' in strings:
+                strings.remove('--')
+        if not strings and nargs == argparse.OPTIONAL:
+            value = argument.const if argument.option_strings else argument.default
+            if isinstance(value, str):
+                value = self._convert(argument=argument, value=value, given=False)
+                self._check(argument=argument, value=value, given=False)
+        elif not strings and nargs == argparse.ZERO_OR_MORE and not argument.option_strings:
+            value = strings if argument.default is None else argument.default
+            self._check(argument=argument, value=value, given=False)
+        elif len(strings) == 1 and nargs in [None, argparse.OPTIONAL]:
+            value = self._convert(argument=argument, value=strings[0])
+            self._check(argument=argument, value=value)
+        elif nargs == argparse.REMAINDER:
+            value = [self._convert(argument=argument, value=v) for v in strings]
+        elif nargs == argparse.PARSER:
+            raise _Undecidable()
+        elif nargs == argparse.SUPPRESS:
+            value = argparse.SUPPRESS
+        else:
+            value = [self._convert(argument=argument, value=v) for v in strings]
+            for v in value:
+                self._check(argument=argument, value=v)
+        return value
+
+    def _convert(self, argument: _Argument, value: str, given: bool = True) -> Any:
+        '''Converts a value with the argument's type.  Failures converting
+        values that were not given (ex. defaults, which were exported as plain
+        JSON types) are left to argparse.'''
+        if argument.convert is None:
+            raise _Undecidable()
+        try:
+            return argument.convert(value)
+        except (TypeError, ValueError):
+            if not given:
+                raise _Undecidable()
+            raise self._error(f'invalid {argument.type} value: {value!r}', argument)
+
+    def _check(self, argument: _Argument, value: Any, given: bool = True) -> None:
+        '''Checks the value is one of the argument's choices.'''
+        if argument.choices is None or value in argument.choices:
+            return
+        if not given:
+            raise _Undecidable()
+        choices = ', '.join(map(repr, argument.choices))
+        raise self._error(f'invalid choice: {value!r} (choose from {choices})', argument)
+
+    @staticmethod
+    def _is_non_default(argument: _Argument, value: Any) -> bool:
+        '''True if the value is not the argument's default (argparse compares
+        them by identity, which is only known for None and booleans).'''
+        default = argument.default
+        if value is None and default is None:
+            return False
+        if isinstance(value, bool) and isinstance(default, bool) and value == default:
+            return False
+        try:
+            equal = bool(value == default)
+        except Exception:
+            raise _Undecidable()
+        if equal:
+            raise _Undecidable()
+        return True
+
+    def _check_defaults(self, seen: Set[_Argument]) -> None:
+        '''Checks the string defaults of the arguments not given can be
+        converted, as argparse converts them after parsing.'''
+        first: Dict[str, _Argument] = {}
+        for argument in self.arguments:
+            if argument.dest != argparse.SUPPRESS and argument.default != argparse.SUPPRESS:
+                first.setdefault(argument.dest, argument)
+        seen_dests = {argument.dest for argument in seen}
+        for argument in self.arguments:
+            default = argument.default
+            if argument in seen or argument.required or not isinstance(default, str) \
+                    or default == argparse.SUPPRESS or argument.dest == argparse.SUPPRESS \
+                    or argument.dest in seen_dests:
+                continue
+            if first[argument.dest] is not argument and first[argument.dest].default == default:
+                # argparse only converts the default if it is the same object
+                raise _Undecidable()
+            if first[argument.dest] is argument:
+                self._convert(argument=argument, value=default, given=False)
@@ -0,0 +1,255 @@
+'''A server that keeps snakeparse configurations and workflow parsers loaded.
+
+Each ``snakeparse`` invocation imports Snakemake and loads the snakefiles of
+the configured workflows before it can validate the workflow arguments.  The
+server does this once: it keeps the configuration for each distinct set of
+snakeparse options, along with the parsers for the workflows that were run,
+and validates and runs the requests forwarded by the client (see
+:mod:`~snakeparse.client`).  A configuration is rebuilt when its configuration
+file changes on disk, and otherwise refreshed (see
+:meth:`~snakeparse.api.SnakeParseConfig.refresh`) so that only the snakefiles
+added, removed, or modified are loaded, and a parser is rebuilt when its
+snakefile changes.
+
+Requests are validated one at a time, in the client's working directory, then
+Snakemake is run in a separate process with the client's working directory and
+environment.  The output of Snakemake (both standard output and error) is
+streamed back to the client, followed by its exit code.  Snakemake is stopped
+if the client disconnects before it completes.
+
+The module contains the following public classes and methods:
+
+    - :class:`~snakeparse.server.SnakeParseServer` -- The server.
+    - :func:`~snakeparse.server.serve` -- Runs the server until interrupted.
+'''
+
+import argparse
+import json
+import os
+import socketserver
+import subprocess
+import threading
+from io import BufferedIOBase
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .api import SnakeParse, SnakeParseConfig, SnakeParseException, _PARSED_ARGS
+from .profiling import phase
+
+
+class _StreamWriter(object):
+    '''A file-like object that sends everything written to it to the client.'''
+
+    def __init__(self, wfile: BufferedIOBase) -> None:
+        self.wfile = wfile
+        self.lock = threading.Lock()
+
+    def write(self, text: str) -> int:
+        self.send(out=text)
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+    def send(self, **message: Any) -> None:
+        '''Sends a single message to the client.'''
+        with self.lock:
+            self.wfile.write(json.dumps(message).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+
+class _ServerSnakeParse(SnakeParse):
+    '''Re-uses the configurations built by the server.'''
+
+    def __init__(self, server: 'SnakeParseServer', **kwargs: Any) -> None:
+        self.server = server
+        super().__init__(**kwargs)
+
+    def _config_from(self, config_args: argparse.Namespace) -> 'SnakeParseConfig':
+        return self.server.config_for(
+            config_args=config_args,
+            factory=lambda: super(_ServerSnakeParse, self)._config_from(config_args=config_args)
+        )
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    '''Handles a single request from the client.'''
+
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        if not line:
+            return
+        out = _StreamWriter(wfile=self.wfile)
+        try:
+            request = json.loads(line)
+            retcode = self.server.serve_request(  # type: ignore
+                args=request['args'],
+                cwd=request['cwd'],
+                env=request.get('env'),
+                run=request.get('run', True),
+                out=out,
+                disconnected=self._disconnected
+            )
+            out.send(exit=retcode)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _disconnected(self) -> None:
+        '''Blocks until the client disconnects.'''
+        while self.rfile.readline():
+            pass
+
+
+class SnakeParseServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    '''Listens on a Unix domain socket for requests from the client (see
+    :func:`~snakeparse.client.request`), and validates and runs them with
+    configurations and workflow parsers kept loaded between requests.
+
+    The socket is only accessible by the current user.
+
+    Keyword Arguments
+    -----------------
+    socket_path : Path
+        The path to the Unix domain socket on which to listen.  An existing
+        socket at the same path is removed if no server is listening on it.
+    '''
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: Path) -> None:
+        self.socket_path = socket_path
+        self._remove_stale_socket()
+        # validation changes the working directory, so is done one at a time
+        self._lock = threading.Lock()
+        self._configs: Dict[Any, Tuple[Any, SnakeParseConfig]] = {}
+        old_umask = os.umask(0o177)
+        try:
+            super().__init__(str(socket_path), _RequestHandler)
+        finally:
+            os.umask(old_umask)
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            self.socket_path.unlink()
+        except OSError:
+            pass
+
+    def _remove_stale_socket(self) -> None:
+        '''Removes the socket at the socket path if no server is listening on it.'''
+        from .client import connect
+        if not self.socket_path.exists():
+            return
+        try:
+            connect(socket_path=self.socket_path).close()
+        except OSError:
+            self.socket_path.unlink()
+        else:
+            raise SnakeParseException(f'A server is already listening on {self.socket_path}')
+
+    def config_for(self, config_args: argparse.Namespace, factory: Any) -> SnakeParseConfig:
+        '''Returns the configuration for the given snakeparse options and the
+        current working directory, building it with the given factory if it
+        has not been built, or if its configuration file has changed since it
+        was built, and otherwise refreshing it.'''
+        key = (os.getcwd(), tuple(sorted((k, str(v)) for k, v in vars(config_args).items())))
+        cached = self._configs.get(key)
+        if cached is not None and cached[0] == self._signature(config_args=config_args):
+            # only the snakefiles added or modified are loaded
+            cached[1].refresh()
+            return cached[1]
+        config = factory()
+        if cached is not None:
+            # parsers are rebuilt only for the snakefiles that changed
+            config._parsers = cached[1]._parsers
+        self._configs[key] = (self._signature(config_args=config_args), config)
+        return config
+
+    @staticmethod
+    def _signature(config_args: argparse.Namespace) -> Any:
+        '''The modification time and size of the configuration file, used to
+        determine if the configuration must be rebuilt.'''
+        if config_args.config is None:
+            return None
+        try:
+            stat = config_args.config.stat()
+        except OSError:
+            return (str(config_args.config), None, None)
+        return (str(config_args.config), stat.st_mtime_ns, stat.st_size)
+
+    def serve_request(self,
+                      args: List[str],
+                      cwd: str,
+                      env: Optional[Dict[str, str]],
+                      run: bool,
+                      out: _StreamWriter,
+                      disconnected: Any) -> int:
+        '''Validates the command line arguments in the given working directory,
+        then runs the workflow unless ``run`` is False, writing any output to
+        ``out``.  Returns the exit code.  The workflow is stopped when the
+        ``disconnected`` method returns.'''
+        with self._lock:
+            old_cwd = os.getcwd()
+            try:
+                os.chdir(cwd)
+                parsed = _ServerSnakeParse(server=self, args=args, file=out)
+            except SystemExit as e:
+                return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+            except Exception as e:
+                out.write(f'error: {e}\n')
+                return 1
+            finally:
+                os.chdir(old_cwd)
+
+        try:
+            if parsed.in_process:
+                _PARSED_ARGS.pop(parsed.snakeparse_args_token, None)
+                out.write('error: --in-process is not supported by the snakeparse server\n')
+                return 2
+            if not run:
+                return 0
+            if parsed.snakemake_env:
+                env = dict(os.environ if env is None else env, **parsed.snakemake_env)
+            with phase('snakemake'):
+                return self._run(command=parsed.command, cwd=cwd, env=env, out=out,
+                                 disconnected=disconnected)
+        finally:
+            parsed.cleanup()
+            parsed.report_profile(file=out)  # type: ignore
+
+    @staticmethod
+    def _run(command: List[str],
+             cwd: str,
+             env: Optional[Dict[str, str]],
+             out: _StreamWriter,
+             disconnected: Any) -> int:
+        '''Runs the command, streaming its output, and returns its exit code.'''
+        process = subprocess.Popen(command, cwd=cwd, env=env, stdin=subprocess.DEVNULL,
+                                   stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+
+        def stop_when_disconnected() -> None:
+            disconnected()
+            if process.poll() is None:
+                process.terminate()
+        threading.Thread(target=stop_when_disconnected, daemon=True).start()
+
+        assert process.stdout is not None
+        try:
+            for chunk in iter(lambda: process.stdout.read1(65536), b''):  # type: ignore
+                out.write(chunk.decode('utf-8', errors='replace'))
+        except (BrokenPipeError, ConnectionResetError):
+            process.terminate()
+            raise
+        finally:
+            process.stdout.close()
+            retcode = process.wait()
+        return retcode
+
+
+def serve(socket_path: Path) -> None:
+    '''Runs the server on the given socket until interrupted.'''
+    with SnakeParseServer(socket_path=socket_path) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
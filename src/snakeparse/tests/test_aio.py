@@ -0,0 +1,148 @@
+import asyncio
+import os
+import stat
+import tempfile
+import unittest
+from collections import OrderedDict
+from io import StringIO
+from pathlib import Path
+from typing import List
+from unittest import mock
+
+from snakeparse.api import SnakeParse, SnakeParseConfig, SnakeParseException, \
+    SnakeParseWorkflow
+
+
+_SNAKEFILE_CONTENTS = '''
+from snakeparse.parser import argparser
+
+def snakeparser(**kwargs):
+    p = argparser(**kwargs)
+    p.parser.add_argument('--message', help='The message.', required=True)
+    return p
+'''
+
+# Stands in for Snakemake: echoes its arguments to standard output and error,
+# then with --sleep starts a long-running job in its process group (ignoring
+# SIGTERM with --ignore-term), and with --fail exits with an error
+_SNAKEMAKE_CONTENTS = '''#!/bin/sh
+echo "out: $*"
+echo "err: $*" >&2
+case "$*" in *--ignore-term*) trap '' TERM;; esac
+case "$*" in *--sleep*) sleep 30 & echo $! > "$JOB_PID"; wait;; esac
+case "$*" in *--fail*) exit 3;; esac
+exit 0
+'''
+
+
+def _running(pid: int) -> bool:
+    '''True if the process is running (not a zombie).'''
+    try:
+        with open(f'/proc/{pid}/stat', 'r') as fh:
+            return fh.read().rsplit(')', 1)[1].split()[0] not in ['Z', 'X']
+    except OSError:
+        return False
+
+
+async def _stopped(pid: int) -> bool:
+    '''True if the process stops running within a few seconds.'''
+    for _ in range(500):
+        if not _running(pid):
+            return True
+        await asyncio.sleep(0.01)
+    return False
+
+
+class RunAsyncTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tempdir.name)
+        snakefile = self.dir / 'write_message.smk'
+        with snakefile.open('w') as fh:
+            fh.write(_SNAKEFILE_CONTENTS)
+        snakemake = self.dir / 'snakemake'
+        with snakemake.open('w') as fh:
+            fh.write(_SNAKEMAKE_CONTENTS)
+        snakemake.chmod(snakemake.stat().st_mode | stat.S_IEXEC)
+        self.config = SnakeParseConfig(workflows=OrderedDict(), snakemake=snakemake)
+        self.config.add_workflow(SnakeParseWorkflow(name='WriteMessage', snakefile=snakefile))
+        self.job_pid = self.dir / 'job.pid'
+        environ = mock.patch.dict(os.environ, {'JOB_PID': str(self.job_pid)})
+        environ.start()
+        self.addCleanup(environ.stop)
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def _snakeparse(self, *snakemake_args: str) -> SnakeParse:
+        return SnakeParse(args=[*snakemake_args, 'WriteMessage', '--message', 'hi'],
+                          config=self.config, file=StringIO())
+
+    async def _job_pid(self) -> int:
+        '''Waits for the long-running job to start, and returns its pid.'''
+        while not self.job_pid.exists() or not self.job_pid.read_text().strip():
+            await asyncio.sleep(0.01)
+        return int(self.job_pid.read_text())
+
+    async def test_run_async(self) -> None:
+        stdout: List[str] = []
+        stderr: List[str] = []
+
+        async def on_stderr(line: str) -> None:
+            stderr.append(line)
+
+        snakeparse = self._snakeparse('--fail')
+        args_file = snakeparse.snakeparse_args_file
+        self.assertEqual(await snakeparse.run_async(stdout=stdout.append, stderr=on_stderr), 3)
+        self.assertEqual(len(stdout), 1)
+        self.assertTrue(stdout[0].startswith('out: --fail --config snakeparse_args_file='))
+        self.assertTrue(stderr[0].startswith('err: --fail --config'))
+        self.assertIsNotNone(args_file)
+        self.assertFalse(args_file.exists())  # type: ignore
+
+    async def test_start_async(self) -> None:
+        snakeparse = self._snakeparse()
+        process = await snakeparse.start_async(stderr=False)
+        self.assertIsNone(process.stderr)
+        lines = [line async for line in process.stdout]
+        self.assertEqual(await process.wait(), 0)
+        self.assertEqual(len(lines), 1)
+        self.assertTrue(lines[0].startswith('out: --config'))
+        self.assertFalse(snakeparse.snakeparse_args_file.exists())  # type: ignore
+
+    async def test_timeout(self) -> None:
+        snakeparse = self._snakeparse('--sleep')
+        with self.assertRaises(asyncio.TimeoutError):
+            await snakeparse.run_async(timeout=0.5, stdout=lambda line: None)
+        self.assertTrue(await _stopped(int(self.job_pid.read_text())))
+        self.assertFalse(snakeparse.snakeparse_args_file.exists())  # type: ignore
+
+    async def test_cancel(self) -> None:
+        snakeparse = self._snakeparse('--sleep')
+        task = asyncio.ensure_future(snakeparse.run_async(stdout=lambda line: None))
+        job_pid = await self._job_pid()
+        self.assertTrue(_running(job_pid))
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertTrue(await _stopped(job_pid))
+
+    async def test_kill_after_grace_period(self) -> None:
+        process = await self._snakeparse('--sleep', '--ignore-term').start_async(grace_period=0.2)
+        job_pid = await self._job_pid()
+        with self.assertRaises(asyncio.TimeoutError):
+            await process.wait(timeout=0.2)
+        self.assertEqual(process.returncode, -9)
+        self.assertTrue(await _stopped(job_pid))
+
+    async def test_in_process(self) -> None:
+        snakeparse = self._snakeparse()
+        snakeparse.in_process = True
+        with self.assertRaises(SnakeParseException):
+            await snakeparse.run_async()
+        self.assertFalse(snakeparse.snakeparse_args_file.exists())  # type: ignore
+
+
+if __name__ == '__main__':
+    unittest.main()
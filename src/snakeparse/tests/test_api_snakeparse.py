@@ -0,0 +1,313 @@
+import gc
+import os
+import random
+import tempfile
+import unittest
+from argparse import Namespace
+from collections import OrderedDict
+from io import StringIO
+from pathlib import Path
+from typing import Any, List
+from unittest import mock
+
+from snakeparse.api import SnakeParse, SnakeParseConfig, SnakeParseException, \
+    SnakeParseWorkflow, _ArgumentParser, _PARSED_ARGS
+
+
+_SNAKEFILE_CONTENTS = '''
+from snakeparse.parser import argparser
+
+def snakeparser(**kwargs):
+    p = argparser(**kwargs)
+    p.parser.add_argument('--message', help='The message.', required=True)
+    return p
+'''
+
+
+class _NonExitingParser(_ArgumentParser):
+
+    def exit(self, status: int = 0, message: str = None) -> None:
+        raise SnakeParseException(message)
+
+
+class SnakeParseTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.config_parser = SnakeParseConfig.config_parser()
+
+    def _assert_same_as_by_prefix(self, parser: Any, tokens: List[str]) -> None:
+        rng = random.Random(42)
+        for _ in range(2000):
+            args = [rng.choice(tokens) for _ in range(rng.randint(0, 8))]
+            self.assertEqual(SnakeParse._parse_known_args(parser=parser, args=args),
+                             SnakeParse._parse_known_args_by_prefix(parser=parser, args=args),
+                             msg=f'args: {args}')
+
+    def test_parse_known_args(self) -> None:
+        args = ['--snakefile-globs', 'a', 'b', '--prog', 'p', 'Workflow', '--message', 'hi']
+        end, namespace = SnakeParse._parse_known_args(parser=self.config_parser, args=args)
+        self.assertEqual(end, 5)
+        self.assertEqual(namespace.prog, 'p')
+        self.assertListEqual(namespace.snakefile_globs, ['a', 'b'])
+
+        # all args are known
+        end, namespace = SnakeParse._parse_known_args(parser=self.config_parser, args=args[:5])
+        self.assertEqual(end, 6)
+        self.assertListEqual(namespace.snakefile_globs, ['a', 'b'])
+
+        # the argument separator is unknown
+        end, namespace = SnakeParse._parse_known_args(parser=self.config_parser,
+                                                      args=['--prog', 'p', '--', 'Workflow'])
+        self.assertEqual(end, 2)
+
+    def test_parse_known_args_same_as_by_prefix(self) -> None:
+        tokens = ['--config', 'c.json', '--snakefile-globs', 'a', '--prog', 'p',
+                  '--name-transform=x', '--no-cache', '--lazy=1', '-h', '-hx', '--', 'Workflow',
+                  '--force', '-n', '-5', '-', '--prog=', '--unknown=1', 'a b']
+        self._assert_same_as_by_prefix(parser=self.config_parser, tokens=tokens)
+
+    def test_parse_known_args_nargs_same_as_by_prefix(self) -> None:
+        parser = _NonExitingParser(allow_abbrev=False)
+        parser.add_argument('--two', nargs=2)
+        parser.add_argument('--optional', nargs='?')
+        parser.add_argument('--plus', nargs='+')
+        parser.add_argument('--int', type=int)
+        parser.add_argument('-f', action='store_true')
+        parser.add_argument('-v', action='count')
+        tokens = ['--two', '--optional', '--plus', '--int', '1', 'x', '-f', '-fv', '-vv', '--',
+                  '-5', '--int=3', '--int=x', '--plus=1', '-fx', '--two=1']
+        self._assert_same_as_by_prefix(parser=parser, tokens=tokens)
+
+    def test_parse_known_args_unsupported_parser(self) -> None:
+        # abbreviations are allowed, so parse by prefix
+        parser = _NonExitingParser()
+        parser.add_argument('--message')
+        args = ['--mess', 'hi', 'Workflow']
+        end, namespace = SnakeParse._parse_known_args(parser=parser, args=args)
+        self.assertEqual(end, 2)
+        self.assertEqual(namespace.message, 'hi')
+
+
+class SnakeParseDispatchTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        snakefile = Path(self.tempdir.name) / 'workflow.smk'
+        with snakefile.open('w') as fh:
+            fh.write(_SNAKEFILE_CONTENTS)
+        self.config = SnakeParseConfig(workflows=OrderedDict())
+        for name, aliases in [('WriteMessage', ['wm']), ('WriteLog', []), ('Align', [])]:
+            self.config.add_workflow(SnakeParseWorkflow(name=name, snakefile=snakefile,
+                                                        aliases=aliases))
+        self.parsed: List[SnakeParse] = []
+
+    def tearDown(self) -> None:
+        for parsed in self.parsed:
+            parsed.cleanup()
+        self.tempdir.cleanup()
+
+    def _parse(self, args: List[str], in_process: bool = False,
+               transport: str = 'file', args_sidecar: bool = False) -> SnakeParse:
+        parsed = SnakeParse(args=args, config=self.config, file=StringIO(), in_process=in_process,
+                            transport=transport, args_sidecar=args_sidecar)
+        self.parsed.append(parsed)
+        return parsed
+
+    def _error(self, args: List[str]) -> str:
+        output = StringIO()
+        with self.assertRaises(SystemExit):
+            SnakeParse(args=args, config=self.config, file=output)
+        return output.getvalue()
+
+    def test_first_workflow_name_is_used(self) -> None:
+        parsed = self._parse(['-n', 'WriteLog', '--message', 'WriteMessage'])
+        self.assertEqual(parsed.workflow.name, 'WriteLog')
+        self.assertListEqual(parsed.snakemake_args[:1], ['-n'])
+
+    def test_alias(self) -> None:
+        parsed = self._parse(['wm', '--message', 'hi'])
+        self.assertEqual(parsed.workflow.name, 'WriteMessage')
+
+    def test_resolve_after_separator(self) -> None:
+        parsed = self._parse(['-n', '--', 'writem', '--message', 'hi'])
+        self.assertEqual(parsed.workflow.name, 'WriteMessage')
+        self.assertListEqual(parsed.snakemake_args[:1], ['-n'])
+
+    def test_conflicting_aliases(self) -> None:
+        with self.assertRaises(SnakeParseException):
+            self.config.add_workflow(SnakeParseWorkflow(
+                name='WriteMore', snakefile=self.config.workflows['Align'].snakefile,
+                aliases=['wm']
+            ))
+        # changed after being added, so reported with the usage
+        self.config.workflows['Align'].aliases.append('wm')
+        output = self._error(['WriteMessage', '--message', 'hi'])
+        self.assertIn("Multiple workflows with name or alias 'wm'.", output)
+
+    def test_suggestions(self) -> None:
+        self.assertIn('Did you mean: WriteLog', self._error(['WriteLgo', '--message', 'hi']))
+        self.assertIn('Did you mean: WriteLog, WriteMessage?', self._error(['--', 'Write']))
+        self.assertIn('No workflow given.\n', self._error(['Zzz']))
+
+    def test_usage_is_written_once(self) -> None:
+        output = mock.Mock(wraps=StringIO())
+        with self.assertRaises(SystemExit):
+            SnakeParse(args=['Zzz'], config=self.config, file=output)
+        output.write.assert_called_once()
+        self.assertIn('WriteMessage', output.write.call_args[0][0])
+
+    def _config_from(self, argv: List[str]) -> dict:
+        index = argv.index('--config')
+        key, value = argv[index + 1].split('=', 1)
+        return {key: value}
+
+    def test_in_process(self) -> None:
+        parsed = self._parse(['-n', 'WriteMessage', '--message', 'hi'], in_process=True)
+        self.assertIsNone(parsed.snakeparse_args_file)
+        self.assertIn(parsed.snakeparse_args_token, _PARSED_ARGS)
+
+        parser = self.config.parser_from(workflow=parsed.workflow)
+        args = []
+
+        def main(argv: List[str]) -> None:
+            args.append(parser.parse_config(config=self._config_from(argv)))
+            raise SystemExit(3)
+
+        with mock.patch('snakemake.main', side_effect=main) as snakemake_main, \
+                mock.patch('subprocess.call') as call:
+            with self.assertRaises(SystemExit) as context:
+                parsed.run()
+            call.assert_not_called()
+            snakemake_main.assert_called_once()
+        self.assertEqual(context.exception.code, 3)
+        self.assertEqual(args[0].message, 'hi')
+        self.assertListEqual(parsed.snakemake_args[:1], ['-n'])
+        # the parsed arguments are released after running
+        self.assertNotIn(parsed.snakeparse_args_token, _PARSED_ARGS)
+
+    def test_in_process_args_are_released(self) -> None:
+        parsed = self._parse(['WriteMessage', '--message', 'hi'], in_process=True)
+        token = parsed.snakeparse_args_token
+        config = {SnakeParse.ARGUMENT_TOKEN_KEY: token}
+        parser = self.config.parser_from(workflow=parsed.workflow)
+        first = parser.parse_config(config=config)
+        second = parser.parse_config(config=config)
+        self.assertEqual(first.message, 'hi')
+        self.assertEqual(first, second)
+        self.assertIsNot(first, second)
+
+        # released when cleaned up
+        parsed.cleanup()
+        self.assertNotIn(token, _PARSED_ARGS)
+
+        # released when never run
+        parsed = SnakeParse(args=['WriteMessage', '--message', 'hi'], config=self.config,
+                            file=StringIO(), in_process=True)
+        token = parsed.snakeparse_args_token
+        self.assertIn(token, _PARSED_ARGS)
+        del parsed
+        gc.collect()
+        self.assertNotIn(token, _PARSED_ARGS)
+
+    def test_env_transport(self) -> None:
+        parsed = self._parse(['-n', 'WriteMessage', '--message', 'hi'], transport='env')
+        self.assertIsNone(parsed.snakeparse_args_file)
+        self.assertListEqual(parsed.snakemake_args[:3],
+                             ['-n', '--config', 'snakeparse_args_env=SNAKEPARSE_ARGS'])
+
+        parser = self.config.parser_from(workflow=parsed.workflow)
+        config = self._config_from(parsed.snakemake_args)
+        with mock.patch.dict(os.environ, parsed.snakemake_env):
+            with mock.patch.object(parser, 'parse_args') as parse_args:
+                args = parser.parse_config(config=config)
+                parse_args.assert_not_called()
+        self.assertEqual(args.message, 'hi')
+
+        with mock.patch('subprocess.call', return_value=0) as call:
+            with self.assertRaises(SystemExit):
+                parsed.run()
+            env = call.call_args[1]['env']
+            self.assertEqual(env['SNAKEPARSE_ARGS'], parsed.snakemake_env['SNAKEPARSE_ARGS'])
+
+    def test_env_transport_falls_back_to_file(self) -> None:
+        with mock.patch.object(SnakeParse, '_encode_namespace', return_value=None):
+            parsed = self._parse(['WriteMessage', '--message', 'hi'], transport='env')
+        self.assertIsNotNone(parsed.snakeparse_args_file)
+        self.assertDictEqual(parsed.snakemake_env, {})
+
+        # too large for the environment
+        message = 'x' * (SnakeParse.ARGUMENT_ENV_MAX_BYTES + 1)
+        self.assertIsNone(SnakeParse._encode_namespace(namespace=Namespace(message=message)))
+        parsed = self._parse(['WriteMessage', '--message', message], transport='env')
+        self.assertIsNotNone(parsed.snakeparse_args_file)
+        self.assertDictEqual(parsed.snakemake_env, {})
+        self.assertNotIn('snakeparse_args_env=SNAKEPARSE_ARGS', parsed.snakemake_args)
+
+    def test_args_file_removed_on_error(self) -> None:
+        with tempfile.TemporaryDirectory() as tempdir:
+            with mock.patch.object(tempfile, 'tempdir', tempdir):
+                self._error(['WriteMessage'])
+            self.assertListEqual(os.listdir(tempdir), [])
+
+    def test_args_files_removed_when_not_run(self) -> None:
+        parsed = SnakeParse(args=['WriteMessage', '--message', 'hi'], config=self.config,
+                            file=StringIO(), args_sidecar=True)
+        args_file, sidecar = parsed.snakeparse_args_file, parsed.snakeparse_args_sidecar
+        self.assertTrue(args_file.exists())  # type: ignore
+        self.assertTrue(sidecar.exists())  # type: ignore
+        del parsed
+        gc.collect()
+        self.assertFalse(args_file.exists())  # type: ignore
+        self.assertFalse(sidecar.exists())  # type: ignore
+
+    def test_args_file_removed_when_interrupted(self) -> None:
+        parsed = self._parse(['WriteMessage', '--message', 'hi'])
+        with mock.patch('subprocess.call', side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                parsed.run()
+        self.assertFalse(parsed.snakeparse_args_file.exists())  # type: ignore
+
+    def test_parse_config_is_memoized(self) -> None:
+        parsed = self._parse(['WriteMessage', '--message', 'hi'])
+        config = self._config_from(parsed.snakemake_args)
+        parser = self.config.parser_from(workflow=parsed.workflow)
+        with mock.patch.object(parser, 'parse_args_file',
+                               wraps=parser.parse_args_file) as parse_args_file:
+            first = parser.parse_config(config=config)
+            second = self.config.parser_from(workflow=parsed.workflow).parse_config(config=config)
+            parse_args_file.assert_called_once()
+        self.assertEqual(first.message, 'hi')
+        self.assertEqual(first, second)
+        self.assertIsNot(first, second)
+
+        # a modified arguments file is parsed again
+        with parsed.snakeparse_args_file.open('w') as fh:
+            fh.write('--message\nbye!\n')
+        self.assertEqual(parser.parse_config(config=config).message, 'bye!')
+
+    def test_args_sidecar(self) -> None:
+        parsed = self._parse(['WriteMessage', '--message', 'hi'], args_sidecar=True)
+        sidecar = parsed.snakeparse_args_sidecar
+        self.assertIsNotNone(sidecar)
+        self.assertEqual(os.stat(str(sidecar)).st_mode & 0o077, 0)
+
+        config = self._config_from(parsed.snakemake_args)
+        parser = self.config.parser_from(workflow=parsed.workflow)
+        with mock.patch.object(parser, 'parse_args_file') as parse_args_file:
+            self.assertEqual(parser.parse_config(config=config).message, 'hi')
+            parse_args_file.assert_not_called()
+
+        parsed.cleanup()
+        self.assertFalse(sidecar.exists())  # type: ignore
+        self.assertFalse(parsed.snakeparse_args_file.exists())  # type: ignore
+
+    def test_unknown_token(self) -> None:
+        parsed = self._parse(['WriteMessage', '--message', 'hi'], in_process=True)
+        parser = self.config.parser_from(workflow=parsed.workflow)
+        config = {SnakeParse.ARGUMENT_TOKEN_KEY: 'snakeparse-unknown'}
+        with self.assertRaises(SnakeParseException):
+            parser.parse_config(config=config)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,13 @@
+import sys
 import unittest
+from collections import OrderedDict
 from pathlib import Path
+from unittest import mock
 import tempfile
-from snakeparse.api import SnakeParseConfig, SnakeParseException, SnakeParseWorkflow
-from typing import Tuple
+import snakemake.workflow
+from snakeparse.api import SnakeParseConfig, SnakeParseException, SnakeParseWorkflow, \
+    _WorkflowStub
+from typing import Any, List, Tuple
 
 
 class SnakeParseConfigTest(unittest.TestCase):
@@ -191,6 +196,112 @@ rule message:
                 SnakeParseConfig.parser_from(workflow=workflow)
             self.assertIn('Found', str(ex.exception))
 
+    def test_parser_from_execution_context(self) -> None:
+        ''' Tests the namespace and sys.path the snakefile is executed with '''
+        with tempfile.TemporaryDirectory() as tempdir_str:
+            tempdir = Path(tempdir_str)
+            with (tempdir / 'snakeparse_test_helpers.py').open('w') as fh:
+                fh.write('MESSAGE = "--message"\n')
+            snakefile = tempdir / 'workflow.smk'
+            with snakefile.open('w') as fh:
+                fh.write('from snakeparse.parser import argparser\n'
+                         'assert workflow.basedir == ' + repr(str(tempdir.resolve())) + '\n'
+                         'assert "os" not in globals()\n'
+                         'def snakeparser(**kwargs):\n'
+                         '    from snakeparse_test_helpers import MESSAGE\n'
+                         '    assert executed\n'
+                         '    p = argparser(**kwargs)\n'
+                         '    p.parser.add_argument(MESSAGE, required=True)\n'
+                         '    return p\n'
+                         'onstart:\n'
+                         '    print("started")\n'
+                         'rule all:\n'
+                         '    input: lambda wildcards: "message.txt"\n'
+                         '    run:\n'
+                         '        print(input)\n'
+                         'executed = True\n')
+            workflow = SnakeParseWorkflow(name='Workflow', snakefile=snakefile)
+
+            sys_path = list(sys.path)
+            for _ in range(3):
+                parser = SnakeParseConfig.parser_from(workflow=workflow)
+                args = parser.parse_args(['--message', 'Hello World!'])
+                self.assertEqual(args.message, 'Hello World!')
+            self.assertListEqual(sys.path, sys_path)
+            self.assertNotIn(str(tempdir.resolve()), sys.path_importer_cache)
+            sys.modules.pop('snakeparse_test_helpers', None)
+
+            # a directory already on the path is moved to the front while the
+            # snakefile is executed, and then moved back
+            sys.path.append(str(tempdir.resolve()))
+            sys_path = list(sys.path)
+            sys_paths = []
+            exec_parser = SnakeParseConfig._exec_parser
+
+            def _exec_parser(**kwargs: Any) -> Any:
+                sys_paths.append(list(sys.path))
+                return exec_parser(**kwargs)
+
+            try:
+                with mock.patch.object(SnakeParseConfig, '_exec_parser', _exec_parser):
+                    SnakeParseConfig.parser_from(workflow=workflow)
+                self.assertEqual(sys_paths[0][0], str(tempdir.resolve()))
+                self.assertEqual(sys_paths[0].count(str(tempdir.resolve())), 1)
+                self.assertListEqual(sys.path, sys_path)
+            finally:
+                sys.path.remove(str(tempdir.resolve()))
+                sys.modules.pop('snakeparse_test_helpers', None)
+
+    def test_parser_from_directives(self) -> None:
+        ''' Tests that directives are ignored, while the snakefile is executed
+        with Snakemake's workflow if it uses other attributes of the workflow '''
+        with tempfile.TemporaryDirectory() as tempdir_str:
+            snakefile = Path(tempdir_str) / 'workflow.smk'
+            contents = ('from snakeparse.parser import argparser\n'
+                        'configfile: "config.yaml"\n'
+                        'localrules: all\n'
+                        'ruleorder: write > all\n'
+                        'wildcard_constraints:\n'
+                        '    sample="[a-z]+"\n'
+                        'def snakeparser(**kwargs):\n'
+                        '    p = argparser(**kwargs)\n'
+                        "    p.parser.add_argument('--message', required=True)\n"
+                        '    return p\n'
+                        'rule all:\n'
+                        '    input: "message.txt"\n'
+                        'rule write:\n'
+                        '    output: "message.txt"\n'
+                        '    params: message="hi"\n'
+                        '    threads: 2\n'
+                        '    resources: mem_mb=10\n'
+                        '    log: "write.log"\n'
+                        '    shell: "echo {params.message} > {output}"\n')
+            with snakefile.open('w') as fh:
+                fh.write(contents)
+            workflow = SnakeParseWorkflow(name='Workflow', snakefile=snakefile)
+            with mock.patch('snakemake.workflow.Workflow') as snakemake_workflow:
+                parser = SnakeParseConfig.parser_from(workflow=workflow)
+                snakemake_workflow.assert_not_called()
+            self.assertEqual(parser.parse_args(['--message', 'hi']).message, 'hi')
+
+            # the number of cores is only known to Snakemake's workflow, before
+            # the parser is defined, or when the parser is built
+            stub = _WorkflowStub(snakefile=str(snakefile))
+            self.assertIsNotNone(stub.rule(name='all')(lambda: None))
+            with self.assertRaises(AttributeError):
+                stub.cores
+            for cores in ['CORES = workflow.cores\n' + contents,
+                          contents.replace('    p = argparser(**kwargs)\n',
+                                           '    p = argparser(**kwargs)\n'
+                                           '    assert workflow.cores > 0\n')]:
+                with snakefile.open('w') as fh:
+                    fh.write(cores.replace('configfile: "config.yaml"\n', ''))
+                with mock.patch('snakemake.workflow.Workflow',
+                                wraps=snakemake.workflow.Workflow) as snakemake_workflow:
+                    parser = SnakeParseConfig.parser_from(workflow=workflow)
+                    snakemake_workflow.assert_called_once()
+                self.assertEqual(parser.parse_args(['--message', 'hi']).message, 'hi')
+
     def test_config_parser(self) -> None:
         parser = SnakeParseConfig.config_parser()
 
@@ -222,6 +333,19 @@ rule message:
         with self.assertRaises(SnakeParseException):
             config.add_workflow(workflow=wf1)
         self.assertEqual(len(config.workflows), 2)
+        # test failure with a workflow with the same alias, or an alias that is
+        # the name of another workflow
+        config.add_workflow(SnakeParseWorkflow(name='N3', snakefile=snakefile, aliases=['w']))
+        for name, aliases in [('N4', ['x', 'w']), ('w', []), ('N4', ['N1'])]:
+            with self.assertRaises(SnakeParseException) as context:
+                config.add_workflow(SnakeParseWorkflow(name=name, snakefile=snakefile,
+                                                       aliases=aliases))
+            self.assertIn('Multiple workflows with name', str(context.exception))
+        self.assertEqual(len(config.workflows), 3)
+        # the aliases of removed workflows may be used again
+        config._remove_workflow(name='N3')
+        config.add_workflow(SnakeParseWorkflow(name='N4', snakefile=snakefile, aliases=['w']))
+        self.assertEqual(config.index.get('w'), 'N4')
 
     def test_add_snakefile(self) -> None:
         with tempfile.TemporaryDirectory() as tempdir_str:
@@ -273,4 +397,149 @@ rule message:
             config.add_group(name='G2', description='D4', strict=True)
         self.assertEqual(config.groups['G2'], 'D3')
 
+    def test_lazy(self) -> None:
+        with tempfile.TemporaryDirectory() as tempdir_str:
+            tempdir = Path(tempdir_str)
+            for name, group in [('b', 'G1'), ('a', 'G2'), ('c', 'G1')]:
+                with (tempdir / f'{name}.smk').open('w') as fh:
+                    fh.write('from snakeparse.api import SnakeArgumentParser\n'
+                             'class Parser(SnakeArgumentParser):\n'
+                             '    def __init__(self, **kwargs):\n'
+                             '        super().__init__(**kwargs)\n'
+                             f'        self.group = {group!r}\n')
+
+            with mock.patch.object(SnakeParseConfig, 'metadata_from',
+                                   wraps=SnakeParseConfig.metadata_from) as metadata_from:
+                config = SnakeParseConfig(workflows=OrderedDict(),
+                                          snakefile_globs=[str(tempdir / '*.smk')],
+                                          lazy=True)
+                metadata_from.assert_not_called()
+
+                # only the accessed workflow is loaded
+                self.assertEqual(config.workflows['a'].group, 'G2')
+                self.assertEqual(metadata_from.call_count, 1)
+
+                # sorting loads the rest
+                config.sort_workflows()
+                self.assertEqual(metadata_from.call_count, 3)
+                self.assertListEqual(list(config.workflows.keys()), ['b', 'c', 'a'])
+
+    def test_jobs(self) -> None:
+        with tempfile.TemporaryDirectory() as tempdir_str:
+            tempdir = Path(tempdir_str)
+            for i, group in enumerate(['G2', 'G1', 'G2', 'G1', 'G3']):
+                with (tempdir / f'w{i}.smk').open('w') as fh:
+                    fh.write('from snakeparse.api import SnakeArgumentParser\n'
+                             'class Parser(SnakeArgumentParser):\n'
+                             '    def __init__(self, **kwargs):\n'
+                             '        super().__init__(**kwargs)\n'
+                             # computed, so the snakefile must be executed
+                             f'        self.group = {group[0]!r} + {group[1]!r}\n')
+
+            def workflows(jobs: int) -> List[Tuple[str, str]]:
+                config = SnakeParseConfig(workflows=OrderedDict(),
+                                          snakefile_globs=[str(tempdir / '*.smk')],
+                                          jobs=jobs)
+                return [(wf.name, wf.group) for wf in config.workflows.values()]
+
+            serial = workflows(jobs=1)
+            self.assertListEqual([group for name, group in serial],
+                                 ['G1', 'G1', 'G2', 'G2', 'G3'])
+            self.assertListEqual(workflows(jobs=3), serial)
+
+            # the same error is raised
+            with (tempdir / 'w2.smk').open('w') as fh:
+                fh.write('x = 1\n')
+            with self.assertRaisesRegex(SnakeParseException, 'w2.smk'):
+                workflows(jobs=3)
+
+    def test_refresh(self) -> None:
+        def write(snakefile: Path, group: str) -> None:
+            with snakefile.open('w') as fh:
+                fh.write('from snakeparse.api import SnakeArgumentParser\n'
+                         'class Parser(SnakeArgumentParser):\n'
+                         '    def __init__(self, **kwargs):\n'
+                         '        super().__init__(**kwargs)\n'
+                         f'        self.group = {group!r}\n')
+
+        for lazy in [False, True]:
+            with tempfile.TemporaryDirectory() as tempdir_str:
+                tempdir = Path(tempdir_str)
+                (tempdir / 'sub').mkdir()
+                for name, group in [('a', 'G2'), ('b', 'G1'), ('c', 'G3')]:
+                    write(snakefile=tempdir / f'{name}.smk', group=group)
+                config = SnakeParseConfig(workflows=OrderedDict(),
+                                          snakefile_globs=[str(tempdir / '**' / '*.smk')],
+                                          lazy=lazy)
+                config.sort_workflows()
+                self.assertListEqual(list(config.workflows.keys()), ['b', 'a', 'c'])
+                self.assertFalse(config.refresh().changed)
+
+                # add d, remove c, and modify a
+                write(snakefile=tempdir / 'sub' / 'd.smk', group='G0')
+                (tempdir / 'c.smk').unlink()
+                write(snakefile=tempdir / 'a.smk', group='G00')
+                with mock.patch.object(SnakeParseConfig, 'metadata_from',
+                                       wraps=SnakeParseConfig.metadata_from) as metadata_from:
+                    result = config.refresh()
+                    config.sort_workflows()
+                    # only the added and modified snakefiles are loaded
+                    self.assertEqual(metadata_from.call_count, 2)
+                self.assertListEqual(result.added, ['d'])
+                self.assertListEqual(result.removed, ['c'])
+                self.assertListEqual(result.modified, ['a'])
+                self.assertListEqual(list(config.workflows.keys()), ['d', 'a', 'b'])
+                self.assertEqual(config.workflows['a'].group, 'G00')
+                self.assertNotIn('c', config.index)
+                self.assertFalse(config.refresh().changed)
+
+    def test_parser_for(self) -> None:
+        snakefile_contents = '''
+from snakeparse.parser import argparser
+
+def snakeparser(**kwargs):
+    p = argparser(**kwargs)
+    p.parser.add_argument('--message', help='The message.', required=True)
+    return p
+'''
+        snakefile, workflow = self._get_snakefile_and_workflow(
+            snakefile_contents=snakefile_contents
+        )
+        config = SnakeParseConfig(workflows=OrderedDict())
+        parser = config.parser_for(workflow=workflow)
+        self.assertIs(config.parser_for(workflow=workflow), parser)
+
+        # the parser is rebuilt when the snakefile is modified
+        with snakefile.open('w') as fh:
+            fh.write(snakefile_contents.replace("'--message'", "'--text'"))
+        other = config.parser_for(workflow=workflow)
+        self.assertIsNot(other, parser)
+        self.assertEqual(other.parse_args(['--text', 'Hello']).text, 'Hello')
+        snakefile.unlink()
+
+    def test_group_index(self) -> None:
+        with tempfile.NamedTemporaryFile('w', suffix='.smk', delete=False) as fh:
+            fh.write('')
+            snakefile = Path(fh.name)
+        config = SnakeParseConfig(workflows=OrderedDict(), groups=OrderedDict([('G2', 'D2')]))
+        for name, group in [('A', 'G1'), ('B', 'G2'), ('C', None), ('D', 'G1')]:
+            config.add_workflow(SnakeParseWorkflow(name=name, snakefile=snakefile, group=group,
+                                                   description=f'Workflow {name}'))
+        index = config.group_index
+        self.assertListEqual([(group, [wf.name for wf in wfs]) for group, wfs in index.items()],
+                             [('G2', ['B']), ('G1', ['A', 'D']), (None, ['C'])])
+        self.assertIs(config.group_index, index)
+
+        listing = config.workflow_listing(columns=80)
+        self.assertIs(config.workflow_listing(columns=80), listing)
+        self.assertLess(listing.index('G2:'), listing.index('G1:'))
+        self.assertNotIn('snakefile:', listing)
+        self.assertIn(f'snakefile:  {snakefile}', config.workflow_listing(columns=80, debug=True))
+
+        # adding a group rebuilds the index and the listing
+        config.add_group(name='G3', description='D3')
+        self.assertIsNot(config.group_index, index)
+        self.assertIn('G3:', config.workflow_listing(columns=80))
+        snakefile.unlink()
+
     ''' TODO: Tests for the __init__ method '''
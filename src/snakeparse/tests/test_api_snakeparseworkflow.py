@@ -1,3 +1,4 @@
+import sys
 import unittest
 from pathlib import Path
 from snakeparse.api import SnakeParseWorkflow, SnakeParseException
@@ -39,6 +40,40 @@ class SnakeParseWorkflowTest(unittest.TestCase):
         self.assertEqual(workflow.group, 'group')
         self.assertEqual(workflow.description, 'description')
 
+    def test_compact(self) -> None:
+        group = ''.join(['gro', 'up'])
+        workflows = [
+            SnakeParseWorkflow(name=name, snakefile=self.snakefile.parent / f'{name}.smk',
+                               group=group, check_exists=False)
+            for name in ['a', 'b']
+        ]
+        for workflow in workflows:
+            self.assertFalse(hasattr(workflow, '__dict__'))
+            with self.assertRaises(AttributeError):
+                setattr(workflow, 'other', 1)
+        self.assertEqual(workflows[0].snakefile, self.snakefile.parent / 'a.smk')
+        # the group names are shared
+        self.assertIs(workflows[0].group, workflows[1].group)
+
+        workflows[1].group = ''.join(['other ', group])
+        workflows[1].snakefile = Path('c.smk')
+        self.assertIs(workflows[1].group, sys.intern('other group'))
+        self.assertEqual(workflows[1].snakefile, Path('c.smk'))
+
+    def test_defer(self) -> None:
+        calls = []
+
+        def loader(wf: SnakeParseWorkflow) -> None:
+            calls.append(wf.name)
+            wf.group = 'loaded group'
+
+        workflow = SnakeParseWorkflow(name='name', snakefile=self.snakefile)
+        workflow.defer(loader=loader)
+        self.assertListEqual(calls, [])
+        self.assertIsNone(workflow.description)
+        self.assertEqual(workflow.group, 'loaded group')
+        self.assertListEqual(calls, ['name'])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+from collections import OrderedDict
+from pathlib import Path
+
+from snakeparse.api import SnakeParseWorkflow, WorkflowTable
+
+
+class WorkflowTableTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.workflows = OrderedDict(
+            (name, SnakeParseWorkflow(name=name, snakefile=Path(f'/{group}/{name}.smk'),
+                                      group=group, check_exists=False))
+            for name, group in [('c', 'G2'), ('a', 'G1'), ('d', None), ('b', 'G2')]
+        )
+        self.table = WorkflowTable(workflows=self.workflows)
+
+    def test_mapping(self) -> None:
+        table = self.table
+        self.assertListEqual(list(table), ['c', 'a', 'd', 'b'])
+        self.assertEqual(len(table), 4)
+        self.assertIs(table['a'], self.workflows['a'])
+        self.assertIn('a', table)
+        self.assertNotIn('e', table)
+        self.assertIsNone(table.get('e'))
+        self.assertEqual(table, self.workflows)
+        with self.assertRaises(KeyError):
+            table['e']
+
+        # replacing keeps the position, adding appends
+        other = SnakeParseWorkflow(name='a', snakefile=Path('/a.smk'), check_exists=False)
+        table['a'] = other
+        table['e'] = self.workflows['a']
+        self.assertListEqual(list(table), ['c', 'a', 'd', 'b', 'e'])
+        self.assertIs(table['a'], other)
+
+        # removing moves the last workflow into its place
+        del table['a']
+        self.assertListEqual(list(table), ['c', 'e', 'd', 'b'])
+        self.assertListEqual([table[name].name for name in table], ['c', 'a', 'd', 'b'])
+        self.assertIs(table.pop('b'), self.workflows['b'])
+        self.assertListEqual([wf.name for wf in table.records()], ['c', 'a', 'd'])
+        with self.assertRaises(KeyError):
+            del table['b']
+
+    def test_sort(self) -> None:
+        table = self.table
+        table.sort(key=lambda wf: (str(wf.group), wf.name))
+        self.assertListEqual(list(table), ['a', 'b', 'c', 'd'])
+        self.assertListEqual([wf.name for wf in table.values()], ['a', 'b', 'c', 'd'])
+        self.assertIs(table['c'], self.workflows['c'])
+
+    def test_groups(self) -> None:
+        self.assertListEqual(self.table.groups(), ['G2', 'G1', None])
+        self.assertListEqual([wf.name for wf in self.table.in_group('G2')], ['c', 'b'])
+        self.assertListEqual([wf.name for wf in self.table.in_group(None)], ['d'])
+        self.assertListEqual(self.table.in_group('G3'), [])
+
+    def test_groups_after_changes(self) -> None:
+        table = self.table
+        self.assertListEqual(table.groups(), ['G2', 'G1', None])
+
+        # the index is kept as workflows are added, replaced, and removed
+        table['e'] = SnakeParseWorkflow(name='e', snakefile=Path('/G1/e.smk'), group='G1',
+                                        check_exists=False)
+        table['c'] = SnakeParseWorkflow(name='c', snakefile=Path('/G3/c.smk'), group='G3',
+                                        check_exists=False)
+        self.assertListEqual(table.groups(), ['G3', 'G1', None, 'G2'])
+        self.assertListEqual([wf.name for wf in table.in_group('G1')], ['a', 'e'])
+        del table['a']
+        self.assertListEqual(list(table), ['c', 'e', 'd', 'b'])
+        self.assertListEqual(table.groups(), ['G3', 'G1', None, 'G2'])
+        del table['c']
+        self.assertListEqual(table.groups(), ['G2', 'G1', None])
+        self.assertListEqual([wf.name for wf in table.in_group('G2')], ['b'])
+        self.assertListEqual(table.in_group('G3'), [])
+
+        # sorting, or changing a group, rebuilds the index
+        table.sort(key=lambda wf: wf.name)
+        self.assertListEqual(table.groups(), ['G2', None, 'G1'])
+        table['b'].group = 'G1'
+        table.groups_changed()
+        self.assertListEqual(table.groups(), ['G1', None])
+        self.assertListEqual([wf.name for wf in table.in_group('G1')], ['b', 'e'])
+
+    def test_directories_are_shared(self) -> None:
+        workflows = [SnakeParseWorkflow(name=name, snakefile=Path(f'/G/{name}.smk'),
+                                        check_exists=False)
+                     for name in ['x', 'y']]
+        self.assertIsNot(workflows[0]._directory, workflows[1]._directory)
+        table = WorkflowTable()
+        for workflow in workflows:
+            table[workflow.name] = workflow
+        self.assertIs(workflows[0]._directory, workflows[1]._directory)
+        self.assertEqual(workflows[1].snakefile, Path('/G/y.smk'))
+
+        # the directories are released with their workflows
+        del table['x']
+        self.assertListEqual(list(table._directories), [Path('/G')])
+        del table['y']
+        self.assertDictEqual(table._directories, {})
+        self.assertDictEqual(table._directory_counts, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,239 @@
+import os
+import stat
+import subprocess
+import tempfile
+import time
+import unittest
+from collections import OrderedDict
+from io import StringIO
+from pathlib import Path
+from typing import Any, List
+from unittest import mock
+
+from snakeparse.api import SnakeParse, SnakeParseConfig, SnakeParseException, \
+    SnakeParseWorkflow
+from snakeparse.__main__ import main
+from snakeparse.batch import _Runner, batch_main, read_jobs, segments_main, split_segments
+
+
+_SNAKEFILE_CONTENTS = '''
+from snakeparse.parser import argparser
+
+def snakeparser(**kwargs):
+    p = argparser(**kwargs)
+    p.parser.add_argument('--message', help='The message.', required=True)
+    return p
+'''
+
+# Stands in for Snakemake: prints its arguments, records how many runs are
+# running at once, and exits with an error if given --fail
+_SNAKEMAKE_CONTENTS = '''#!/bin/sh
+echo "args: $*"
+touch "$RUN_DIR/$$"
+ls "$RUN_DIR" | wc -l >> "$RUN_LOG"
+case "$*" in *--sleep*) sleep 5;; *) sleep 0.1;; esac
+rm "$RUN_DIR/$$"
+case "$*" in *--fail*) exit 3;; esac
+exit 0
+'''
+
+
+class BatchTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tempdir.name)
+        self.argsdir = self.dir / 'args'
+        self.rundir = self.dir / 'running'
+        for directory in [self.argsdir, self.rundir]:
+            directory.mkdir()
+        for name in ['write_message', 'write_log']:
+            with (self.dir / f'{name}.smk').open('w') as fh:
+                fh.write(_SNAKEFILE_CONTENTS)
+        self.snakemake = self.dir / 'snakemake'
+        with self.snakemake.open('w') as fh:
+            fh.write(_SNAKEMAKE_CONTENTS)
+        self.snakemake.chmod(self.snakemake.stat().st_mode | stat.S_IEXEC)
+        self.config = SnakeParseConfig(workflows=OrderedDict(), snakemake=self.snakemake)
+        for name in ['WriteMessage', 'WriteLog']:
+            snakefile = self.dir / ('write_message.smk' if name == 'WriteMessage'
+                                    else 'write_log.smk')
+            self.config.add_workflow(SnakeParseWorkflow(name=name, snakefile=snakefile))
+        environ = mock.patch.dict(os.environ, {'RUN_DIR': str(self.rundir),
+                                               'RUN_LOG': str(self.dir / 'running.log')})
+        environ.start()
+        self.addCleanup(environ.stop)
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def _run_many(self, argvs: List[List[str]], **kwargs: Any) -> Any:
+        kwargs.setdefault('file', StringIO())
+        kwargs.setdefault('prefix_output', True)
+        with mock.patch.object(tempfile, 'tempdir', str(self.argsdir)):
+            return SnakeParse.run_many(argvs=argvs, config=self.config, **kwargs)
+
+    def _max_running(self) -> int:
+        with (self.dir / 'running.log').open('r') as fh:
+            return max(int(line) for line in fh)
+
+    def test_read_jobs(self) -> None:
+        lines = ['# a comment\n', 'WriteMessage\t--message\thello world\n', '\n',
+                 '-n\tWriteLog\t--message\tbye\r\n']
+        self.assertListEqual(read_jobs(lines=lines),
+                             [['WriteMessage', '--message', 'hello world'],
+                              ['-n', 'WriteLog', '--message', 'bye']])
+
+    def test_split_segments(self) -> None:
+        self.assertListEqual(split_segments(args=['A', '-x', '++', '-n', 'B']),
+                             [['A', '-x'], ['-n', 'B']])
+        with self.assertRaises(SnakeParseException):
+            split_segments(args=['A', '++'])
+
+    def test_run_many(self) -> None:
+        argvs = [['WriteMessage', '--message', str(i)] for i in range(3)]
+        argvs.append(['--fail', 'WriteLog', '--message', 'log'])
+        argvs[1].insert(0, '--fail')
+        output = StringIO()
+        with mock.patch.object(SnakeParseConfig, 'parser_from',
+                               wraps=SnakeParseConfig.parser_from) as parser_from:
+            result = self._run_many(argvs=argvs, file=output)
+        # the parser is built once per workflow
+        self.assertEqual(parser_from.call_count, 2)
+        self.assertListEqual(result.errors, [])
+        self.assertListEqual(result.exit_codes, [0, 3, 0, 3])
+        self.assertEqual(result.exit_code, 3)
+        self.assertEqual(self._max_running(), 1)
+        self.assertIn('2 of 4 invocation(s) failed', output.getvalue())
+        self.assertIn('job 2 (--fail WriteMessage --message 1): exit code 3', output.getvalue())
+        self.assertListEqual(os.listdir(self.argsdir), [])
+
+    def test_errors_are_reported_together(self) -> None:
+        argvs = [['WriteMessage', '--message', 'hi'], ['WriteLgo', '--message', 'hi'],
+                 ['WriteLog']]
+        output = StringIO()
+        with mock.patch('subprocess.Popen') as popen:
+            result = self._run_many(argvs=argvs, file=output)
+        popen.assert_not_called()
+        self.assertEqual(result.exit_code, 2)
+        self.assertListEqual([error.position for error in result.errors], [1, 2])
+        self.assertIn('Did you mean: WriteLog', result.errors[0].message)
+        self.assertIn('WriteLog: the following arguments are required: --message',
+                      result.errors[1].message)
+        self.assertIn('Found 2 invalid invocation(s) of 3', output.getvalue())
+        self.assertListEqual(os.listdir(self.argsdir), [])
+
+    def test_concurrency_and_cores(self) -> None:
+        argvs = [['WriteMessage', '--message', str(i)] for i in range(6)]
+        argvs[0][:0] = ['-j', '1']
+        output = StringIO()
+        result = self._run_many(argvs=argvs, concurrency=2, total_cores=8, prefix_output=True,
+                                file=output)
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(self._max_running(), 2)
+        lines = output.getvalue().splitlines()
+        self.assertIn('[WriteMessage:1] args: -j 1 --config', [line[:36] for line in lines])
+        self.assertEqual(len([line for line in lines if ' args: --cores 4 ' in line]), 5)
+
+    def test_fail_fast(self) -> None:
+        # the running invocation is stopped
+        argvs = [['--sleep', 'WriteMessage', '--message', 'hi'],
+                 ['--fail', 'WriteLog', '--message', 'bye']]
+        result = self._run_many(argvs=argvs, concurrency=2, fail_fast=True)
+        self.assertEqual(result.exit_codes[1], 3)
+        self.assertLess(result.exit_codes[0], 0)
+        self.assertEqual(result.exit_code, 3)
+
+        # the invocations not yet started are skipped
+        argvs = [['--fail', 'WriteLog', '--message', 'bye'], ['WriteMessage', '--message', 'hi']]
+        output = StringIO()
+        result = self._run_many(argvs=argvs, fail_fast=True, file=output)
+        self.assertListEqual(result.exit_codes, [3, None])
+        self.assertIn('1 of 2 invocation(s) were not run', output.getvalue())
+        self.assertListEqual(os.listdir(self.argsdir), [])
+
+        # otherwise, all are run
+        self.assertListEqual(self._run_many(argvs=argvs).exit_codes, [3, 0])
+
+    def test_launch_failure(self) -> None:
+        popen = subprocess.Popen
+        wait = True
+
+        def _popen(command: List[str], **kwargs: Any) -> Any:
+            if '--unlaunchable' not in command:
+                return popen(command, **kwargs)
+            # wait for the other invocation to be running
+            for _ in range(500 if wait else 0):
+                if os.listdir(self.rundir):
+                    break
+                time.sleep(0.01)
+            raise PermissionError(13, 'Permission denied')
+
+        # the failure is recorded, and the running invocation is stopped
+        argvs = [['--sleep', 'WriteMessage', '--message', 'hi'],
+                 ['--unlaunchable', 'WriteLog', '--message', 'bye']]
+        output = StringIO()
+        with mock.patch('subprocess.Popen', side_effect=_popen):
+            result = self._run_many(argvs=argvs, concurrency=2, fail_fast=True, file=output)
+        self.assertEqual(result.exit_codes[1], _Runner.LAUNCH_FAILED)
+        self.assertLess(result.exit_codes[0], 0)
+        self.assertEqual(result.exit_code, _Runner.LAUNCH_FAILED)
+        self.assertIn(f'[WriteLog] error: could not run {self.snakemake}: [Errno 13]',
+                      output.getvalue())
+        self.assertIn('job 2 (--unlaunchable WriteLog --message bye): exit code 127',
+                      output.getvalue())
+        self.assertListEqual(os.listdir(self.argsdir), [])
+
+        # otherwise, the others are run to completion
+        wait = False
+        argvs[0].remove('--sleep')
+        with mock.patch('subprocess.Popen', side_effect=_popen):
+            result = self._run_many(argvs=argvs)
+        self.assertListEqual(result.exit_codes, [0, _Runner.LAUNCH_FAILED])
+
+    def test_batch_main(self) -> None:
+        jobs = self.dir / 'jobs.tsv'
+        with jobs.open('w') as fh:
+            fh.write('WriteMessage\t--message\thi\nWriteLog\t--message\tbye\n')
+        args = [str(jobs), '--no-cache', '--concurrency', '2', '--snakemake',
+                str(self.snakemake), '--snakefile-globs', str(self.dir / '*.smk')]
+        output = StringIO()
+        self.assertEqual(batch_main(args=args, file=output), 0)
+        self.assertIn('[WriteLog] args: --config', output.getvalue())
+
+        output = StringIO()
+        self.assertEqual(batch_main(args=[str(self.dir / 'missing.tsv')], file=output), 2)
+        self.assertIn('error: [Errno 2]', output.getvalue())
+
+    def test_segments_main(self) -> None:
+        args = ['--no-cache', '--snakefile-globs', str(self.dir / '*.smk'), '--snakemake',
+                str(self.snakemake), '--total-cores', '4', 'WriteMessage', '--message', 'hi',
+                '++', '--fail', 'WriteLog', '--message', 'bye']
+        output = StringIO()
+        self.assertEqual(segments_main(args=args, file=output), 3)
+        self.assertEqual(self._max_running(), 2)
+        self.assertIn('[WriteMessage] args: --cores 2 --config', output.getvalue())
+        self.assertIn('[WriteLog] args: --cores 2 --fail --config', output.getvalue())
+        self.assertIn('1 of 2 invocation(s) failed', output.getvalue())
+
+        output = StringIO()
+        self.assertEqual(segments_main(args=args[:-4] + ['++'], file=output), 2)
+        self.assertIn("error: Found an empty invocation before or after '++'", output.getvalue())
+
+    def test_main_concurrent(self) -> None:
+        args = ['WriteMessage', '--message', '++']
+        with mock.patch('snakeparse.batch.segments_main', return_value=0) as main_segments, \
+                mock.patch.dict(os.environ, clear=True), \
+                mock.patch('snakeparse.api.SnakeParse') as snakeparse:
+            # '++' is only a separator with the concurrent command
+            main(args=args)
+            main_segments.assert_not_called()
+            self.assertListEqual(snakeparse.call_args[1]['args'], args)
+
+            with self.assertRaises(SystemExit):
+                main(args=['concurrent'] + args + ['WriteLog'])
+            main_segments.assert_called_once_with(args=args + ['WriteLog'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+from collections import OrderedDict
+from pathlib import Path
+from unittest import mock
+
+from snakeparse.api import SnakeParseConfig
+from snakeparse.cache import ConfigCache
+
+
+class ConfigCacheTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tempdir.name)
+        self.cache = ConfigCache(cache_dir=self.dir / 'cache')
+        self.included = self.dir / 'included.conf'
+        self._write(self.included, 'prog = "included"\n')
+        self.config_path = self.dir / 'snakeparse.conf'
+        self._write(self.config_path,
+                    f'include "{self.included}"\n'
+                    'snakefile_globs = ["a", "b"]\n'
+                    'name_transform = ${?SNAKEPARSE_TEST_TRANSFORM}\n')
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def _write(self, path: Path, contents: str) -> None:
+        with path.open('w') as fh:
+            fh.write(contents)
+
+    def _load(self) -> mock.Mock:
+        '''Loads the config, returning the mocked loader.'''
+        loader = mock.Mock(wraps=SnakeParseConfig._read_config)
+        self.data = self.cache.load(config_path=self.config_path, loader=loader)
+        return loader
+
+    def test_warm_cache_skips_loading(self) -> None:
+        self._load().assert_called_once()
+        self.assertEqual(self.data['prog'], 'included')
+        self.assertListEqual(self.data['snakefile_globs'], ['a', 'b'])
+        self._load().assert_not_called()
+        self.assertEqual(self.data['prog'], 'included')
+
+    def test_modified_include_invalidates(self) -> None:
+        self._load()
+        self._write(self.included, 'prog = "modified"\n')
+        self._load().assert_called_once()
+        self.assertEqual(self.data['prog'], 'modified')
+
+    def test_environment_invalidates(self) -> None:
+        with mock.patch.dict(os.environ, {'SNAKEPARSE_TEST_TRANSFORM': 'snake_to_camel'}):
+            self._load()
+            self.assertEqual(self.data['name_transform'], 'snake_to_camel')
+        with mock.patch.dict(os.environ, {'SNAKEPARSE_TEST_TRANSFORM': 'camel_to_snake'}):
+            self._load().assert_called_once()
+            self.assertEqual(self.data['name_transform'], 'camel_to_snake')
+
+    def test_url_include_is_not_cached(self) -> None:
+        self._write(self.config_path, 'include url("http://localhost:1/a.conf")\nprog = "p"\n')
+        self.assertIsNone(ConfigCache._key(config_path=self.config_path))
+        loader = mock.Mock(return_value={'prog': 'p'})
+        for _ in range(2):
+            self.cache.load(config_path=self.config_path, loader=loader)
+        self.assertEqual(loader.call_count, 2)
+
+    def test_yaml(self) -> None:
+        config_path = self.dir / 'snakeparse.yml'
+        self._write(config_path, 'prog: yaml\nsnakefile_globs: []\n')
+        for _ in range(2):
+            config = SnakeParseConfig(config_path=config_path, workflows=OrderedDict(),
+                                      groups=OrderedDict(), snakefile_globs=[],
+                                      cache_dir=self.dir / 'cache')
+            self.assertEqual(config.prog, 'yaml')
+        self.assertEqual(len(list((self.dir / 'cache').glob('*' + ConfigCache.SUFFIX))), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
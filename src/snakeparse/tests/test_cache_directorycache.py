@@ -0,0 +1,41 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from snakeparse.cache import DirectoryCache
+
+
+class DirectoryCacheTest(unittest.TestCase):
+
+    def test_get_and_put(self) -> None:
+        with tempfile.TemporaryDirectory() as tempdir_str:
+            cache_dir = Path(tempdir_str) / 'cache'
+            entries = (('a.smk', 0), ('b', 1))
+
+            cache = DirectoryCache(cache_dir=cache_dir)
+            cache.put(directory='/old', mtime_ns=1, listed_ns=1 + DirectoryCache.RACY_NANOS,
+                      entries=entries)
+            # listed too soon after it was modified
+            cache.put(directory='/racy', mtime_ns=1, listed_ns=2, entries=entries)
+            cache.save()
+            self.assertFalse(cache.dirty)
+
+            cache = DirectoryCache(cache_dir=cache_dir)
+            self.assertEqual(cache.get(directory='/old', mtime_ns=1), entries)
+            self.assertIsNone(cache.get(directory='/old', mtime_ns=2))
+            self.assertIsNone(cache.get(directory='/racy', mtime_ns=1))
+            self.assertIsNone(cache.get(directory='/missing', mtime_ns=1))
+
+            cache.discard(directory='/old')
+            cache.save()
+            self.assertIsNone(DirectoryCache(cache_dir=cache_dir).get(directory='/old',
+                                                                      mtime_ns=1))
+
+            # a corrupt cache is ignored
+            with (cache_dir / DirectoryCache.NAME).open('wb') as fh:
+                fh.write(b'corrupt')
+            self.assertDictEqual(DirectoryCache(cache_dir=cache_dir).listings, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
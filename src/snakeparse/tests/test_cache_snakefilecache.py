@@ -0,0 +1,104 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from snakeparse.api import SnakeParseConfig, SnakeParseWorkflow
+from snakeparse.cache import SnakefileCache, default_cache_dir, translate_snakefile
+
+
+_SNAKEFILE_CONTENTS = '''
+from snakeparse.parser import argparser
+
+def snakeparser(**kwargs):
+    p = argparser(**kwargs)
+    p.parser.add_argument('--message', help='The message.', required=True)
+    return p
+
+rule all:
+    input:
+        'log.txt'
+'''
+
+
+class SnakefileCacheTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.cache_dir = Path(self.tempdir.name) / 'cache'
+        self.snakefile = Path(self.tempdir.name) / 'workflow.smk'
+        with self.snakefile.open('w') as fh:
+            fh.write(_SNAKEFILE_CONTENTS)
+        self.cache = SnakefileCache(cache_dir=self.cache_dir)
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def test_default_cache_dir(self) -> None:
+        with mock.patch.dict(os.environ, {'XDG_CACHE_HOME': '/some/cache'}):
+            self.assertEqual(default_cache_dir(), Path('/some/cache/snakeparse'))
+        with mock.patch.dict(os.environ, {'XDG_CACHE_HOME': ''}):
+            self.assertEqual(default_cache_dir().name, 'snakeparse')
+            self.assertEqual(default_cache_dir().parent.name, '.cache')
+
+    def test_translate_matches_uncached(self) -> None:
+        source, code = self.cache.translate(snakefile=self.snakefile)
+        expected_source, expected_code = translate_snakefile(snakefile=self.snakefile)
+        self.assertEqual(source, expected_source)
+        self.assertEqual(code, expected_code)
+        self.assertEqual(len(list(self.cache_dir.iterdir())), 1)
+
+    def test_warm_cache_skips_translation(self) -> None:
+        self.cache.translate(snakefile=self.snakefile)
+        with mock.patch('snakeparse.cache.translate_snakefile') as translate:
+            code = self.cache.compile(snakefile=self.snakefile)
+            translate.assert_not_called()
+        self.assertEqual(code.co_filename, str(self.snakefile))
+
+    def test_modified_snakefile_invalidates(self) -> None:
+        self.cache.translate(snakefile=self.snakefile)
+        with self.snakefile.open('a') as fh:
+            fh.write('\n# a comment\n')
+        with mock.patch('snakeparse.cache.translate_snakefile',
+                        wraps=translate_snakefile) as translate:
+            source, code = self.cache.translate(snakefile=self.snakefile)
+            translate.assert_called_once()
+        self.assertIn('# a comment', source)
+        # the entry is replaced, not added
+        self.assertEqual(len(list(self.cache_dir.iterdir())), 1)
+
+    def test_version_change_invalidates(self) -> None:
+        self.cache.translate(snakefile=self.snakefile)
+        with mock.patch('snakeparse.cache.__version__', 'not-a-version'), \
+                mock.patch('snakeparse.cache.translate_snakefile',
+                           wraps=translate_snakefile) as translate:
+            self.cache.translate(snakefile=self.snakefile)
+            translate.assert_called_once()
+
+    def test_corrupt_entry_is_replaced(self) -> None:
+        self.cache.translate(snakefile=self.snakefile)
+        entry = next(self.cache_dir.iterdir())
+        with entry.open('wb') as fh:
+            fh.write(b'not a marshalled value')
+        source, code = self.cache.translate(snakefile=self.snakefile)
+        self.assertEqual(source, translate_snakefile(snakefile=self.snakefile)[0])
+
+    def test_unwritable_cache_dir(self) -> None:
+        not_a_dir = Path(self.tempdir.name) / 'not_a_dir'
+        with not_a_dir.open('w') as fh:
+            fh.write('')
+        cache = SnakefileCache(cache_dir=not_a_dir)
+        source, code = cache.translate(snakefile=self.snakefile)
+        self.assertEqual(source, translate_snakefile(snakefile=self.snakefile)[0])
+
+    def test_parser_from_with_cache(self) -> None:
+        workflow = SnakeParseWorkflow(name='Workflow', snakefile=self.snakefile)
+        for _ in range(2):
+            parser = SnakeParseConfig.parser_from(workflow=workflow, cache=self.cache)
+            args = parser.parse_args(['--message', 'Hello World!'])
+            self.assertEqual(args.message, 'Hello World!')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,186 @@
+import json
+import os
+import tempfile
+import unittest
+from collections import OrderedDict
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from snakeparse.api import SnakeParse, SnakeParseConfig, SnakeParseException
+from snakeparse.cache import ListingCache
+from snakeparse.catalog import WorkflowCatalog, build_catalog_main
+from snakeparse.profiling import Profiler
+
+
+def _snakefile_contents(group: str) -> str:
+    # the group is computed, so the snakefile must be executed to find it
+    return '\n'.join([
+        'from snakeparse.parser import argparser',
+        'def snakeparser(**kwargs):',
+        '    p = argparser(**kwargs)',
+        f'    p.group = {group[0]!r} + {group[1:]!r}',
+        "    p.description = 'The description.'",
+        "    p.parser.add_argument('--message', help='The message.', required=True)",
+        '    return p',
+        ''
+    ])
+
+
+class WorkflowCatalogTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tempdir.name)
+        for name, group in [('write_message', 'G2'), ('write_log', 'G1')]:
+            with (self.dir / f'{name}.smk').open('w') as fh:
+                fh.write(_snakefile_contents(group=group))
+        self.catalog_path = self.dir / 'catalog.json'
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def _config(self) -> SnakeParseConfig:
+        return SnakeParseConfig(workflows=OrderedDict(), groups=OrderedDict(),
+                                name_transform='snake_to_camel',
+                                snakefile_globs=[str(self.dir / '*.smk')])
+
+    def _build(self) -> None:
+        WorkflowCatalog.from_config(config=self._config()).save(path=self.catalog_path)
+
+    def test_round_trip(self) -> None:
+        self._build()
+        catalog = WorkflowCatalog.load(path=self.catalog_path)
+        self.assertListEqual([entry.name for entry in catalog.entries],
+                             ['WriteLog', 'WriteMessage'])
+        entry = catalog.entries[0]
+        self.assertEqual(entry.group, 'G1')
+        self.assertEqual(entry.description, 'The description.')
+        self.assertEqual(entry.snakefile, str((self.dir / 'write_log.smk').resolve()))
+        self.assertIn('--message', [o for a in entry.arguments for o in a['option_strings']])
+        self.assertIsNotNone(entry.schema)
+        self.assertTrue(entry.schema['checked'])
+        self.assertTrue(entry.is_current())
+
+    def test_config_from_catalog_skips_snakefiles(self) -> None:
+        self._build()
+        with mock.patch.object(SnakeParseConfig, 'metadata_from') as metadata_from, \
+                mock.patch.object(SnakeParseConfig, 'add_snakefile') as add_snakefile:
+            config = SnakeParseConfig(workflows=OrderedDict(), groups=OrderedDict(),
+                                      catalog=self.catalog_path,
+                                      snakefile_globs=['/does/not/exist/*.smk'])
+            metadata_from.assert_not_called()
+            add_snakefile.assert_not_called()
+        self.assertListEqual(list(config.workflows.keys()), ['WriteLog', 'WriteMessage'])
+        self.assertEqual(config.workflows['WriteMessage'].group, 'G2')
+
+    def test_modified_snakefile_is_loaded(self) -> None:
+        self._build()
+        snakefile = self.dir / 'write_message.smk'
+        with snakefile.open('w') as fh:
+            fh.write(_snakefile_contents(group='G3'))
+        os.utime(snakefile, ns=(0, 0))
+        config = SnakeParseConfig(workflows=OrderedDict(), groups=OrderedDict(),
+                                  catalog=self.catalog_path)
+        self.assertEqual(config.workflows['WriteMessage'].group, 'G3')
+        self.assertEqual(config.workflows['WriteLog'].group, 'G1')
+
+    def test_lazy_config_from_catalog_skips_snakefiles(self) -> None:
+        # without a description, so only the catalog says that it has none
+        for name in ['write_message', 'write_log']:
+            snakefile = self.dir / f'{name}.smk'
+            with snakefile.open('r') as fh:
+                contents = fh.read().replace("    p.description = 'The description.'\n", '')
+            with snakefile.open('w') as fh:
+                fh.write(contents)
+        self._build()
+        with Profiler() as profiler:
+            config = SnakeParseConfig(workflows=OrderedDict(), groups=OrderedDict(),
+                                      catalog=self.catalog_path, lazy=True)
+            config.sort_workflows()
+        self.assertListEqual([wf.group for wf in config.workflows.values()], ['G1', 'G2'])
+        self.assertListEqual([wf.description for wf in config.workflows.values()],
+                             [None, None])
+        names = {timing.name for timing in profiler.timings}
+        self.assertIn('load_catalog', names)
+        self.assertNotIn('translate', names)
+        self.assertNotIn('extract_metadata', names)
+
+    def test_deleted_snakefile_is_dropped(self) -> None:
+        self._build()
+        (self.dir / 'write_message.smk').unlink()
+        cache_dir = self.dir / 'cache'
+        config = SnakeParseConfig(workflows=OrderedDict(), groups=OrderedDict(),
+                                  catalog=self.catalog_path, cache_dir=cache_dir)
+        self.assertListEqual(list(config.workflows.keys()), ['WriteLog'])
+        self.assertEqual(config.workflows['WriteLog'].group, 'G1')
+        self.assertNotIn('WriteMessage', config.workflow_listing(columns=100))
+        # the listing is not cached, as the catalog is out of date
+        self.assertListEqual(list(cache_dir.glob('*' + ListingCache.SUFFIX)), [])
+
+    def test_listing_is_cached_on_disk(self) -> None:
+        self._build()
+        cache_dir = self.dir / 'cache'
+
+        def listing(columns: int = 100) -> str:
+            config = SnakeParseConfig(workflows=OrderedDict(), groups=OrderedDict(),
+                                      catalog=self.catalog_path, cache_dir=cache_dir)
+            return config.workflow_listing(columns=columns)
+
+        expected = listing()
+        self.assertIn('WriteMessage', expected)
+        self.assertEqual(len(list(cache_dir.glob('*' + ListingCache.SUFFIX))), 1)
+        with mock.patch.object(SnakeParseConfig, '_render_listing') as render:
+            self.assertEqual(listing(), expected)
+            render.assert_not_called()
+        listing(columns=120)
+        self.assertEqual(len(list(cache_dir.glob('*' + ListingCache.SUFFIX))), 2)
+
+        # not cached when a snakefile was modified since the catalog was built
+        snakefile = self.dir / 'write_message.smk'
+        with snakefile.open('w') as fh:
+            fh.write(_snakefile_contents(group='G3'))
+        os.utime(snakefile, ns=(0, 0))
+        self.assertIn('G3:', listing())
+        self.assertEqual(len(list(cache_dir.glob('*' + ListingCache.SUFFIX))), 2)
+
+    def test_valid_arguments_skip_the_parser(self) -> None:
+        self._build()
+        config = SnakeParseConfig(workflows=OrderedDict(), groups=OrderedDict(),
+                                  catalog=self.catalog_path)
+        self.assertIsNotNone(config.validator_for(workflow=config.workflows['WriteLog']))
+        with mock.patch.object(SnakeParseConfig, 'parser_for') as parser_for:
+            parsed = SnakeParse(args=['WriteLog', '--message', 'hi'], config=config,
+                                file=StringIO())
+            parser_for.assert_not_called()
+        self.assertIsNotNone(parsed.snakeparse_args_file)
+        parsed.cleanup()
+
+        # invalid arguments are parsed by the parser, to print its help
+        output = StringIO()
+        with self.assertRaises(SystemExit):
+            SnakeParse(args=['WriteLog', '--message'], config=config, file=output)
+        self.assertIn('expected one argument', output.getvalue())
+
+    def test_unsupported_version(self) -> None:
+        with self.catalog_path.open('w') as fh:
+            json.dump({'version': 0, 'groups': {}, 'workflows': []}, fh)
+        with self.assertRaises(SnakeParseException):
+            WorkflowCatalog.load(path=self.catalog_path)
+
+    def test_build_catalog_main(self) -> None:
+        output = StringIO()
+        args = ['--no-cache', '--snakefile-globs', str(self.dir / '*.smk'),
+                '--output', str(self.catalog_path)]
+        self.assertEqual(build_catalog_main(args=args, file=output), 0)
+        self.assertIn('Wrote 2 workflows', output.getvalue())
+        self.assertEqual(len(WorkflowCatalog.load(path=self.catalog_path).entries), 2)
+
+        output = StringIO()
+        self.assertEqual(build_catalog_main(args=['--no-cache'], file=output), 2)
+        self.assertIn('error: the following arguments are required: -o/--output',
+                      output.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
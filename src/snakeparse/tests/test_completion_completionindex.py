@@ -0,0 +1,175 @@
+import os
+import tempfile
+import unittest
+from io import StringIO
+from pathlib import Path
+from typing import List
+from unittest import mock
+
+from snakeparse.api import SnakeParseConfig
+from snakeparse.completion import SNAKEPARSE_OPTIONS, CompletionIndex, complete, \
+    complete_main, completion_main, completion_script
+
+
+def _snakefile_contents() -> str:
+    return '\n'.join([
+        'from snakeparse.parser import argparser',
+        'def snakeparser(**kwargs):',
+        '    p = argparser(**kwargs)',
+        "    p.parser.add_argument('--message', required=True)",
+        "    p.parser.add_argument('--mode', choices=['fast', 'slow'])",
+        "    p.parser.add_argument('--dry', action='store_true')",
+        '    return p',
+        ''
+    ])
+
+
+class CompletionIndexTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tempdir.name).resolve()
+        self.snakefiles = self.dir / 'snakefiles'
+        self.snakefiles.mkdir()
+        for name in ['write_message', 'write_log']:
+            self._write(name=name)
+        # directories modified since the index was built must be noticed
+        os.utime(str(self.snakefiles), ns=(0, 1_000_000_000))
+        self.options = ['--cache-dir', str(self.dir / 'cache'),
+                        '--snakefile-globs', str(self.snakefiles / '*.smk')]
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def _write(self, name: str) -> None:
+        with (self.snakefiles / f'{name}.smk').open('w') as fh:
+            fh.write(_snakefile_contents())
+
+    def _index(self) -> CompletionIndex:
+        _, path = CompletionIndex.key_for(words=self.options)
+        CompletionIndex.build(words=self.options).save(path=path)
+        index = CompletionIndex.load(path=path, key=CompletionIndex.key_for(self.options)[0])
+        assert index is not None
+        return index
+
+    def _complete(self, *words: str) -> List[str]:
+        output = StringIO()
+        self.assertEqual(complete_main(args=['--'] + self.options + list(words), file=output), 0)
+        return output.getvalue().splitlines()
+
+    def test_snakeparse_options(self) -> None:
+        parser = SnakeParseConfig.config_parser()
+        expected = {}
+        for action in parser._actions:
+            nargs = {None: 1, '*': -1}.get(action.nargs, action.nargs)  # type: ignore
+            for option in action.option_strings:
+                expected[option] = nargs
+        self.assertDictEqual(SNAKEPARSE_OPTIONS, expected)
+
+    def test_complete(self) -> None:
+        index = self._index()
+        self.assertTrue(index.is_current())
+        self.assertDictEqual(index.workflows, {'WriteLog': 'WriteLog',
+                                               'WriteMessage': 'WriteMessage'})
+        options = self.options
+
+        # snakeparse options and commands
+        self.assertListEqual(complete(words=['--con'], index=None), ['--concurrency', '--config'])
+        self.assertListEqual(complete(words=['--config', '--c'], index=None), [])
+        self.assertListEqual(complete(words=['b'], index=index), ['batch', 'build-catalog'])
+        self.assertListEqual(complete(words=['c'], index=index), ['completion', 'concurrent'])
+        self.assertListEqual(complete(words=['completion', 'z'], index=index), ['zsh'])
+        self.assertListEqual(complete(words=['build-catalog', '--cat'], index=index),
+                             ['--catalog'])
+
+        # workflow names, after the globs only following '--'
+        self.assertListEqual(index.complete(words=['--lazy', 'Write']),
+                             ['WriteLog', 'WriteMessage'])
+        self.assertListEqual(index.complete(words=options + ['Write']), [])
+        self.assertListEqual(index.complete(words=options + ['--', 'WriteM']), ['WriteMessage'])
+        self.assertListEqual(index.complete(words=options + ['-n', '--', 'W']),
+                             ['WriteLog', 'WriteMessage'])
+
+        # snakemake options, before the workflow
+        self.assertIn('--forceall', index.complete(words=options + ['--force']))
+        self.assertIn('--forceall', index.complete(words=options + ['-n', '--force']))
+        self.assertListEqual(index.complete(words=options + ['--cores', '--', 'WriteL']),
+                             ['WriteLog'])
+
+        # workflow options, and their values
+        words = options + ['--', 'WriteLog']
+        self.assertListEqual(index.complete(words=words + ['--m']), ['--message', '--mode'])
+        self.assertListEqual(index.complete(words=words + ['--mode', '']), ['fast', 'slow'])
+        self.assertListEqual(index.complete(words=words + ['--message', '']), [])
+        self.assertListEqual(index.complete(words=words + ['--dry', '--d']), ['--dry'])
+        self.assertListEqual(index.complete(words=words + ['']), [])
+
+        # concurrent invocations, separated by '++'
+        words = ['concurrent'] + words + ['--message', 'hi', '++']
+        self.assertListEqual(index.complete(words=words + ['WriteM']), ['WriteMessage'])
+        self.assertListEqual(index.complete(words=words + ['c']), [])
+        self.assertListEqual(index.complete(words=words + ['WriteLog', '--m']),
+                             ['--message', '--mode'])
+        self.assertListEqual(index.complete(words=words[:1] + ['--', 'WriteL']), ['WriteLog'])
+
+    def test_is_current(self) -> None:
+        index = self._index()
+        self.assertTrue(index.is_current())
+        os.utime(str(self.snakefiles / 'write_log.smk'), ns=(0, 0))
+        self.assertFalse(index.is_current())
+
+        index = self._index()
+        self.assertTrue(index.is_current())
+        self._write(name='write_more')
+        self.assertFalse(index.is_current())
+
+    def test_complete_main(self) -> None:
+        with mock.patch('subprocess.Popen') as popen:
+            # no index, so only the snakeparse options are completed, while the
+            # index is built in the background, once
+            self.assertListEqual(self._complete('--', 'W'), [])
+            self.assertListEqual(self._complete('--lazy', '--la'), ['--lazy'])
+            popen.assert_called_once()
+            self.assertListEqual(popen.call_args[0][0][-len(self.options) - 2:],
+                                 ['--'] + self.options + ['--'])
+
+            # built in the background
+            self.assertEqual(complete_main(args=['--refresh', '--'] + self.options,
+                                           file=StringIO()), 0)
+            self.assertListEqual(self._complete('--', 'W'), ['WriteLog', 'WriteMessage'])
+            output = StringIO()
+            words = ['--', 'concurrent'] + self.options + ['--', 'WriteLog', '++', 'W']
+            self.assertEqual(complete_main(args=words, file=output), 0)
+            self.assertListEqual(output.getvalue().splitlines(), ['WriteLog', 'WriteMessage'])
+            popen.assert_called_once()
+
+            # the snakefiles changed, so the index is refreshed in the background,
+            # while completing from the index as it is
+            self._write(name='write_more')
+            self.assertListEqual(self._complete('--', 'W'), ['WriteLog', 'WriteMessage'])
+            self.assertEqual(popen.call_count, 2)
+
+        # the index is only for the options that select the workflows
+        key, path = CompletionIndex.key_for(words=self.options)
+        self.assertEqual(CompletionIndex.key_for(words=self.options + ['--lazy', '-n']),
+                         (key, path))
+        self.assertNotEqual(CompletionIndex.key_for(words=self.options[:2])[0], key)
+        self.assertEqual(path.parent, self.dir / 'cache')
+
+    def test_completion_script(self) -> None:
+        for shell in ['bash', 'zsh', 'fish']:
+            script = completion_script(shell=shell, commands=['snakeparse', 'toolchain'])
+            self.assertIn('__complete --', script)
+            self.assertIn('snakeparse toolchain', script)
+        with self.assertRaises(ValueError):
+            completion_script(shell='tcsh')
+
+        output = StringIO()
+        self.assertEqual(completion_main(args=['bash'], file=output), 0)
+        self.assertIn('complete -o default -F _snakeparse_completion snakeparse',
+                      output.getvalue())
+        self.assertEqual(completion_main(args=['tcsh'], file=StringIO()), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from typing import List
+
+from snakeparse.cache import DirectoryCache
+from snakeparse.discovery import DirectoryScanner, expand_globs
+
+
+class DirectoryScannerTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tempdir.name).resolve()
+        self.root = self.dir / 'root'
+        for path in ['a/x.smk', 'a/y.smk', 'a/notes.txt', 'a/b/z.smk', 'a/b/c/w.smk',
+                     'd/v.smk', 'd/.hidden.smk', 'e/f/u.smk', 'top.smk']:
+            (self.root / path).parent.mkdir(parents=True, exist_ok=True)
+            (self.root / path).touch()
+        (self.root / 'link').symlink_to(self.root / 'a')
+        self.cache_dir = self.dir / 'cache'
+        self.cwd = os.getcwd()
+
+    def tearDown(self) -> None:
+        os.chdir(self.cwd)
+        self.tempdir.cleanup()
+
+    def _age(self) -> None:
+        '''Makes every directory appear unmodified for long enough to be cached.'''
+        for directory, _, _ in os.walk(str(self.root)):
+            os.utime(directory, ns=(0, 1_000_000_000))
+
+    def _globs(self) -> List[str]:
+        root = str(self.root)
+        return [f'{root}/**/*.smk', f'{root}/*/*.smk', f'{root}/a/b/*', f'{root}/a/**',
+                f'{root}/l*/*.smk', f'{root}/top.smk', f'{root}/[ad]/?.smk',
+                f'{root}/./a/../d/*.smk', f'{root}/missing/*.smk']
+
+    def test_matches_pathlib(self) -> None:
+        scanner = DirectoryScanner()
+        for glob in self._globs():
+            expected = sorted(Path('/').glob(glob[1:]))
+            self.assertListEqual(sorted(scanner.glob(pattern=glob)), expected, glob)
+
+        # relative globs are relative to the working directory
+        os.chdir(str(self.root))
+        scanner = DirectoryScanner()
+        for glob in ['**/*.smk', 'a/*.smk', './d/*']:
+            self.assertListEqual(sorted(scanner.glob(pattern=glob)),
+                                 sorted(Path('.').glob(glob)), glob)
+
+        for glob in ['', '/', 'a/b**/*.smk']:
+            with self.assertRaises(ValueError):
+                scanner.glob(pattern=glob)
+
+    def test_directories_are_listed_once(self) -> None:
+        scanner = DirectoryScanner()
+        scanner.glob(pattern=f'{self.root}/**/*.smk')
+        # root, a, a/b, a/b/c, d, e, e/f (not through the link)
+        self.assertEqual(scanner.listed, 7)
+        scanner.glob(pattern=f'{self.root}/**/*.txt')
+        self.assertEqual(scanner.listed, 7)
+        # the link is followed by a wildcard
+        scanner.glob(pattern=f'{self.root}/*/*.smk')
+        self.assertEqual(scanner.listed, 8)
+
+        # literal components are not listed
+        scanner = DirectoryScanner()
+        scanner.glob(pattern=f'{self.root}/a/b/*.smk')
+        self.assertEqual(scanner.listed, 1)
+        self.assertListEqual(scanner.directories, [str(self.root / 'a' / 'b')])
+
+    def test_cache(self) -> None:
+        glob = f'{self.root}/**/*.smk'
+        expected = [sorted(Path('/').glob(glob[1:]))]
+
+        # recently modified directories are listed again
+        paths = expand_globs(globs=[glob], cache=DirectoryCache(cache_dir=self.cache_dir))
+        self.assertListEqual([sorted(p) for p in paths], expected)
+        scanner = DirectoryScanner(cache=DirectoryCache(cache_dir=self.cache_dir))
+        scanner.glob(pattern=glob)
+        self.assertEqual(scanner.listed, 7)
+
+        # unmodified directories are not listed again
+        self._age()
+        expand_globs(globs=[glob], cache=DirectoryCache(cache_dir=self.cache_dir))
+        scanner = DirectoryScanner(cache=DirectoryCache(cache_dir=self.cache_dir))
+        self.assertListEqual(sorted(scanner.glob(pattern=glob)), expected[0])
+        self.assertEqual(scanner.listed, 0)
+
+        # only the modified directory is listed again
+        (self.root / 'a' / 'b' / 'new.smk').touch()
+        scanner = DirectoryScanner(cache=DirectoryCache(cache_dir=self.cache_dir))
+        self.assertIn(self.root / 'a' / 'b' / 'new.smk', scanner.glob(pattern=glob))
+        self.assertEqual(scanner.listed, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
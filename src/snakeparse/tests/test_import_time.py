@@ -0,0 +1,49 @@
+import subprocess
+import sys
+import unittest
+
+
+'''The modules that should only be imported when needed.'''
+_DEFERRED_MODULES = ['snakemake', 'pyhocon', 'yaml', 'concurrent.futures.process']
+
+
+class ImportTimeTest(unittest.TestCase):
+
+    def _imported(self, statement: str) -> str:
+        '''Returns the deferred modules imported by the statement in a new
+        interpreter.'''
+        code = f'{statement}\n' \
+            'import sys\n' \
+            f'print(" ".join(m for m in {_DEFERRED_MODULES!r} if m in sys.modules))\n'
+        return subprocess.check_output([sys.executable, '-c', code]).decode('utf-8').strip()
+
+    def test_api_does_not_import_dependencies(self) -> None:
+        self.assertEqual(self._imported('import snakeparse.api'), '')
+
+    def test_parser_does_not_import_dependencies(self) -> None:
+        self.assertEqual(self._imported('import snakeparse.parser'), '')
+
+    def test_usage_does_not_import_dependencies(self) -> None:
+        statement = 'from snakeparse.api import SnakeParse\n' \
+            'SnakeParse.usage_short()'
+        self.assertEqual(self._imported(statement), '')
+
+    def test_client_does_not_import_api(self) -> None:
+        code = 'import sys\n' \
+            'import snakeparse.__main__\n' \
+            'import snakeparse.client\n' \
+            'print("snakeparse.api" in sys.modules)\n'
+        output = subprocess.check_output([sys.executable, '-c', code]).decode('utf-8')
+        self.assertEqual(output.strip(), 'False')
+
+    def test_completion_does_not_import_api(self) -> None:
+        code = 'import sys\n' \
+            'import snakeparse.__main__\n' \
+            'import snakeparse.completion\n' \
+            'print("snakeparse.api" in sys.modules)\n'
+        output = subprocess.check_output([sys.executable, '-c', code]).decode('utf-8')
+        self.assertEqual(output.strip(), 'False')
+
+
+if __name__ == '__main__':
+    unittest.main()
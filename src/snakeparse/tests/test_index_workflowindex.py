@@ -0,0 +1,57 @@
+import unittest
+
+from snakeparse.api import SnakeParseException
+from snakeparse.index import WorkflowIndex
+
+
+class WorkflowIndexTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.index = WorkflowIndex(names=['WriteMessage', 'WriteLog', 'Align'],
+                                   aliases={'Align': ['bwa']})
+
+    def test_get(self) -> None:
+        self.assertEqual(self.index.get('WriteLog'), 'WriteLog')
+        self.assertEqual(self.index.get('bwa'), 'Align')
+        self.assertIsNone(self.index.get('writelog'))
+        self.assertIn('bwa', self.index)
+        self.assertNotIn('Write', self.index)
+
+    def test_duplicates(self) -> None:
+        with self.assertRaises(SnakeParseException):
+            self.index.add(name='Other', aliases=['bwa'])
+        with self.assertRaises(SnakeParseException):
+            self.index.add(name='Align')
+
+    def test_resolve(self) -> None:
+        self.assertEqual(self.index.resolve('writelog'), 'WriteLog')
+        self.assertEqual(self.index.resolve('BWA'), 'Align')
+        self.assertEqual(self.index.resolve('writem'), 'WriteMessage')
+        self.assertEqual(self.index.resolve('al'), 'Align')
+        # ambiguous prefix
+        self.assertIsNone(self.index.resolve('Write'))
+        self.assertIsNone(self.index.resolve(''))
+        # case-sensitive
+        self.assertIsNone(self.index.resolve('writelog', ignore_case=False, prefix=False))
+        self.assertIsNone(self.index.resolve('writem', ignore_case=False))
+        self.assertEqual(self.index.resolve('WriteM', ignore_case=False), 'WriteMessage')
+        self.assertIsNone(self.index.resolve('WriteM', prefix=False))
+
+    def test_case_insensitive_collision(self) -> None:
+        index = WorkflowIndex(names=['align', 'Align'])
+        self.assertEqual(index.resolve('align'), 'align')
+        self.assertIsNone(index.resolve('ALIGN'))
+
+    def test_completions(self) -> None:
+        self.assertListEqual(self.index.completions('write'), ['WriteLog', 'WriteMessage'])
+        self.assertListEqual(self.index.completions('b'), ['Align'])
+        self.assertListEqual(self.index.completions('x'), [])
+
+    def test_suggestions(self) -> None:
+        self.assertListEqual(self.index.suggestions('Write'), ['WriteLog', 'WriteMessage'])
+        self.assertEqual(self.index.suggestions('WriteMesage')[0], 'WriteMessage')
+        self.assertListEqual(self.index.suggestions('Zzz'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
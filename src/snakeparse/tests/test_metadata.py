@@ -0,0 +1,151 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from snakeparse.api import SnakeParseConfig, SnakeParseWorkflow
+from snakeparse.cache import translate_snakefile
+from snakeparse.metadata import extract_metadata, metadata_from_parser
+
+
+_METHOD_PARSER = '''
+from snakeparse.parser import argparser
+
+def snakeparser(**kwargs):
+    p = argparser(**kwargs)
+    p.group = 'Group'
+    p.description = 'Description'
+    p.parser.add_argument('--message', help='The message.', required=True)
+    p.parser.add_argument('-c', '--count', type=int, default=2, choices=[1, 2, 3])
+    p.parser.add_argument('--flag', action='store_true')
+    p.parser.add_argument('--values', nargs='+', metavar='VALUE')
+    p.parser.add_argument('inputs', nargs='*')
+    return p
+
+args = snakeparser().parse_config(config=config)
+
+rule all:
+    input:
+        'log.txt'
+'''
+
+_CLASS_PARSER = '''
+from snakeparse.api import SnakeArgumentParser
+
+class Parser(SnakeArgumentParser):
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.group = 'Group'
+        self.parser.add_argument('--message', help='The message.', required=True)
+
+args = Parser().parse_config(config=config)
+'''
+
+
+class ExtractMetadataTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def _snakefile(self, contents: str, name: str = 'workflow.smk') -> Path:
+        snakefile = Path(self.tempdir.name) / name
+        with snakefile.open('w') as fh:
+            fh.write(contents)
+        return snakefile
+
+    def _extract(self, contents: str) -> object:
+        source, code = translate_snakefile(snakefile=self._snakefile(contents=contents))
+        return extract_metadata(source=source)
+
+    def _executed(self, contents: str) -> object:
+        workflow = SnakeParseWorkflow(name='Workflow', snakefile=self._snakefile(contents))
+        return metadata_from_parser(parser=SnakeParseConfig.parser_from(workflow=workflow))
+
+    def test_method_parser(self) -> None:
+        metadata = self._extract(_METHOD_PARSER)
+        self.assertIsNotNone(metadata)
+        self.assertEqual(metadata.group, 'Group')  # type: ignore
+        self.assertEqual(metadata.description, 'Description')  # type: ignore
+        # the statically extracted metadata should match that of the parser
+        self.assertEqual(metadata, self._executed(_METHOD_PARSER))
+
+    def test_class_parser(self) -> None:
+        metadata = self._extract(_CLASS_PARSER)
+        self.assertIsNotNone(metadata)
+        self.assertEqual(metadata.group, 'Group')  # type: ignore
+        self.assertIsNone(metadata.description)  # type: ignore
+        self.assertEqual(metadata, self._executed(_CLASS_PARSER))
+
+    def test_computed_values_are_undecidable(self) -> None:
+        contents = _CLASS_PARSER.replace("self.group = 'Group'", "self.group = 'G' + 'roup'")
+        self.assertIsNone(self._extract(contents))
+        contents = _CLASS_PARSER.replace("self.group = 'Group'",
+                                         "self.group = 'Group'\n        self.group = 'Other'")
+        self.assertIsNone(self._extract(contents))
+
+    def test_other_objects_are_ignored(self) -> None:
+        inputs = ("inputs = p.parser.add_argument_group('Inputs')\n"
+                  "    inputs.description = 'The inputs.'\n"
+                  "    inputs.group = 'Inputs'\n"
+                  "    p.parser.add_argument('--message'")
+        contents = _METHOD_PARSER.replace("p.parser.add_argument('--message'", inputs)
+        metadata = self._extract(contents)
+        self.assertEqual(metadata.group, 'Group')  # type: ignore
+        self.assertEqual(metadata.description, 'Description')  # type: ignore
+        self.assertEqual(metadata, self._executed(contents))
+
+        contents = _CLASS_PARSER.replace("self.group = 'Group'",
+                                         "self.group = 'Group'\n"
+                                         "        group = self.parser.add_argument_group('In')\n"
+                                         "        group.description = 'The inputs.'")
+        metadata = self._extract(contents)
+        self.assertEqual(metadata.group, 'Group')  # type: ignore
+        self.assertIsNone(metadata.description)  # type: ignore
+        self.assertEqual(metadata, self._executed(contents))
+
+    def test_computed_arguments_are_unknown(self) -> None:
+        contents = _CLASS_PARSER.replace("help='The message.'", "help=str(1)")
+        metadata = self._extract(contents)
+        self.assertEqual(metadata.group, 'Group')  # type: ignore
+        self.assertIsNone(metadata.arguments)  # type: ignore
+
+    def test_no_or_multiple_parsers_are_undecidable(self) -> None:
+        self.assertIsNone(self._extract('x = 1\n'))
+        contents = _CLASS_PARSER + _CLASS_PARSER.replace('class Parser', 'class Other')
+        self.assertIsNone(self._extract(contents))
+        contents = _CLASS_PARSER + _METHOD_PARSER
+        self.assertIsNone(self._extract(contents))
+
+    def test_abstract_class_is_not_a_parser(self) -> None:
+        contents = '''
+from snakeparse.api import SnakeArgumentParser
+
+class Base(SnakeArgumentParser):
+    group = 'Base'
+''' + _METHOD_PARSER
+        self.assertEqual(self._extract(contents).group, 'Group')  # type: ignore
+
+    def test_method_not_returning_argparser_is_undecidable(self) -> None:
+        contents = _METHOD_PARSER.replace('p = argparser(**kwargs)', 'p = make(**kwargs)')
+        self.assertIsNone(self._extract(contents))
+
+    def test_config_does_not_execute_snakefile(self) -> None:
+        snakefile = self._snakefile(_CLASS_PARSER + '\nraise Exception("executed")\n')
+        with mock.patch.object(SnakeParseConfig, '_parser_from_code') as parser_from_code:
+            config = SnakeParseConfig(workflows={}, snakefile_globs=[str(snakefile)])
+            parser_from_code.assert_not_called()
+        self.assertEqual(config.workflows['workflow'].group, 'Group')
+
+    def test_config_falls_back_to_executing_snakefile(self) -> None:
+        contents = _CLASS_PARSER.replace("self.group = 'Group'", "self.group = 'G' + 'roup'")
+        snakefile = self._snakefile(contents)
+        config = SnakeParseConfig(workflows={}, snakefile_globs=[str(snakefile)])
+        self.assertEqual(config.workflows['workflow'].group, 'Group')
+
+
+if __name__ == '__main__':
+    unittest.main()
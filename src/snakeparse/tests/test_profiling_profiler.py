@@ -0,0 +1,107 @@
+import json
+import os
+import pstats
+import tempfile
+import unittest
+from io import StringIO
+from pathlib import Path
+from typing import List
+from unittest import mock
+
+from snakeparse.api import SnakeParse
+from snakeparse.profiling import PhaseTiming, Profiler, active_profiler, phase
+
+
+_SNAKEFILE_CONTENTS = '''
+from snakeparse.parser import argparser
+
+def snakeparser(**kwargs):
+    p = argparser(**kwargs)
+    p.group = 'Group'
+    p.description = 'The description.'
+    p.parser.add_argument('--message', help='The message.', required=True)
+    return p
+'''
+
+
+class ProfilerTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tempdir.name)
+        for name in ['write_message', 'write_log']:
+            with (self.dir / f'{name}.smk').open('w') as fh:
+                fh.write(_SNAKEFILE_CONTENTS)
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def _run(self, *options: str) -> str:
+        '''Runs the WriteMessage workflow from the command line with the given
+        snakeparse options, and returns what is written to standard error.'''
+        args = ['--no-cache', *options, '--snakefile-globs', str(self.dir / '*.smk'),
+                '--prog', 'p', 'WriteMessage', '--message', 'hi']
+        stderr = StringIO()
+        with mock.patch('subprocess.call', return_value=0), mock.patch('sys.stderr', stderr):
+            with self.assertRaises(SystemExit):
+                SnakeParse(args=args, file=StringIO()).run()
+        self.assertIsNone(active_profiler())
+        return stderr.getvalue()
+
+    def test_phases(self) -> None:
+        timings: List[PhaseTiming] = []
+        with Profiler().add_listener(timings.append) as profiler:
+            self.assertIs(active_profiler(), profiler)
+            with phase('outer'):
+                with phase('inner', workflow='Workflow'):
+                    pass
+        self.assertIsNone(active_profiler())
+        self.assertListEqual([t.name for t in profiler.timings], ['inner', 'outer'])
+        self.assertListEqual(timings, profiler.timings)
+        inner, outer = profiler.timings
+        self.assertEqual((inner.depth, inner.workflow), (1, 'Workflow'))
+        self.assertEqual((outer.depth, outer.workflow), (0, None))
+        self.assertLessEqual(outer.start, inner.start)
+        self.assertListEqual(list(profiler.summary().keys()), ['outer', 'inner'])
+        self.assertListEqual(list(profiler.workflows()['Workflow'].keys()), ['inner'])
+
+    def test_inactive(self) -> None:
+        self.assertIsNone(active_profiler())
+        with phase('ignored'):
+            pass
+        profiler = Profiler()
+        profiler.record(name='recorded', start=0.0, end=1.0)
+        self.assertEqual(profiler.timings[0], PhaseTiming(name='recorded',
+                                                          start=profiler.timings[0].start,
+                                                          seconds=1.0, depth=0, workflow=None))
+
+    def test_profile_startup(self) -> None:
+        json_path = self.dir / 'profile.json'
+        output = self._run('--profile-startup', '--profile-json', str(json_path))
+        self.assertIn('Startup profile', output)
+        self.assertIn('WriteMessage', output)
+        with json_path.open('r') as fh:
+            report = json.load(fh)
+        for name in ['parse_options', 'create_config', 'expand_globs', 'load_metadata',
+                     'translate', 'exec', 'parse_workflow_args', 'snakemake']:
+            self.assertIn(name, report['summary'])
+        self.assertEqual(report['summary']['translate']['count'], 3)
+        self.assertIn('exec', report['workflows']['WriteMessage'])
+        self.assertEqual(report['phases'][0]['name'], 'parse_options')
+
+    def test_environment(self) -> None:
+        json_path = self.dir / 'profile.json'
+        with mock.patch.dict(os.environ, {Profiler.ENV_VAR: str(json_path)}):
+            self.assertIn('Startup profile', self._run())
+        self.assertTrue(json_path.exists())
+        with mock.patch.dict(os.environ, {Profiler.ENV_VAR: '0'}):
+            self.assertEqual(self._run(), '')
+
+    def test_cprofile(self) -> None:
+        stats_path = self.dir / 'startup.prof'
+        self._run('--profile-cprofile', str(stats_path))
+        self.assertTrue(pstats.Stats(str(stats_path)).get_stats_profile().func_profiles)
+
+
+if __name__ == '__main__':
+    unittest.main()
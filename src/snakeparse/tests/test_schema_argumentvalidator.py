@@ -0,0 +1,148 @@
+import argparse
+import json
+import random
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+from typing import Any, List, Optional
+
+from snakeparse.api import SnakeArgumentParser, SnakeParseException
+from snakeparse.schema import ArgumentValidator, parser_schema
+
+
+class _Parser(SnakeArgumentParser):
+
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.parser.add_argument('--message', required=True)
+        self.parser.add_argument('--count', type=int, default=1)
+        self.parser.add_argument('--mode', choices=['a', 'b'])
+        self.parser.add_argument('--flag', action='store_true')
+        self.parser.add_argument('-v', '--verbose', action='count')
+        self.parser.add_argument('-n', type=int)
+        self.parser.add_argument('--files', nargs='+')
+        self.parser.add_argument('--opt', nargs='?', const='c', default='d')
+        self.parser.add_argument('--pair', nargs=2, type=float)
+        self.parser.add_argument('--path', type=Path)
+        self.parser.add_argument('--tag', action='append')
+        group = self.parser.add_mutually_exclusive_group()
+        group.add_argument('--alpha', action='store_true')
+        group.add_argument('--beta', type=int)
+        self.parser.add_argument('first', nargs='?')
+        self.parser.add_argument('rest', nargs='*', type=int)
+
+
+class _CustomParser(_Parser):
+
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.parser.add_argument('--custom', type=lambda value: value.upper())
+
+    def parse_args(self, args: List[str]) -> Any:
+        return super().parse_args(args=args)
+
+
+'''Arguments from which to draw the arguments to validate.'''
+_TOKENS = ['--message', 'hi', '--mess', '--mes=x', '--count', '3', 'x3', '--count=4', '--mode',
+           'a', 'c', '--flag', '--flag=1', '-v', '-vv', '-vx', '-n', '-n5', '-nq', '--files',
+           '--opt', '--pair', '1.5', 'nan', '--path', '/p', '--tag', '--', '-', '-5', '--unknown',
+           '-q', '--alpha', '--beta', '2', '7', '--opt=', 'a b', '']
+
+
+class ArgumentValidatorTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.parser = _Parser()
+        self.validator = ArgumentValidator(schema=json.loads(json.dumps(self.parser.schema())))
+
+    def _parse(self, args: List[str]) -> Optional[str]:
+        '''Returns the error parsing the arguments with argparse, if any.'''
+        try:
+            self.parser.parse_args(args=args)
+        except SnakeParseException as e:
+            return str(e)
+        return None
+
+    def test_schema(self) -> None:
+        schema = self.parser.schema()
+        self.assertTrue(schema['checked'])
+        self.assertEqual(schema['fromfile_prefix_chars'], '@')
+        names = [spec['dest'] for spec in schema['arguments']]
+        self.assertEqual(names[:3], ['help', 'message', 'count'])
+        self.assertListEqual(schema['exclusive'],
+                             [{'required': False,
+                               'arguments': [names.index('alpha'), names.index('beta')]}])
+        checked = {spec['dest']: spec['checked'] for spec in schema['arguments']}
+        self.assertFalse(checked['help'])
+        self.assertTrue(checked['path'])
+
+        schema = _CustomParser().schema()
+        self.assertFalse(schema['checked'])
+        self.assertFalse(schema['arguments'][-1]['checked'])
+        self.assertFalse(ArgumentValidator(schema=schema).validate(['--message', 'hi']))
+
+    def test_valid(self) -> None:
+        for args in [['--message', 'hi'],
+                     ['--mes=hi', '--count', '-3', '--pair', '1', '2.5', 'first', '1', '2'],
+                     ['-vv', '-n5', '--message', 'hi', '--files', 'a', 'b', '--', '-1'],
+                     ['--message', 'hi', '--opt', '--alpha', '--tag', 'x', '--tag', 'y']]:
+            self.assertIsNone(self._parse(args), args)
+            self.assertTrue(self.validator.validate(args), args)
+
+    def test_invalid(self) -> None:
+        for args in [[],
+                     ['--message'],
+                     ['--message', 'hi', '--count', 'x'],
+                     ['--message', 'hi', '--mode', 'c'],
+                     ['--message', 'hi', '--flag=1'],
+                     ['--message', 'hi', '--alpha', '--beta', '1'],
+                     ['--message', 'hi', '--unknown'],
+                     ['--message', 'hi', 'first', 'x'],
+                     ['--m', 'hi']]:
+            expected = self._parse(args)
+            self.assertIsNotNone(expected, args)
+            with self.assertRaises(SnakeParseException, msg=args) as context:
+                self.validator.validate(args)
+            self.assertEqual(str(context.exception), expected, args)
+
+    def test_undecidable(self) -> None:
+        # help, and arguments files, are left to argparse
+        for args in [['--message', 'hi', '-h'], ['@args.txt']]:
+            self.assertFalse(self.validator.validate(args), args)
+
+    def test_matches_argparse(self) -> None:
+        rng = random.Random(0)
+        for _ in range(2000):
+            args = rng.choices(_TOKENS, k=rng.randint(0, 6))
+            expected = self._parse(args)
+            try:
+                valid = self.validator.validate(args)
+            except SnakeParseException as e:
+                self.assertEqual(str(e), expected, args)
+            else:
+                if valid:
+                    self.assertIsNone(expected, args)
+
+    def test_parser_schema(self) -> None:
+        # a parser that overrides how arguments are parsed is not checked
+        class Parser(argparse.ArgumentParser):
+            def parse_known_args(self, args: Any = None, namespace: Any = None) -> Any:
+                return super().parse_known_args(args, namespace)
+
+        self.assertTrue(parser_schema(argparse.ArgumentParser())['checked'])
+        self.assertFalse(parser_schema(Parser())['checked'])
+
+    def test_actions_missing_from_argparse(self) -> None:
+        # the extend and boolean optional actions are missing in older pythons
+        code = 'import argparse\n' \
+            'del argparse._ExtendAction, argparse.BooleanOptionalAction\n' \
+            'import snakeparse.api\n' \
+            'from snakeparse.schema import _CHECKED_ACTIONS\n' \
+            'print(len(_CHECKED_ACTIONS))\n'
+        output = subprocess.check_output([sys.executable, '-c', code]).decode('utf-8')
+        self.assertEqual(output.strip(), '7')
+
+
+if __name__ == '__main__':
+    unittest.main()
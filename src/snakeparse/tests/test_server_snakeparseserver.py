@@ -0,0 +1,116 @@
+import os
+import stat
+import tempfile
+import threading
+import unittest
+from io import StringIO
+from pathlib import Path
+from typing import List, Tuple
+from unittest import mock
+
+from snakeparse.api import SnakeParseConfig
+from snakeparse.client import connect, request
+from snakeparse.server import SnakeParseServer
+
+
+_SNAKEFILE_CONTENTS = '''
+from snakeparse.parser import argparser
+
+def snakeparser(**kwargs):
+    p = argparser(**kwargs)
+    p.parser.add_argument('--message', help='The message.', required=True)
+    return p
+'''
+
+# A fake snakemake executable that writes its arguments and working directory
+_SNAKEMAKE_CONTENTS = '''#!/bin/sh
+echo "args: $@"
+echo "cwd: $(pwd)"
+echo "env: $SNAKEPARSE_TEST"
+exit 3
+'''
+
+
+class SnakeParseServerTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tempdir.name)
+        self.snakefile = self.dir / 'write_message.smk'
+        with self.snakefile.open('w') as fh:
+            fh.write(_SNAKEFILE_CONTENTS)
+        self.snakemake = self.dir / 'snakemake'
+        with self.snakemake.open('w') as fh:
+            fh.write(_SNAKEMAKE_CONTENTS)
+        self.snakemake.chmod(0o755)
+
+        self.socket_path = self.dir / 'snakeparse.sock'
+        self.server = SnakeParseServer(socket_path=self.socket_path)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        self.tempdir.cleanup()
+
+    def _request(self, args: List[str], run: bool = True) -> Tuple[int, str]:
+        output = StringIO()
+        args = ['--no-cache', '--snakefile-globs', str(self.snakefile),
+                '--snakemake', str(self.snakemake)] + args
+        retcode = request(args=args, sock=connect(socket_path=self.socket_path), run=run,
+                          file=output)
+        return retcode, output.getvalue()
+
+    def test_socket_is_private(self) -> None:
+        mode = stat.S_IMODE(self.socket_path.stat().st_mode)
+        self.assertEqual(mode & 0o077, 0)
+
+    def test_run(self) -> None:
+        with mock.patch.dict(os.environ, {'SNAKEPARSE_TEST': 'forwarded'}):
+            retcode, output = self._request(['-n', 'WriteMessage', '--message', 'hi'])
+        self.assertEqual(retcode, 3)
+        self.assertIn('args: -n --config snakeparse_args_file=', output)
+        self.assertIn(f'--snakefile {self.snakefile.resolve()}', output)
+        self.assertIn(f'cwd: {os.getcwd()}', output)
+        self.assertIn('env: forwarded', output)
+
+    def test_validate_only(self) -> None:
+        retcode, output = self._request(['WriteMessage', '--message', 'hi'], run=False)
+        self.assertEqual(retcode, 0)
+        self.assertEqual(output, '')
+
+    def test_invalid_arguments(self) -> None:
+        retcode, output = self._request(['WriteMessage'])
+        self.assertEqual(retcode, 2)
+        self.assertIn('WriteMessage Arguments:', output)
+        self.assertIn('error: the following arguments are required: --message', output)
+
+    def test_configs_and_parsers_are_reused(self) -> None:
+        with mock.patch.object(SnakeParseConfig, 'parser_from',
+                               wraps=SnakeParseConfig.parser_from) as parser_from:
+            for _ in range(3):
+                self.assertEqual(self._request(['WriteMessage', '--message', 'hi'], False)[0], 0)
+            parser_from.assert_called_once()
+        self.assertEqual(len(self.server._configs), 1)
+
+    def test_modified_snakefile_is_reloaded(self) -> None:
+        self.assertEqual(self._request(['WriteMessage', '--message', 'hi'], run=False)[0], 0)
+        with self.snakefile.open('w') as fh:
+            fh.write(_SNAKEFILE_CONTENTS.replace("'--message'", "'--text'"))
+        os.utime(self.snakefile, ns=(0, 0))
+        self.assertEqual(self._request(['WriteMessage', '--text', 'hi'], run=False)[0], 0)
+        self.assertEqual(self._request(['WriteMessage', '--message', 'hi'], run=False)[0], 2)
+
+    def test_stale_socket_is_removed(self) -> None:
+        other = self.dir / 'other.sock'
+        with other.open('w') as fh:
+            fh.write('')
+        server = SnakeParseServer(socket_path=other)
+        server.server_close()
+        self.assertFalse(other.exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
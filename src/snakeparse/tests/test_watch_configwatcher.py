@@ -0,0 +1,70 @@
+import tempfile
+import time
+import unittest
+from collections import OrderedDict
+from pathlib import Path
+from typing import List
+
+from snakeparse.api import RefreshResult, SnakeParseConfig
+from snakeparse.watch import ConfigWatcher
+
+
+class ConfigWatcherTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tempdir.name)
+        self._write(name='a')
+        self.config = SnakeParseConfig(workflows=OrderedDict(),
+                                       snakefile_globs=[str(self.dir / '*.smk')],
+                                       lazy=True)
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def _write(self, name: str) -> None:
+        with (self.dir / f'{name}.smk').open('w') as fh:
+            fh.write('from snakeparse.api import SnakeArgumentParser\n'
+                     'class Parser(SnakeArgumentParser):\n'
+                     '    pass\n')
+
+    def test_poll(self) -> None:
+        changes: List[RefreshResult] = []
+        watcher = ConfigWatcher(config=self.config, on_change=changes.append)
+        self.assertFalse(watcher.poll().changed)
+        self.assertListEqual(changes, [])
+
+        self._write(name='b')
+        result = watcher.poll()
+        self.assertListEqual(result.added, ['b'])
+        self.assertListEqual(changes, [result])
+        self.assertIn('b', self.config.workflows)
+
+    def test_start_and_stop(self) -> None:
+        changes: List[RefreshResult] = []
+        with ConfigWatcher(config=self.config, interval=0.01,
+                           on_change=changes.append) as watcher:
+            self._write(name='b')
+            deadline = time.monotonic() + 10
+            while not changes and time.monotonic() < deadline:
+                time.sleep(0.01)
+        self.assertIsNone(watcher._thread)
+        self.assertListEqual(changes[0].added, ['b'])
+
+        # stopped watchers no longer refresh
+        self._write(name='c')
+        time.sleep(0.05)
+        self.assertNotIn('c', self.config.workflows)
+
+    def test_on_error(self) -> None:
+        errors: List[Exception] = []
+        self.config.snakefile_globs = ['a/**b/*.smk']
+        with ConfigWatcher(config=self.config, interval=0.01, on_error=errors.append):
+            deadline = time.monotonic() + 10
+            while not errors and time.monotonic() < deadline:
+                time.sleep(0.01)
+        self.assertTrue(errors)
+
+
+if __name__ == '__main__':
+    unittest.main()
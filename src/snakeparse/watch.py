@@ -0,0 +1,108 @@
+'''Keeps a long-lived configuration up to date with its snakefiles.
+
+A host that keeps a :class:`~snakeparse.api.SnakeParseConfig` for a long time
+(for example, a service that submits workflows) may call
+:meth:`~snakeparse.api.SnakeParseConfig.refresh` whenever it wants to pick up
+new, removed, or edited snakefiles.  Alternatively, a
+:class:`~snakeparse.watch.ConfigWatcher` polls for changes on a background
+thread, refreshing the configuration and reporting the changes:
+
+.. code-block:: python
+
+    >>> watcher = ConfigWatcher(config=config, interval=5, on_change=print)
+    >>> with watcher:
+    ...     with watcher.lock:
+    ...         parser = config.parser_for(workflow=config.workflows['Example'])
+
+Each poll lists only the directories modified since the last poll (see
+:class:`~snakeparse.cache.DirectoryCache`), and checks each loaded snakefile
+with a single ``stat`` call, so the file system is polled rather than watched
+with platform-specific notifications.  The configuration is refreshed while
+holding the watcher's lock, which the host should hold while using the
+configuration.
+
+The module contains the following public classes and methods:
+
+    - :class:`~snakeparse.watch.ConfigWatcher` -- Refreshes a configuration
+      periodically on a background thread.
+'''
+
+import threading
+from typing import Any, Callable, Optional
+
+from .api import RefreshResult, SnakeParseConfig
+
+
+class ConfigWatcher(object):
+    '''Refreshes a configuration periodically on a background thread.
+
+    Keyword Arguments
+    -----------------
+    config : SnakeParseConfig
+        The configuration to refresh.
+    interval : float
+        The seconds between refreshes.
+    on_change : Optional[Callable[[RefreshResult], Any]]
+        Optionally, called (on the background thread) with the result of each
+        refresh that added, removed, or modified a workflow.
+    on_error : Optional[Callable[[Exception], Any]]
+        Optionally, called (on the background thread) with the error raised by
+        a refresh, for example when two snakefiles have the same workflow name.
+        The watcher keeps polling regardless.
+
+    Attributes
+    ----------
+    lock : threading.RLock
+        Held while refreshing the configuration.
+    '''
+
+    def __init__(self,
+                 config: SnakeParseConfig,
+                 interval: float = 2.0,
+                 on_change: Optional[Callable[[RefreshResult], Any]] = None,
+                 on_error: Optional[Callable[[Exception], Any]] = None) -> None:
+        self.config    = config
+        self.interval  = interval
+        self.on_change = on_change
+        self.on_error  = on_error
+        self.lock      = threading.RLock()
+        self._stopped  = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def poll(self) -> RefreshResult:
+        '''Refreshes the configuration once, reporting any changes.'''
+        with self.lock:
+            result = self.config.refresh()
+        if result.changed and self.on_change is not None:
+            self.on_change(result)
+        return result
+
+    def start(self) -> 'ConfigWatcher':
+        '''Starts polling on a background (daemon) thread.'''
+        if self._thread is None:
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name='snakeparse-watcher',
+                                            daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        '''Stops polling, waiting for any refresh in progress to complete.'''
+        if self._thread is not None:
+            self._stopped.set()
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> 'ConfigWatcher':
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                if self.on_error is not None:
+                    self.on_error(e)